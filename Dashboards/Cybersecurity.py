@@ -3,19 +3,31 @@ Cybersecurity dashboard view.
 
 This dashboard shows incident listings, time series and severity
 breakdowns. It also provides a lightweight AI assistant that uses the
-`services.ai_service` wrapper to query an LLM for guidance.
+`services.ai_service` wrapper to query an LLM for guidance; requests go
+through the shared queue in `services.ai_scheduler`.
 """
 
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from dataclasses import asdict
-from models.cyber_incident import CyberIncident
-from services.ai_service import chat_completion, AIServiceError
+from services.ai_service import AIServiceError
+from services.ai_scheduler import BudgetExhausted, scheduler as ai_scheduler, wait_for
+from services.ai_context import estimate_tokens, incident_context, with_context
 from database.db_manager import DatabaseManager
+from services.frame_service import FrameCache, WindowCache
+from services.figure_cache import cached_figure, warm_figures
+from services.sync_service import sync_domain
+from services.cyber_service import apply_incident_delta, incident_aggregates_of, refresh_incident_aggregates
+from services.archive_service import ArchiveCache
+from services.anomaly_service import ANOMALY_WINDOW_DAYS, get_anomalies
+from database.archive import has_archive
+from Dashboards.export import export_button
+from Dashboards.filters import date_range_filter
 import os
 import time
 
+CSV_PATH = "data/cyber_incidents.csv"
+
 # --- Ensure database table exists ---
 db = DatabaseManager()
 db.execute("""
@@ -29,11 +41,113 @@ CREATE TABLE IF NOT EXISTS cyber_incidents (
 )
 """)
 
+def chart_builders(df, aggs):
+    """Figure builders by chart id: {chart_id: (params, build)}.
+
+    `df` and `aggs` cover the same rows (a date window, or all).
+    Used by the dashboard and by the post-login warm-up (`warm()`), so both
+    fill the same figure cache entries.
+    """
+    prepared = {}
+
+    def dated():
+        if "df" not in prepared:
+            d = df.copy(deep=False)
+            d["reported_date"] = pd.to_datetime(d["reported_date"], errors="coerce")
+            d = d.dropna(subset=["reported_date"])
+            d["month"] = d["reported_date"].dt.to_period("M").dt.to_timestamp()
+            prepared["df"] = d
+        return prepared["df"]
+
+    def build_time():
+        monthly = pd.DataFrame(aggs["monthly"], columns=["month", "count"])
+        if monthly.empty:
+            return None
+        if len(monthly) < 2:
+            # Fallback to daily trend when only a single month exists
+            daily = pd.DataFrame(aggs["daily"], columns=["date", "count"])
+            return px.line(daily, x="date", y="count", title="Incidents Over Time (Daily)")
+        return px.line(monthly, x="month", y="count", title="Incidents Over Time (Monthly)")
+
+    def build_severity_time():
+        d = dated()
+        sev_time = d.groupby(["month", "severity"]).size().reset_index(name="count")
+        if sev_time.empty:
+            return None
+        if sev_time["month"].nunique() < 2:
+            # Fallback to daily severity distribution
+            sev_daily = d.groupby([d["reported_date"].dt.date, "severity"]).size().reset_index(name="count")
+            sev_daily.columns = ["date", "severity", "count"]
+            return px.area(sev_daily, x="date", y="count", color="severity",
+                           title="Severity Distribution Over Time (Daily)")
+        return px.area(sev_time, x="month", y="count", color="severity",
+                       title="Severity Distribution Over Time")
+
+    def build_top_categories():
+        d = dated()
+        top_categories = d["type"].value_counts().nlargest(5).index.tolist()
+        if not top_categories:
+            return None
+        top_df = d[d["type"].isin(top_categories)]
+        cat_trends = top_df.groupby(["month", "type"]).size().reset_index(name="count")
+        if cat_trends.empty:
+            return None
+        if cat_trends["month"].nunique() < 2:
+            # Fallback to daily category trends
+            cat_daily = top_df.groupby([top_df["reported_date"].dt.date, "type"]).size().reset_index(name="count")
+            cat_daily.columns = ["date", "type", "count"]
+            return px.line(cat_daily, x="date", y="count", color="type",
+                           title="Top Categories Trends (Daily)")
+        return px.line(cat_trends, x="month", y="count", color="type",
+                       title="Top Categories Trends")
+
+    return {
+        "cyber.incidents_over_time": (None, build_time),
+        "cyber.severity_over_time": (None, build_severity_time),
+        "cyber.status_breakdown": (
+            None,
+            lambda: px.pie(pd.DataFrame(aggs["by_status"], columns=["Status", "Count"]),
+                           names="Status", values="Count", title="Incident Status Breakdown"),
+        ),
+        "cyber.top_categories": ({"top": 5}, build_top_categories),
+        "cyber.severity_counts": (
+            None,
+            lambda: px.bar(pd.DataFrame(aggs["by_severity"], columns=["Severity", "Count"]),
+                           x="Severity", y="Count", title="Incidents by Severity"),
+        ),
+    }
+
+
+def warm():
+    """Do a first render's data work off the script thread.
+
+    Syncs the CSV, loads the frame, computes the aggregates and builds the
+    figures, and returns the session-state entries the dashboard would
+    have created (see `services/warmup_service.py`).
+    """
+    state = {}
+    try:
+        mtime = os.path.getmtime(CSV_PATH)
+    except Exception:
+        mtime = None
+    # On sync errors the mtime is left out, so the dashboard syncs again
+    # and shows them.
+    if mtime and not sync_domain("cyber", CSV_PATH)["errors"]:
+        state["cyber_csv_mtime"] = mtime
+    cache = state["cyber_frame_cache"] = FrameCache("cyber_incidents")
+    if cache.refresh().empty:
+        return state
+    aggs = refresh_incident_aggregates(cache, state.setdefault("cyber_aggs", {}))
+    warm_figures(chart_builders(cache.frame, aggs), cache.version)
+    incident_context(cache.version, aggs)
+    return state
+
+
 def dashboard():
     st.title("Cybersecurity Dashboard")
 
     # --- Auto-sync CSV to DB when file changed since last sync ---
-    csv_path = "data/cyber_incidents.csv"
+    csv_path = CSV_PATH
     try:
         mtime = os.path.getmtime(csv_path)
     except Exception:
@@ -41,82 +155,80 @@ def dashboard():
 
     prev_mtime = st.session_state.get("cyber_csv_mtime")
     if mtime and (prev_mtime is None or mtime > prev_mtime):
-        df_csv = pd.read_csv(csv_path)
-
-        # Normalize id column (accept 'id' or 'incident_id')
-        if 'incident_id' in df_csv.columns and 'id' not in df_csv.columns:
-            df_csv['id'] = df_csv['incident_id']
-        df_csv['id'] = pd.to_numeric(df_csv.get('id'), errors='coerce')
-
-        # Normalize resolved_date values like 'NA' or 'Na' to missing
-        if 'resolved_date' in df_csv.columns:
-            df_csv['resolved_date'] = df_csv['resolved_date'].replace(['NA', 'Na', 'N/A', 'nan', 'NaN'], pd.NA)
-
-        # Deduplicate: prefer explicit ids when present, otherwise dedupe by full row
-        if df_csv.get('id').notna().any():
-            df_csv = df_csv.drop_duplicates(subset=['id'])
-        else:
-            df_csv = df_csv.drop_duplicates()
-
-        # Replace DB contents with deduped CSV rows to avoid accumulation of duplicates
-        conn = db.connect()
-        cur = conn.cursor()
+        # Upserts changed rows and drops removed ones in one serialized write
+        # transaction; in WAL mode other sessions keep reading the previous
+        # snapshot until it commits.
         try:
-            cur.execute("DELETE FROM cyber_incidents")
-            for idx, row in df_csv.iterrows():
-                cid = int(row['id']) if pd.notna(row.get('id')) else None
-                typ = (row.get('category') or '').strip()
-                sev = (row.get('severity') or '').strip()
-                status = (row.get('status') or '').strip()
-                reported = row.get('reported_date') or None
-                resolved = row.get('resolved_date') if pd.notna(row.get('resolved_date')) else None
-
-                if cid is not None:
-                    cur.execute(
-                        "INSERT INTO cyber_incidents (id, type, severity, status, reported_date, resolved_date) VALUES (?, ?, ?, ?, ?, ?)",
-                        (cid, typ, sev, status, reported, resolved)
-                    )
-                else:
-                    cur.execute(
-                        "INSERT INTO cyber_incidents (type, severity, status, reported_date, resolved_date) VALUES (?, ?, ?, ?, ?)",
-                        (typ, sev, status, reported, resolved)
-                    )
-            conn.commit()
+            result = sync_domain("cyber", csv_path)
             st.session_state["cyber_csv_mtime"] = mtime
-            st.success(f"Synced CSV to DB successfully ({time.ctime(mtime)})")
+            if result["errors"]:
+                st.error("Some CSV rows could not be synced. Showing first messages:")
+                for msg in result["errors"][:10]:
+                    st.write(msg)
+            else:
+                st.success(f"Synced CSV to DB successfully ({time.ctime(mtime)})")
         except Exception as e:
-            conn.rollback()
             st.error(f"Failed to sync CSV to DB: {e}")
-        finally:
-            conn.close()
 
-    # --- Fetch all incidents ---
-    incidents = CyberIncident.get_all()
-    df = pd.DataFrame([asdict(i) for i in incidents])
+    # --- Period: a window reads only its own rows through the date index,
+    # plus the archive partitions of any archived month it reaches ---
+    start, end = date_range_filter("cyber_incidents", key="cyber")
+    if start or end:
+        window = st.session_state.setdefault("cyber_window_cache", WindowCache("cyber_incidents"))
+        df = window.refresh(start, end)
+        table_version, version = window.version.table, window.version
+        include_archive = window.version.archive_gen > 0
+        key, aggs = st.session_state.get("cyber_window_aggs", (None, None))
+        if key != version:
+            aggs = incident_aggregates_of(df)
+            st.session_state["cyber_window_aggs"] = (version, aggs)
+    else:
+        # --- Fetch all incidents: cached per session, then only rows changed since ---
+        cache = st.session_state.setdefault("cyber_frame_cache", FrameCache("cyber_incidents"))
+        df = cache.refresh()
+        # --- Aggregates: patched with the same delta, or re-queried concurrently ---
+        if not df.empty:
+            aggs = refresh_incident_aggregates(cache, st.session_state.setdefault("cyber_aggs", {}))
+        # Figures are cached per data version, so the date preparation below
+        # only runs when at least one figure has to be rebuilt.
+        table_version = version = cache.version
+
+        # --- Archived history: hot rows by default, archive partitions on
+        # request (offered even when every incident has been archived) ---
+        include_archive = has_archive(db) and st.sidebar.checkbox(
+            "Include archived history", key="cyber_include_archive"
+        )
+        if include_archive:
+            archive = st.session_state.setdefault("cyber_archive_cache", ArchiveCache("cyber_incidents"))
+            archived = archive.refresh()
+            if not archived.empty:
+                version = (version, archive.generation)
+                key, merged = st.session_state.get("cyber_archive_aggs", (None, None))
+                if key != version:
+                    # Archived rows only add to the counts
+                    merged = (
+                        incident_aggregates_of(archived) if df.empty
+                        else apply_incident_delta(aggs, archived.iloc[0:0], archived)
+                    )
+                    st.session_state["cyber_archive_aggs"] = (version, merged)
+                df = pd.concat([df, archived], ignore_index=True)
+                aggs = merged
 
     if df.empty:
-        st.warning("No incident data available.")
+        st.warning("No incidents in the selected period." if start or end else "No incident data available.")
         return
 
-    st.subheader("All Incidents")
+    st.subheader("Incidents in Period" if start or end else "All Incidents")
     st.dataframe(df)
 
-    # --- Prepare dates ---
-    df["reported_date"] = pd.to_datetime(df["reported_date"], errors="coerce")
-    df = df.dropna(subset=["reported_date"])
-    df["month"] = df["reported_date"].dt.to_period("M").dt.to_timestamp()
+    # --- Export: streamed by the API when it runs, else built (capped) when clicked ---
+    export_button("cyber_incidents", "Download incidents", "cyber_export", len(df), start, end, include_archive)
+    charts = chart_builders(df, aggs)
 
     # --- Incidents over time (monthly) ---
     try:
-        monthly = df.groupby("month").size().reset_index(name="count")
-        if not monthly.empty:
-            if len(monthly) < 2:
-                # Fallback to daily trend when only a single month exists
-                daily = df.groupby(df["reported_date"].dt.date).size().reset_index(name="count")
-                daily.columns = ["date", "count"]
-                fig_time = px.line(daily, x="date", y="count", title="Incidents Over Time (Daily)")
-            else:
-                fig_time = px.line(monthly, x="month", y="count", title="Incidents Over Time (Monthly)")
+        fig_time = cached_figure("cyber.incidents_over_time", version, *charts["cyber.incidents_over_time"])
+        if fig_time is not None:
             st.plotly_chart(fig_time, use_container_width=True)
     except Exception as e:
         st.error(f"Could not plot incidents over time: {e}")
@@ -124,63 +236,48 @@ def dashboard():
     # --- Severity distribution over time ---
     if "severity" in df.columns:
         try:
-            sev_time = df.groupby(["month", "severity"]).size().reset_index(name="count")
-            if not sev_time.empty:
-                if sev_time["month"].nunique() < 2:
-                    # Fallback to daily severity distribution
-                    sev_daily = df.groupby([df["reported_date"].dt.date, "severity"]).size().reset_index(name="count")
-                    sev_daily.columns = ["date", "severity", "count"]
-                    fig_sev = px.area(sev_daily, x="date", y="count", color="severity",
-                                      title="Severity Distribution Over Time (Daily)")
-                else:
-                    fig_sev = px.area(sev_time, x="month", y="count", color="severity",
-                                      title="Severity Distribution Over Time")
+            fig_sev = cached_figure("cyber.severity_over_time", version, *charts["cyber.severity_over_time"])
+            if fig_sev is not None:
                 st.plotly_chart(fig_sev, use_container_width=True)
         except Exception as e:
             st.error(f"Could not plot severity distribution: {e}")
 
     # --- Status breakdown ---
     if "status" in df.columns:
-        status_counts = df["status"].value_counts().reset_index()
-        status_counts.columns = ["Status", "Count"]
-        fig_status = px.pie(status_counts, names="Status", values="Count", title="Incident Status Breakdown")
+        fig_status = cached_figure("cyber.status_breakdown", version, *charts["cyber.status_breakdown"])
         st.plotly_chart(fig_status, use_container_width=True)
 
     # --- Top categories and trends ---
     if "type" in df.columns:
         try:
-            top_categories = df["type"].value_counts().nlargest(5).index.tolist()
-            if top_categories:
-                top_df = df[df["type"].isin(top_categories)]
-                cat_trends = top_df.groupby(["month", "type"]).size().reset_index(name="count")
-                if not cat_trends.empty:
-                    if cat_trends["month"].nunique() < 2:
-                        # Fallback to daily category trends
-                        cat_daily = top_df.groupby([top_df["reported_date"].dt.date, "type"]).size().reset_index(name="count")
-                        cat_daily.columns = ["date", "type", "count"]
-                        fig_cat = px.line(cat_daily, x="date", y="count", color="type",
-                                          title="Top Categories Trends (Daily)")
-                    else:
-                        fig_cat = px.line(cat_trends, x="month", y="count", color="type",
-                                          title="Top Categories Trends")
-                    st.plotly_chart(fig_cat, use_container_width=True)
+            fig_cat = cached_figure("cyber.top_categories", version, *charts["cyber.top_categories"])
+            if fig_cat is not None:
+                st.plotly_chart(fig_cat, use_container_width=True)
         except Exception as e:
             st.error(f"Could not plot top categories trends: {e}")
 
     # --- Severity counts overall ---
     if "severity" in df.columns:
-        severity_counts = df["severity"].value_counts().reset_index()
-        severity_counts.columns = ["Severity", "Count"]
-        fig2 = px.bar(severity_counts, x="Severity", y="Count", title="Incidents by Severity")
+        fig2 = cached_figure("cyber.severity_counts", version, *charts["cyber.severity_counts"])
         st.plotly_chart(fig2, use_container_width=True)
 
     # --- Quick KPIs ---
     col1, col2, col3 = st.columns(3)
-    col1.metric("Total Incidents", int(len(df)))
-    critical_count = int((df["severity"].str.lower() == "critical").sum()) if "severity" in df.columns else 0
-    col2.metric("Critical Incidents", critical_count)
-    open_count = int((df["status"].str.lower() == "open").sum()) if "status" in df.columns else 0
-    col3.metric("Open Incidents", open_count)
+    kpis = aggs["kpis"][0]
+    col1.metric("Total Incidents", int(kpis["total"]))
+    col2.metric("Critical Incidents", int(kpis["critical"]))
+    col3.metric("Open Incidents", int(kpis["open"]))
+
+    # --- Anomalies: days flagged at ingest by the streaming detectors ---
+    st.subheader("Anomalies")
+    anomaly_version, anomalies = st.session_state.get("cyber_anomalies", (None, None))
+    if anomaly_version != table_version:
+        anomalies = get_anomalies("cyber_incidents")
+        st.session_state["cyber_anomalies"] = (table_version, anomalies)
+    if anomalies.empty:
+        st.info(f"No unusual daily volumes in the last {ANOMALY_WINDOW_DAYS} days of data.")
+    else:
+        st.dataframe(anomalies, hide_index=True)
 
     st.success("Dashboard updated from CSV and database automatically.")
 
@@ -188,6 +285,11 @@ def dashboard():
     with st.expander("AI Assistant — ask for security advice or explain statistics"):
         st.write("Ask a question like: 'Which categories increased in the last 3 months?' or 'How to prioritise critical incidents?'")
         user_input = st.text_area("Your question", value="", height=120)
+        # Precomputed summary of the data shown above; rebuilt only when it changes
+        context = incident_context(version, aggs)
+        attach = st.checkbox(
+            f"Attach incident summary (~{estimate_tokens(context)} tokens)", value=True, key="cyber_ai_context",
+        )
         ask_btn = st.button("Ask AI")
         if ask_btn and user_input.strip():
             with st.spinner("Contacting AI assistant..."):
@@ -195,15 +297,24 @@ def dashboard():
                     system_prompt = (
                         "You are a concise cybersecurity analyst. Provide practical, safety-minded guidance. "
                         "When giving recommendations, be explicit about steps and risk considerations. "
-                        "If asked about data, explain how to compute the metric from incident records."
+                        "If asked about data, answer from the incident data summary when one is given, "
+                        "otherwise explain how to compute the metric from incident records."
                     )
                     messages = [
                         {"role": "system", "content": system_prompt},
                         {"role": "user", "content": user_input},
                     ]
-                    reply = chat_completion(messages)
+                    if attach:
+                        messages = with_context(messages, context)
+                    # Shared, rate-limited queue; identical questions are answered once
+                    ticket = ai_scheduler.submit(st.session_state.get("username") or "anonymous", messages)
+                    waiting = st.empty()
+                    reply = wait_for(ticket, lambda pos: waiting.info(f"Waiting for the AI assistant: position {pos} in queue"))
+                    waiting.empty()
                     st.markdown("**AI Assistant:**")
                     st.write(reply)
+                except BudgetExhausted as e:
+                    st.error(f"Daily AI budget reached. Please try again tomorrow. ({e})")
                 except AIServiceError as e:
                     if "quota" in str(e).lower():
                         st.error("Daily AI quota reached. Please try again tomorrow.")
@@ -8,17 +8,67 @@ The dashboard reads `data/datasets.csv` and synchronises it into the`datasets` t
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from dataclasses import asdict
-from models.dataset import Dataset
+from services.frame_service import FrameCache, WindowCache
+from services.figure_cache import cached_figure, warm_figures
+from services.governance_service import (
+    count_archive_candidates, get_archive_candidates, get_category_totals, get_thresholds, set_thresholds,
+)
+from services.sync_service import sync_domain
+from Dashboards.export import export_button
+from Dashboards.filters import date_range_filter
 import os
 import time
 
+CSV_PATH = "data/datasets.csv"
+
+
+def chart_builders(df):
+    """Figure builders by chart id: {chart_id: (params, build)}.
+
+    Used by the dashboard and by the post-login warm-up (`warm()`), so both
+    fill the same figure cache entries.
+    """
+    def build_size_by_source():
+        size_by_source = df.groupby("source")["size_mb"].sum().reset_index()
+        return px.bar(size_by_source, x="source", y="size_mb", title="Total Dataset Size by Source (MB)")
+
+    return {
+        "ds.size_by_source": (None, build_size_by_source),
+        "ds.size_vs_rows": (
+            None,
+            lambda: px.scatter(df, x="rows", y="size_mb", size="size_mb", color="source",
+                               title="Dataset Size vs Rows"),
+        ),
+    }
+
+
+def warm():
+    """Do a first render's data work off the script thread.
+
+    Syncs the CSV, loads the frame and builds the figures, and returns the
+    session-state entries the dashboard would have created (see
+    `services/warmup_service.py`).
+    """
+    state = {}
+    try:
+        mtime = os.path.getmtime(CSV_PATH)
+    except Exception:
+        mtime = None
+    # On sync errors the mtime is left out, so the dashboard syncs again
+    # and shows them.
+    if mtime and not sync_domain("datasets", CSV_PATH)["errors"]:
+        state["datasets_csv_mtime"] = mtime
+    cache = state["datasets_frame_cache"] = FrameCache("datasets")
+    if not cache.refresh().empty:
+        warm_figures(chart_builders(cache.frame), cache.version)
+    return state
+
 
 def dashboard():
     st.title("Data Science Governance Dashboard")
 
     # --- Auto-sync CSV to DB when file changed since last sync ---
-    csv_path = "data/datasets.csv"
+    csv_path = CSV_PATH
     try:
         mtime = os.path.getmtime(csv_path)
     except Exception:
@@ -26,38 +76,11 @@ def dashboard():
 
     prev_mtime = st.session_state.get("datasets_csv_mtime")
     if mtime and (prev_mtime is None or mtime > prev_mtime):
-        df_csv = pd.read_csv(csv_path)
-        save_errors = []
-        ids_in_csv = []
-        for idx, row in df_csv.iterrows():
-            try:
-                row_id = int(row.id) if "id" in row.index and pd.notna(row.id) else None
-                ds = Dataset(
-                    id=row_id,
-                    dataset_name=row.get("dataset_name") or row.get("name") or "",
-                    source=row.get("source") or "",
-                    size_mb=float(row.get("size_mb") or 0.0),
-                    rows=int(row.get("rows") or 0),
-                    upload_date=row.get("upload_date") or None,
-                )
-                ds.save()
-                if row_id is not None:
-                    ids_in_csv.append(row_id)
-            except Exception as e:
-                save_errors.append(f"row {idx}: {e}")
-
-        # If CSV provided ids, remove DB rows whose id is not present in the CSV
-        if ids_in_csv:
-            db = Dataset.__module__  # avoid lint; we'll get DatabaseManager below
-            from database.db_manager import DatabaseManager
-            dbm = DatabaseManager()
-            # Build parameter placeholders safely
-            placeholders = ",".join(["?" for _ in ids_in_csv])
-            try:
-                dbm.execute(f"DELETE FROM datasets WHERE id NOT IN ({placeholders})", tuple(ids_in_csv))
-            except Exception:
-                # In case of unexpected schema, ignore and continue
-                pass
+        # Only rows that differ from the DB are written (and journaled)
+        try:
+            save_errors = sync_domain("datasets", csv_path)["errors"]
+        except Exception as e:
+            save_errors = [str(e)]
 
         st.session_state["datasets_csv_mtime"] = mtime
         if save_errors:
@@ -67,22 +90,61 @@ def dashboard():
         else:
             st.success(f"Synced CSV to DB ({time.ctime(mtime)})")
 
-    # --- Fetch latest data from model ---
-    datasets = Dataset.get_all()
-    df = pd.DataFrame([asdict(d) for d in datasets])
+    # --- Upload period: a window reads only its own rows through the date index ---
+    start, end = date_range_filter("datasets", key="datasets", label="Upload period")
+    if start or end:
+        cache = st.session_state.setdefault("datasets_window_cache", WindowCache("datasets"))
+        df = cache.refresh(start, end)
+    else:
+        # --- Fetch latest data: cached per session, then only rows changed since ---
+        cache = st.session_state.setdefault("datasets_frame_cache", FrameCache("datasets"))
+        df = cache.refresh()
 
     st.subheader("Dataset Inventory")
     st.dataframe(df)
 
+    # --- Export: streamed by the API when it runs, else built (capped) when clicked ---
+    export_button("datasets", "Download datasets", "datasets_export", len(df), start, end)
+
     # --- Total Size by Source ---
     if not df.empty:
-        size_by_source = df.groupby("source")["size_mb"].sum().reset_index()
-        fig1 = px.bar(size_by_source, x="source", y="size_mb", title="Total Dataset Size by Source (MB)")
+        charts = chart_builders(df)
+        fig1 = cached_figure("ds.size_by_source", cache.version, *charts["ds.size_by_source"])
         st.plotly_chart(fig1, use_container_width=True)
 
         # --- Dataset Size vs Rows ---
-        fig2 = px.scatter(df, x="rows", y="size_mb", size="size_mb", color="source",
-                          title="Dataset Size vs Rows")
+        fig2 = cached_figure("ds.size_vs_rows", cache.version, *charts["ds.size_vs_rows"])
         st.plotly_chart(fig2, use_container_width=True)
 
+    # --- Governance: stored classes, counted and paged in SQLite ---
+    st.subheader("Governance")
+    thresholds = get_thresholds()
+    with st.expander("Classification thresholds"):
+        with st.form("governance_thresholds"):
+            small = st.number_input("Small below (MB)", min_value=0.0, value=float(thresholds["small_max_mb"]))
+            medium = st.number_input("Medium below (MB)", min_value=0.0, value=float(thresholds["medium_max_mb"]))
+            archive_mb = st.number_input("Archive above (MB)", min_value=0.0, value=float(thresholds["archive_min_mb"]))
+            archive_rows = st.number_input("Archive below (rows)", min_value=0, value=int(thresholds["archive_max_rows"]))
+            if st.form_submit_button("Apply"):
+                try:
+                    changed = set_thresholds(
+                        small_max_mb=small, medium_max_mb=medium,
+                        archive_min_mb=archive_mb, archive_max_rows=int(archive_rows),
+                    )
+                    st.success(f"Thresholds updated; {changed} dataset(s) reclassified.")
+                except ValueError as e:
+                    st.error(str(e))
+
+    totals = get_category_totals()
+    cols = st.columns(len(totals) + 1)
+    for col, row in zip(cols, totals):
+        col.metric(f"{row['size_category']} datasets", row["datasets"], f"{row['size_mb']:,.0f} MB", delta_color="off")
+    candidates = count_archive_candidates()
+    cols[-1].metric("Archive candidates", candidates)
+    if candidates:
+        page_size = 25
+        pages = (candidates + page_size - 1) // page_size
+        page = st.number_input("Archive candidates page", min_value=1, max_value=pages, value=1) if pages > 1 else 1
+        st.dataframe(pd.DataFrame([vars(d) for d in get_archive_candidates(page, page_size)]))
+
     st.success("Dashboard updated from CSV and database automatically.")
@@ -8,17 +8,110 @@ Displays service desk KPIs and visualisations sourced from
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from dataclasses import asdict
-from models.it_ticket import ITTicket
+from services.frame_service import FrameCache, WindowCache, WindowVersion
+from services.archive_service import ArchiveCache
+from services.figure_cache import cached_figure, warm_figures
+from database.archive import has_archive
+from services.kpi_service import get_ticket_kpis
+from services.it_service import ticket_kpis_of
+from services.anomaly_service import ANOMALY_WINDOW_DAYS, get_anomalies
+from services.sync_service import sync_domain
+from database.db_manager import DatabaseManager
+from Dashboards.export import export_button
+from Dashboards.filters import date_range_filter
 import os
 import time
 
+CSV_PATH = "data/it_tickets.csv"
+TOP_STAFF = 20  # bars in "Tickets Handled per Staff"
+
+
+def add_resolution_days(df):
+    """Parse the ticket dates of `df` in place and add `resolution_days`."""
+    df["opened_date"] = pd.to_datetime(df["opened_date"])
+    df["closed_date"] = pd.to_datetime(df["closed_date"])
+    df["resolution_days"] = (df["closed_date"] - df["opened_date"]).dt.days
+
+
+def chart_builders(df):
+    """Figure builders by chart id: {chart_id: (params, build)}.
+
+    `df` has gone through `add_resolution_days`. Used by the dashboard and
+    by the post-login warm-up (`warm()`), so both fill the same figure
+    cache entries.
+    """
+    def build_status_delay():
+        status_delay = df.groupby("status")["resolution_days"].mean().reset_index()
+        return px.bar(
+            status_delay,
+            x="status",
+            y="resolution_days",
+            title="Average Resolution Time by Status"
+        )
+
+    def build_staff():
+        counts = df["staff"].value_counts()
+        staff_count = counts.head(TOP_STAFF).reset_index()
+        staff_count.columns = ["Staff", "Tickets"]
+        title = "Tickets Handled per Staff"
+        return px.bar(
+            staff_count,
+            x="Staff",
+            y="Tickets",
+            title=title if len(counts) <= TOP_STAFF else f"{title} (top {TOP_STAFF})"
+        )
+
+    def build_trend():
+        opened_month = df["opened_date"].dt.to_period("M").dt.to_timestamp()
+        monthly_tickets = df.groupby(opened_month).size().reset_index(name="count")
+        monthly_tickets.columns = ["opened_month", "count"]
+        if monthly_tickets.empty:
+            return None
+        return px.line(monthly_tickets, x="opened_month", y="count", title="Tickets Opened Over Time (Monthly)")
+
+    def build_histogram():
+        res_dist = df[~df["resolution_days"].isna()]["resolution_days"]
+        return px.histogram(res_dist, nbins=30, title="Resolution Time Distribution (days)")
+
+    return {
+        "it.resolution_by_status": (None, build_status_delay),
+        "it.tickets_per_staff": ({"top": TOP_STAFF}, build_staff),
+        "it.opened_over_time": (None, build_trend),
+        "it.resolution_histogram": ({"nbins": 30}, build_histogram),
+    }
+
+
+def warm():
+    """Do a first render's data work off the script thread.
+
+    Syncs the CSV, loads the frame and KPIs and builds the figures, and
+    returns the session-state entries the dashboard would have created
+    (see `services/warmup_service.py`).
+    """
+    state = {}
+    try:
+        mtime = os.path.getmtime(CSV_PATH)
+    except Exception:
+        mtime = None
+    # On sync errors the mtime is left out, so the dashboard syncs again
+    # and shows them.
+    if mtime and not sync_domain("it", CSV_PATH)["errors"]:
+        state["it_csv_mtime"] = mtime
+    cache = state["it_frame_cache"] = FrameCache("it_tickets")
+    df = cache.refresh().copy(deep=False)
+    if df.empty:
+        return state
+    state["it_kpis"] = (WindowVersion(cache.version, None, None, 0), get_ticket_kpis())
+    add_resolution_days(df)
+    warm_figures(chart_builders(df), cache.version)
+    return state
+
 
 def dashboard():
     st.title("IT Operations Performance Dashboard")
 
     # --- Auto-sync CSV to DB when file changed since last sync ---
-    csv_path = "data/it_tickets.csv"
+    csv_path = CSV_PATH
     try:
         mtime = os.path.getmtime(csv_path)
     except Exception:
@@ -26,39 +119,11 @@ def dashboard():
 
     prev_mtime = st.session_state.get("it_csv_mtime")
     if mtime and (prev_mtime is None or mtime > prev_mtime):
-        df_csv = pd.read_csv(csv_path)
-        save_errors = []
-        ids_in_csv = []
-        for idx, row in df_csv.iterrows():
-            try:
-                closed_date = row.closed_date if pd.notna(row.closed_date) else None
-            except Exception:
-                closed_date = None
-            try:
-                row_id = int(row.id) if "id" in row.index and pd.notna(row.id) else None
-                ticket = ITTicket(
-                    id=row_id,
-                    staff=row.get("staff") or "",
-                    status=row.get("status") or "",
-                    category=row.get("category") or "",
-                    opened_date=row.get("opened_date") or None,
-                    closed_date=closed_date,
-                )
-                ticket.save()
-                if row_id is not None:
-                    ids_in_csv.append(row_id)
-            except Exception as e:
-                save_errors.append(f"row {idx}: {e}")
-
-        # If CSV provided ids, remove DB rows whose id is not present in the CSV
-        if ids_in_csv:
-            from database.db_manager import DatabaseManager
-            dbm = DatabaseManager()
-            placeholders = ",".join(["?" for _ in ids_in_csv])
-            try:
-                dbm.execute(f"DELETE FROM it_tickets WHERE id NOT IN ({placeholders})", tuple(ids_in_csv))
-            except Exception:
-                pass
+        # Only rows that differ from the DB are written (and journaled)
+        try:
+            save_errors = sync_domain("it", csv_path)["errors"]
+        except Exception as e:
+            save_errors = [str(e)]
 
         st.session_state["it_csv_mtime"] = mtime
         if save_errors:
@@ -68,52 +133,88 @@ def dashboard():
         else:
             st.success(f"Synced CSV to DB ({time.ctime(mtime)})")
 
-    # --- Fetch latest data from model ---
-    tickets = ITTicket.get_all()
-    df = pd.DataFrame([asdict(t) for t in tickets])
+    # --- Period: a window reads only its own rows through the date index,
+    # plus the archive partitions of any archived month it reaches ---
+    start, end = date_range_filter("it_tickets", key="it")
+    if start or end:
+        window = st.session_state.setdefault("it_window_cache", WindowCache("it_tickets"))
+        df = window.refresh(start, end).copy(deep=False)
+        table_version, version = window.version.table, window.version
+        include_archive = window.version.archive_gen > 0
+        kpi_version = version
+    else:
+        # --- Fetch latest data: cached per session, then only rows changed since ---
+        cache = st.session_state.setdefault("it_frame_cache", FrameCache("it_tickets"))
+        df = cache.refresh().copy(deep=False)
+        table_version = version = cache.version
+        # All-time KPIs count hot rows only, as get_ticket_kpis() does
+        kpi_version = WindowVersion(table_version, None, None, 0)
+
+        # --- Archived history: hot rows by default, archive partitions on request ---
+        include_archive = has_archive(DatabaseManager()) and st.sidebar.checkbox(
+            "Include archived history", key="it_include_archive"
+        )
+        if include_archive:
+            archive = st.session_state.setdefault("it_archive_cache", ArchiveCache("it_tickets"))
+            archived = archive.refresh()
+            if not archived.empty:
+                df = pd.concat([df, archived], ignore_index=True)
+                version = (version, archive.generation)
 
     if df.empty:
-        st.warning("No tickets data available.")
+        st.warning("No tickets in the selected period." if start or end else "No tickets data available.")
         return
 
+    # --- Ticket KPIs: indexed counts, re-queried only when the data changes ---
+    cached_version, kpis = st.session_state.get("it_kpis", (None, None))
+    if cached_version != kpi_version:
+        # A window's KPIs are counted on its already loaded rows
+        kpis = ticket_kpis_of(df) if start or end else get_ticket_kpis()
+        st.session_state["it_kpis"] = (kpi_version, kpis)
+    kpi_cols = st.columns(3)
+    kpi_cols[0].metric("Total Tickets", int(kpis["total"]))
+    kpi_cols[1].metric("Open Tickets", int(kpis["open"]))
+    kpi_cols[2].metric("In Progress", int(kpis["in_progress"]))
+
+    # --- Anomalies: days flagged at ingest by the streaming detectors ---
+    st.subheader("Anomalies")
+    anomaly_version, anomalies = st.session_state.get("it_anomalies", (None, None))
+    if anomaly_version != table_version:
+        anomalies = get_anomalies("it_tickets")
+        st.session_state["it_anomalies"] = (table_version, anomalies)
+    if anomalies.empty:
+        st.info(f"No unusual daily volumes in the last {ANOMALY_WINDOW_DAYS} days of data.")
+    else:
+        st.dataframe(anomalies, hide_index=True)
+
     st.subheader("Service Desk Tickets")
     st.dataframe(df)
 
+    # --- Export: streamed by the API when it runs, else built (capped) when clicked ---
+    export_button("it_tickets", "Download tickets", "it_export", len(df), start, end, include_archive)
+
     # --- Resolution time ---
-    df["opened_date"] = pd.to_datetime(df["opened_date"])
-    df["closed_date"] = pd.to_datetime(df["closed_date"])
-    df["resolution_days"] = (df["closed_date"] - df["opened_date"]).dt.days
+    add_resolution_days(df)
+
+    # Figures are cached per data version (`version` above); a warm rerun
+    # skips the grouping and Plotly Express work inside each builder.
+    charts = chart_builders(df)
 
     # --- Average resolution by status ---
-    status_delay = df.groupby("status")["resolution_days"].mean().reset_index()
-    fig1 = px.bar(
-        status_delay,
-        x="status",
-        y="resolution_days",
-        title="Average Resolution Time by Status"
-    )
+    fig1 = cached_figure("it.resolution_by_status", version, *charts["it.resolution_by_status"])
     st.plotly_chart(fig1, use_container_width=True)
 
     # --- Tickets per staff ---
-    staff_count = df["staff"].value_counts().reset_index()
-    staff_count.columns = ["Staff", "Tickets"]
-    fig2 = px.bar(
-        staff_count,
-        x="Staff",
-        y="Tickets",
-        title="Tickets Handled per Staff"
-    )
+    fig2 = cached_figure("it.tickets_per_staff", version, *charts["it.tickets_per_staff"])
     st.plotly_chart(fig2, use_container_width=True)
 
     # --- Tickets trend over time (monthly) ---
     if "opened_date" in df.columns:
         try:
-            df["opened_month"] = df["opened_date"].dt.to_period("M").dt.to_timestamp()
-            monthly_tickets = df.groupby("opened_month").size().reset_index(name="count")
-            if monthly_tickets.empty:
+            fig_trend = cached_figure("it.opened_over_time", version, *charts["it.opened_over_time"])
+            if fig_trend is None:
                 st.info("No ticket opening data to plot over time.")
             else:
-                fig_trend = px.line(monthly_tickets, x="opened_month", y="count", title="Tickets Opened Over Time (Monthly)")
                 st.plotly_chart(fig_trend, use_container_width=True)
         except Exception as e:
             st.error(f"Could not plot tickets over time: {e}")
@@ -123,7 +224,7 @@ def dashboard():
     # --- Resolution time distribution ---
     res_dist = df[~df["resolution_days"].isna()]["resolution_days"]
     if not res_dist.empty:
-        fig_hist = px.histogram(res_dist, nbins=30, title="Resolution Time Distribution (days)")
+        fig_hist = cached_figure("it.resolution_histogram", version, *charts["it.resolution_histogram"])
         st.plotly_chart(fig_hist, use_container_width=True)
 
     # --- SLA compliance (example SLA: resolution within 7 days) ---
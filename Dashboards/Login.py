@@ -9,7 +9,12 @@ import bcrypt
 from services.user_service import get_user_by_username, create_user
 
 
-def login_form():
+def login_form(on_login=None):
+    """Render the login and registration forms.
+
+    `on_login(username, role)` is called right after a successful login,
+    e.g. to start warming the user's dashboards.
+    """
     st.subheader("Login Page")
 
     # --- LOGIN FORM ---
@@ -27,6 +32,8 @@ def login_form():
                 st.session_state.logged_in = True
                 st.session_state.username = username
                 st.session_state.role = user.role
+                if on_login is not None:
+                    on_login(username, user.role)
                 st.success(f"Welcome, {username}!")
             else:
                 st.error("Incorrect password")
@@ -0,0 +1,52 @@
+"""
+Export widget shared by the dashboards.
+
+`export_button()` offers the rows of the dashboard's period in each export
+format. When the app serves the JSON API (`APP_API_PORT`, see app.py) the
+button links to its streamed `/api/<resource>/export`, so the browser
+downloads the file as it is encoded and the Streamlit process never holds
+it. Otherwise the export is built in memory when the button is clicked and
+is capped at EXPORT_MEMORY_ROWS rows, which the widget says when the period
+holds more.
+"""
+
+from typing import Optional
+
+import streamlit as st
+
+from services.api_service import export_url
+from services.export_service import EXPORT_FORMATS, EXPORT_MEMORY_ROWS, export_bytes, export_filename
+
+
+def export_button(
+    table: str,
+    label: str,
+    key: str,
+    rows: int,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    include_archive: bool = False,
+):
+    """Render the format choice and the download for `rows` matching rows of `table`.
+
+    `key` prefixes the widget keys, so each dashboard keeps its own choice.
+    """
+    export_format = st.selectbox("Export format", list(EXPORT_FORMATS), key=f"{key}_format")
+    url = export_url(table, export_format, start, end, include_archive)
+    if url:
+        st.link_button(label, url)
+        return
+    st.download_button(
+        label,
+        data=lambda: export_bytes(
+            table, export_format, start=start, end=end, include_archive=include_archive
+        ),
+        file_name=export_filename(table, export_format, start, end),
+        mime=EXPORT_FORMATS[export_format].mime,
+        key=key,
+    )
+    if rows > EXPORT_MEMORY_ROWS:
+        st.caption(
+            f"The download holds the first {EXPORT_MEMORY_ROWS:,} of {rows:,} rows. "
+            "Run the app with APP_API_PORT set, or use scripts/export.py, for the full export."
+        )
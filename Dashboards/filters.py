@@ -0,0 +1,53 @@
+"""
+Sidebar date-range filter shared by the dashboards.
+
+`date_range_filter()` offers the whole history, the last 7/30/90 days of
+data or a custom range, and returns ISO (start, end) dates for the
+indexed range queries (`database/ranges.py`). "Last N days" counts back
+from the newest record rather than from today, so historical CSVs still
+show something. The bounds include archived records, so a period can
+still reach them once the hot table has been emptied by archiving.
+"""
+
+from datetime import date, timedelta
+from typing import Optional, Tuple
+
+import streamlit as st
+
+from database.archive import archived_bounds
+from database.ranges import date_bounds
+
+ALL_TIME = "All time"
+CUSTOM = "Custom range"
+PERIODS = {ALL_TIME: None, "Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90, CUSTOM: None}
+
+
+def date_range_filter(table: str, key: str, label: str = "Period") -> Tuple[Optional[str], Optional[str]]:
+    """Render the filter for `table`; (None, None) means no filter.
+
+    `key` prefixes the widget keys, so each dashboard keeps its own choice.
+    """
+    bounds = list(zip(date_bounds(table), archived_bounds(table)))
+    first = min((d for d in bounds[0] if d), default=None)
+    last = max((d for d in bounds[1] if d), default=None)
+    if not first or not last:
+        return None, None
+    try:
+        first, last = date.fromisoformat(first), date.fromisoformat(last)
+    except ValueError:
+        return None, None
+    period = st.sidebar.selectbox(label, list(PERIODS), key=f"{key}_period")
+    if period == ALL_TIME:
+        return None, None
+    if period == CUSTOM:
+        picked = st.sidebar.date_input(
+            "Dates", value=(max(first, last - timedelta(days=29)), last),
+            min_value=first, max_value=last, key=f"{key}_dates",
+        )
+        picked = list(picked) if isinstance(picked, (tuple, list)) else [picked]
+        if not picked:
+            return None, None
+        # While only the first date is picked the range is open-ended
+        start, end = picked[0], picked[1] if len(picked) > 1 else None
+        return start.isoformat(), end.isoformat() if end else None
+    return (last - timedelta(days=PERIODS[period] - 1)).isoformat(), last.isoformat()
@@ -0,0 +1,37 @@
+# to run the API, use the command: python api.py
+"""
+Read-only JSON API process for the Multi-Domain Intelligence Platform.
+
+Serves the dashboards' data to other tools (see `services/api_service.py`
+for the endpoints). Authenticate with the same username and password as
+the Streamlit app.
+"""
+from dotenv import load_dotenv
+load_dotenv()
+
+import argparse
+import os
+from database.replica import enable_read_replica
+from services.api_service import API_HOST, API_PORT, make_server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the dashboard data as a read-only JSON API")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    args = parser.parse_args(argv)
+    # Optional: serve reads from an in-memory copy of app.db, as in app.py
+    if os.getenv("APP_READ_REPLICA", "").lower() in ("1", "true", "yes"):
+        enable_read_replica("data/app.db")
+    server = make_server(args.host, args.port)
+    print(f"Serving the JSON API on http://{args.host}:{args.port}/api")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,27 @@ Main Streamlit launcher for the Multi-Domain Intelligence Platform.
 from dotenv import load_dotenv
 load_dotenv()
 
+import os
 import streamlit as st
+from database.replica import enable_read_replica
+from services.user_service import ROLE_DASHBOARDS
+from services.warmup_service import adopt_warmup, start_warmup
+
+# Optional: serve dashboard reads from an in-memory copy of app.db
+if os.getenv("APP_READ_REPLICA", "").lower() in ("1", "true", "yes"):
+    enable_read_replica("data/app.db")
+
+# Optional: serve the JSON API from this process, sharing its frames and caches
+if os.getenv("APP_API_PORT"):
+    from services.api_service import start_api_server
+    start_api_server(port=int(os.getenv("APP_API_PORT")))
+
+def dashboards_for(role):
+    """Return {dashboard name: module} for the dashboards `role` can open."""
+    from Dashboards import Cybersecurity, Data_Science, IT_Operations
+    modules = {"Cybersecurity": Cybersecurity, "Data Science": Data_Science, "IT Operations": IT_Operations}
+    return {name: modules[name] for name in ROLE_DASHBOARDS.get(role.lower(), [])}
+
 
 # Set page config
 st.set_page_config(page_title="Multi-Domain Intelligence Platform", layout="wide")
@@ -25,34 +45,24 @@ st.sidebar.title("Navigation")
 if not st.session_state.logged_in:
     st.header(" Login")
     from Dashboards.Login import login_form
-    login_form()
+    # Prefetch the role's dashboards while the user is still on this page
+    login_form(on_login=lambda username, role: start_warmup(
+        st.session_state, {name: module.warm for name, module in dashboards_for(role).items()}
+    ))
 else:
     role = st.session_state.role.lower()
     st.sidebar.write(f"Logged in as: {st.session_state.username} ({st.session_state.role})")
 
     # --- Determine available pages ---
-    Dashboards = {}
-    from Dashboards.Cybersecurity import dashboard as cyber_dash
-    from Dashboards.Data_Science import dashboard as ds_dash
-    from Dashboards.IT_Operations import dashboard as it_dash
-
+    Dashboards = {name: module.dashboard for name, module in dashboards_for(role).items()}
     if role == "admin":
-        # Admin sees all dashboards
-        Dashboards["Cybersecurity"] = cyber_dash
-        Dashboards["Data Science"] = ds_dash
-        Dashboards["IT Operations"] = it_dash
         st.sidebar.info(" Admin Mode: Access to all dashboards")
-    elif role == "cybersecurity":
-        Dashboards["Cybersecurity"] = cyber_dash
-    elif role == "data science":
-        Dashboards["Data Science"] = ds_dash
-    elif role == "it operations":
-        Dashboards["IT Operations"] = it_dash
 
     # --- Sidebar selectbox ---
     if Dashboards:
         dashboard_names = list(Dashboards.keys())
         selected = st.sidebar.selectbox("Go to Dashboard", dashboard_names, index=0)
+        adopt_warmup(st.session_state, selected)
         Dashboards[selected]()  # call the selected dashboard
     else:
         st.sidebar.info("No dashboards available for your role. Please contact an admin or log out.")
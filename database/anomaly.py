@@ -0,0 +1,441 @@
+"""
+Streaming anomaly detection on daily incident and ticket counts.
+
+Every series (all incidents, incidents of one type, of one severity,
+tickets of one category) keeps a small state row in `anomaly_series`:
+the day currently being counted, its count so far, and an exponentially
+weighted mean and variance of the earlier daily counts. A new record
+only touches the state of its own series, so ingesting it is O(1) work,
+and nothing is ever recomputed from the full history.
+
+The detector is a consumer of the change journal (`database/versioning.py`):
+`update_detectors()` reads the INSERT entries since the last version it
+saw (`anomaly_cursor`) and runs inside the sync's write transaction, so
+the state and the data are committed together. Its first run seeds the
+state once from the rows already in the table.
+
+Deletes and edits cannot be subtracted from an EWMA, and a re-sync that
+deletes rows and inserts them again under new ids would otherwise count
+them twice. So `anomaly_daily` also keeps the exact count of every
+series and day, and triggers record in `anomaly_dirty_days` the days a
+delete or an edit of a date or series column touched. When there are
+any, those days are recounted from the rows that exist (hot and, when
+attached, archived) and every series of the table is replayed from its
+daily counts, which costs one row per series and day, not a table scan.
+
+A day is flagged in `anomalies` when its count is at least MIN_COUNT and
+more than Z_THRESHOLD standard deviations above the series' baseline,
+once the baseline has MIN_DAYS of history. The current day is checked as
+it fills up, so a spike shows up before the day is over.
+
+Records that arrive for a day older than the series' current day cannot
+change a baseline already folded in; they are counted in `late` instead.
+"""
+
+import math
+from collections import Counter
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from database.archive import SCHEMA as ARCHIVE_SCHEMA, overlapping_partitions
+from database.batch import chunks
+from database.db_manager import DatabaseManager
+from database.ranges import where_date_range
+from database.storage import CATEGORICAL_COLUMNS, is_normalized, storage_table
+from database.versioning import changed_row_ids
+
+ALPHA = 0.1             # EWMA weight of the newest day
+Z_THRESHOLD = 3.0
+MIN_DAYS = 7            # days of history before anything is flagged
+MIN_COUNT = 3           # ignore "spikes" of one or two records
+MAX_GAP_DAYS = 60       # after this many empty days the baseline is ~0 anyway
+
+# logical table -> (date column, columns that define per-value series)
+DETECTORS = {
+    "cyber_incidents": ("reported_date", ("type", "severity")),
+    "it_tickets": ("opened_date", ("category",)),
+}
+
+
+def ensure_anomaly_tables(conn) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS anomaly_series (
+            series TEXT PRIMARY KEY,
+            table_name TEXT NOT NULL,
+            day TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            mean REAL NOT NULL DEFAULT 0,
+            var REAL NOT NULL DEFAULT 0,
+            days INTEGER NOT NULL DEFAULT 0,
+            late INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS anomalies (
+            series TEXT NOT NULL,
+            table_name TEXT NOT NULL,
+            day TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            expected REAL NOT NULL,
+            z REAL NOT NULL,
+            detected_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+            PRIMARY KEY (series, day)
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_anomalies_table_day ON anomalies (table_name, day)")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS anomaly_cursor (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS anomaly_daily (
+            series TEXT NOT NULL,
+            table_name TEXT NOT NULL,
+            day TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (series, day)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_anomaly_daily_table_day ON anomaly_daily (table_name, day)")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS anomaly_dirty_days (
+            table_name TEXT NOT NULL,
+            day TEXT NOT NULL,
+            PRIMARY KEY (table_name, day)
+        ) WITHOUT ROWID
+        """
+    )
+    for table in DETECTORS:
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (table,)).fetchone():
+            _ensure_triggers(conn, table)
+
+
+def _dirty_sql(table: str, ref: str) -> str:
+    date_col, _ = DETECTORS[table]
+    return (
+        f"INSERT OR IGNORE INTO anomaly_dirty_days (table_name, day) "
+        f"SELECT '{table}', substr({ref}.{date_col}, 1, 10) WHERE {ref}.{date_col} IS NOT NULL;"
+    )
+
+
+def _ensure_triggers(conn, table: str) -> None:
+    """Record the days deletes and edits of `table` touch in `anomaly_dirty_days`."""
+    if conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = ?", (f"{table}_anomaly_delete",)
+    ).fetchone():
+        return
+    date_col, columns = DETECTORS[table]
+    source = storage_table(conn, table)
+    if is_normalized(conn, table):
+        columns = tuple(f"{c}_id" if c in CATEGORICAL_COLUMNS[table] else c for c in columns)
+    changed = " OR ".join(f"OLD.{c} IS NOT NEW.{c}" for c in (date_col,) + columns)
+    conn.execute(
+        f"""
+        CREATE TRIGGER {table}_anomaly_delete AFTER DELETE ON {source}
+        BEGIN {_dirty_sql(table, "OLD")} END
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER {table}_anomaly_update AFTER UPDATE ON {source}
+        WHEN {changed}
+        BEGIN {_dirty_sql(table, "OLD")} {_dirty_sql(table, "NEW")} END
+        """
+    )
+    # New triggers (first run, or a storage layout switch rebuilt the
+    # table): changes made without them cannot be traced, so re-seed.
+    conn.execute("DELETE FROM anomaly_cursor WHERE table_name = ?", (table,))
+
+
+def series_keys(table: str, row) -> List[str]:
+    """`series_keys("it_tickets", {"category": "Email"})` -> ["it_tickets", "it_tickets.category=Email"]."""
+    _, columns = DETECTORS[table]
+    keys = [table]
+    for col in columns:
+        if row[col]:
+            keys.append(f"{table}.{col}={row[col]}")
+    return keys
+
+
+def _day(value) -> Optional[date]:
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except (TypeError, ValueError):
+        return None
+
+
+class SeriesState:
+    """
+    EWMA baseline of one series plus the count of its current day.
+    """
+
+    __slots__ = ("series", "table", "day", "count", "mean", "var", "days", "late")
+
+    def __init__(self, series: str, table: str, day: date, count=0, mean=0.0, var=0.0, days=0, late=0):
+        self.series = series
+        self.table = table
+        self.day = day
+        self.count = count
+        self.mean = mean
+        self.var = var
+        self.days = days
+        self.late = late
+
+    def _fold(self, value: int) -> None:
+        # West's incremental form of the exponentially weighted variance
+        if self.days == 0:
+            self.mean, self.var = float(value), 0.0
+        else:
+            diff = value - self.mean
+            incr = ALPHA * diff
+            self.mean += incr
+            self.var = (1 - ALPHA) * (self.var + diff * incr)
+        self.days += 1
+
+    def z(self) -> float:
+        """Standard score of the current day's count against the baseline."""
+        # Floor the deviation at 1: a flat history has zero variance
+        sd = max(math.sqrt(self.var), 1.0)
+        return (self.count - self.mean) / sd
+
+    def is_anomalous(self) -> bool:
+        return self.days >= MIN_DAYS and self.count >= MIN_COUNT and self.z() > Z_THRESHOLD
+
+    def add(self, day: date, n: int = 1) -> Optional[Tuple[date, int, float, float]]:
+        """Count `n` records on `day`.
+
+        Returns (day, count, expected, z) for the day being closed when
+        `day` starts a new one and the closed day was anomalous.
+        """
+        if day == self.day:
+            self.count += n
+            return None
+        if day < self.day:
+            self.late += n
+            return None
+        closed = (self.day, self.count, self.mean, self.z()) if self.is_anomalous() else None
+        self._fold(self.count)
+        # Days without records are zeros in the baseline
+        for _ in range(min((day - self.day).days - 1, MAX_GAP_DAYS)):
+            self._fold(0)
+        self.day, self.count = day, n
+        return closed
+
+
+def _load_states(conn, table: str) -> Dict[str, SeriesState]:
+    return {
+        r[0]: SeriesState(r[0], table, date.fromisoformat(r[1]), *r[2:])
+        for r in conn.execute(
+            "SELECT series, day, count, mean, var, days, late FROM anomaly_series WHERE table_name = ?",
+            (table,),
+        )
+    }
+
+
+def _apply(conn, table: str, rows: Iterable) -> int:
+    """Feed `rows` (mappings with the date and series columns) into the detectors."""
+    date_col, _ = DETECTORS[table]
+    states = _load_states(conn, table)
+    touched = {}
+    flagged: List[tuple] = []
+    dated = [(d, row) for d, row in ((_day(row[date_col]), row) for row in rows) if d is not None]
+    # Ingest in date order so a batch covering several days is not "late"
+    dated.sort(key=lambda item: item[0])
+    for day, row in dated:
+        for key in series_keys(table, row):
+            state = states.get(key)
+            if state is None:
+                state = states[key] = SeriesState(key, table, day, count=1)
+            else:
+                closed = state.add(day)
+                if closed:
+                    flagged.append((key,) + closed)
+            touched[key] = state
+    for state in touched.values():
+        if state.is_anomalous():
+            flagged.append((state.series, state.day, state.count, state.mean, state.z()))
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO anomaly_series (series, table_name, day, count, mean, var, days, late)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [(s.series, table, s.day.isoformat(), s.count, s.mean, s.var, s.days, s.late) for s in touched.values()],
+    )
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO anomalies (series, table_name, day, count, expected, z)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        [(key, table, day.isoformat(), count, expected, z) for key, day, count, expected, z in flagged],
+    )
+    return len(dated)
+
+
+def _daily_counts(table: str, rows: Iterable) -> Counter:
+    """{(series, ISO day): records} of `rows`."""
+    date_col, _ = DETECTORS[table]
+    counts = Counter()
+    for row in rows:
+        day = _day(row[date_col])
+        if day is not None:
+            for key in series_keys(table, row):
+                counts[(key, day.isoformat())] += 1
+    return counts
+
+
+def _add_daily(conn, table: str, counts: Counter) -> None:
+    conn.executemany(
+        """
+        INSERT INTO anomaly_daily (series, table_name, day, count) VALUES (?, ?, ?, ?)
+        ON CONFLICT (series, day) DO UPDATE SET count = count + excluded.count
+        """,
+        [(key, table, day, n) for (key, day), n in counts.items()],
+    )
+
+
+def _existing_rows(conn, table: str, day: Optional[str] = None) -> List[Dict]:
+    """Rows of `table` (of one ISO `day`, or all): hot, plus archived when the archive is attached."""
+    date_col, columns = DETECTORS[table]
+    names = (date_col,) + columns
+    where, params = where_date_range(date_col, day, day)
+    sources = [table]
+    if any(r[1] == ARCHIVE_SCHEMA for r in conn.execute("PRAGMA database_list")):
+        sources += [f"{ARCHIVE_SCHEMA}.{p}" for p in overlapping_partitions(conn, table, day, day)]
+    return [
+        dict(zip(names, row)) for source in sources
+        for row in conn.execute(f"SELECT {', '.join(names)} FROM {source}{where}", params)
+    ]
+
+
+def _recount(conn, table: str, days: Optional[Iterable[str]] = None) -> int:
+    """Recount `anomaly_daily` for `days` (every day when None) from the rows that exist.
+
+    Returns the number of records counted.
+    """
+    if days is None:
+        conn.execute("DELETE FROM anomaly_daily WHERE table_name = ?", (table,))
+        rows = _existing_rows(conn, table)
+    else:
+        rows = []
+        for day in days:
+            conn.execute("DELETE FROM anomaly_daily WHERE table_name = ? AND day = ?", (table, day))
+            rows += _existing_rows(conn, table, day)
+    _add_daily(conn, table, _daily_counts(table, rows))
+    return len(rows)
+
+
+def _replay(conn, table: str) -> None:
+    """Rebuild every series of `table` and its flagged days from `anomaly_daily`."""
+    states: Dict[str, SeriesState] = {}
+    flagged: List[tuple] = []
+    for key, day, n in conn.execute(
+        "SELECT series, day, count FROM anomaly_daily WHERE table_name = ? AND count > 0 ORDER BY series, day",
+        (table,),
+    ):
+        day = date.fromisoformat(day)
+        state = states.get(key)
+        if state is None:
+            states[key] = SeriesState(key, table, day, count=n)
+            continue
+        closed = state.add(day, n)
+        if closed:
+            flagged.append((key,) + closed)
+    flagged += [(s.series, s.day, s.count, s.mean, s.z()) for s in states.values() if s.is_anomalous()]
+    conn.execute("DELETE FROM anomaly_series WHERE table_name = ?", (table,))
+    conn.executemany(
+        """
+        INSERT INTO anomaly_series (series, table_name, day, count, mean, var, days, late)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [(s.series, table, s.day.isoformat(), s.count, s.mean, s.var, s.days, s.late) for s in states.values()],
+    )
+    # Days flagged before keep their row (and detected_at); only changes are written
+    keep = {(key, day.isoformat()) for key, day, *_ in flagged}
+    stale = [
+        (key, day) for key, day in conn.execute("SELECT series, day FROM anomalies WHERE table_name = ?", (table,))
+        if (key, day) not in keep
+    ]
+    conn.executemany("DELETE FROM anomalies WHERE series = ? AND day = ?", stale)
+    conn.executemany(
+        """
+        INSERT INTO anomalies (series, table_name, day, count, expected, z) VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (series, day) DO UPDATE SET count = excluded.count, expected = excluded.expected, z = excluded.z
+        WHERE count IS NOT excluded.count OR expected IS NOT excluded.expected OR z IS NOT excluded.z
+        """,
+        [(key, table, day.isoformat(), count, expected, z) for key, day, count, expected, z in flagged],
+    )
+
+
+def update_detectors(conn, table: str) -> int:
+    """Bring the detectors of `table` up to date with its changes since the last call.
+
+    New records are folded in directly. If deletes or edits touched some
+    days, those days are recounted and the series replayed instead.
+    `conn` is the caller's write connection (the sync's transaction).
+    Returns the number of records ingested or recounted.
+    """
+    if table not in DETECTORS:
+        return 0
+    ensure_anomaly_tables(conn)
+    date_col, columns = DETECTORS[table]
+    select = f"SELECT {date_col}, {', '.join(columns)} FROM {table}"
+    latest = conn.execute("SELECT COALESCE(MAX(version), 0) FROM change_log").fetchone()[0]
+    seen = conn.execute("SELECT version FROM anomaly_cursor WHERE table_name = ?", (table,)).fetchone()
+    dirty = [
+        r[0] for r in conn.execute("SELECT day FROM anomaly_dirty_days WHERE table_name = ? ORDER BY day", (table,))
+    ]
+    conn.execute("DELETE FROM anomaly_dirty_days WHERE table_name = ?", (table,))
+    if seen is None:
+        # First run: seed the baselines from what is already there
+        ingested = _recount(conn, table)
+        _replay(conn, table)
+    else:
+        ids = changed_row_ids(conn, table, seen[0], ops=("INSERT",))
+        names = (date_col,) + columns
+        rows = [
+            dict(zip(names, row)) for chunk in chunks(ids)
+            for row in conn.execute(f"{select} WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+        ]
+        if dirty:
+            # Recounting a dirty day takes its new records with it
+            recount = set(dirty)
+            new = [row for row in rows if str(row[date_col])[:10] not in recount]
+            _add_daily(conn, table, _daily_counts(table, new))
+            ingested = len(new) + _recount(conn, table, dirty)
+            _replay(conn, table)
+        else:
+            _add_daily(conn, table, _daily_counts(table, rows))
+            ingested = _apply(conn, table, rows)
+    conn.execute("INSERT OR REPLACE INTO anomaly_cursor (table_name, version) VALUES (?, ?)", (table, latest))
+    return ingested
+
+
+def recent_anomalies(table: str, days: int = 30, db: Optional[DatabaseManager] = None) -> List[Dict]:
+    """Anomalies of `table` within the last `days` days of its data, newest first.
+
+    The window ends at the newest day any of the table's series has seen,
+    so it works on historical datasets as well as live ones.
+    """
+    db = db or DatabaseManager()
+    if not db.fetch_all("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'anomalies'"):
+        return []
+    return db.fetch_all(
+        """
+        SELECT series, day, count, expected, z, detected_at FROM anomalies
+        WHERE table_name = ?
+          AND day >= (SELECT date(MAX(day), ?) FROM anomaly_series WHERE table_name = ?)
+        ORDER BY day DESC, z DESC
+        """,
+        (table, f"-{int(days)} days", table),
+    )
@@ -0,0 +1,310 @@
+"""
+Hot/archive split for incidents and tickets.
+
+Resolved or closed records whose closing date is older than a configurable
+age are moved out of `app.db` into `archive.db` next to it, one table per
+month of the record's opening date (`cyber_incidents_2024_03`, ...). The
+hot tables, and everything built on them (snapshots, frame caches, KPIs),
+then only hold recent and open work.
+
+`load_range()` reads a date range: hot rows plus, only when the range
+reaches archived months, the matching partitions in one `UNION ALL`.
+`archived_ids` records every moved id so a CSV sync does not bring
+archived records back into the hot table.
+
+The two files are committed separately (SQLite does not make multi-file
+commits atomic in WAL mode). Rows are copied before they are deleted, so
+an interrupted run can leave a row in both places but never in neither;
+partition inserts replace by id, so the next run simply completes it.
+"""
+
+import os
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from database.batch import chunks
+from database.db_manager import DatabaseManager
+from database.ranges import where_date_range
+from database.storage import storage_table
+
+SCHEMA = "archive"
+ARCHIVE_AFTER_DAYS = 365
+
+# table -> (partition date column, closing date column, statuses that can be archived)
+ARCHIVE_POLICIES = {
+    "cyber_incidents": ("reported_date", "resolved_date", ("Resolved", "Closed")),
+    "it_tickets": ("opened_date", "closed_date", ("Resolved", "Closed")),
+}
+
+
+def archive_path(db: DatabaseManager) -> str:
+    return os.path.join(os.path.dirname(db.db_path) or ".", "archive.db")
+
+
+def has_archive(db: DatabaseManager) -> bool:
+    return os.path.exists(archive_path(db))
+
+
+def partition_name(table: str, month: str) -> str:
+    """`partition_name("it_tickets", "2024-03")` -> "it_tickets_2024_03"."""
+    return f"{table}_{month.replace('-', '_')}"
+
+
+def _ensure_catalog(conn) -> None:
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {SCHEMA}.archive_partitions (
+            table_name TEXT NOT NULL,
+            month TEXT NOT NULL,
+            partition TEXT NOT NULL,
+            rows INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (table_name, month)
+        )
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {SCHEMA}.archived_ids (
+            table_name TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            month TEXT NOT NULL,
+            PRIMARY KEY (table_name, row_id)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {SCHEMA}.archive_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ran_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+            moved INTEGER NOT NULL
+        )
+        """
+    )
+
+
+def _ensure_partition(conn, table: str, month: str) -> str:
+    name = partition_name(table, month)
+    date_col = ARCHIVE_POLICIES[table][0]
+    if not conn.execute(
+        f"SELECT 1 FROM {SCHEMA}.sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone():
+        # Same columns as the logical table (also when it is a normalized view)
+        conn.execute(f"CREATE TABLE {SCHEMA}.{name} AS SELECT * FROM main.{table} WHERE 0")
+        conn.execute(f"CREATE UNIQUE INDEX {SCHEMA}.{name}_id ON {name} (id)")
+        conn.execute(f"CREATE INDEX {SCHEMA}.{name}_date ON {name} ({date_col})")
+        conn.execute(
+            f"INSERT INTO {SCHEMA}.archive_partitions (table_name, month, partition) VALUES (?, ?, ?)",
+            (table, month, name),
+        )
+    return name
+
+
+def archive_records(
+    table: str, older_than_days: int = ARCHIVE_AFTER_DAYS, db: Optional[DatabaseManager] = None
+) -> Dict[str, int]:
+    """Move archivable rows of `table` into monthly partitions; returns {month: rows moved}.
+
+    A row is archivable when its status is in the table's policy and its
+    closing date (opening date when missing) is more than
+    `older_than_days` days old. Rows without a usable opening date stay hot.
+    """
+    date_col, closed_col, statuses = ARCHIVE_POLICIES[table]
+    db = db or DatabaseManager()
+    moved: Dict[str, int] = {}
+    with db.writer(attach={SCHEMA: archive_path(db)}) as conn:
+        _ensure_catalog(conn)
+        by_month = defaultdict(list)
+        for month, row_id in conn.execute(
+            f"""
+            SELECT strftime('%Y-%m', {date_col}), id FROM main.{table}
+            WHERE status IN ({', '.join('?' * len(statuses))})
+              AND COALESCE({closed_col}, {date_col}) < date('now', ?)
+              AND strftime('%Y-%m', {date_col}) IS NOT NULL
+            """,
+            statuses + (f"-{int(older_than_days)} days",),
+        ):
+            by_month[month].append(row_id)
+        physical = storage_table(conn, table)
+        for month, ids in sorted(by_month.items()):
+            name = _ensure_partition(conn, table, month)
+            for chunk in chunks(ids):
+                marks = ", ".join("?" * len(chunk))
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {SCHEMA}.{name} SELECT * FROM main.{table} WHERE id IN ({marks})",
+                    tuple(chunk),
+                )
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO {SCHEMA}.archived_ids (table_name, row_id, month) VALUES (?, ?, ?)",
+                    [(table, i, month) for i in chunk],
+                )
+                conn.execute(f"DELETE FROM main.{physical} WHERE id IN ({marks})", tuple(chunk))
+            conn.execute(
+                f"UPDATE {SCHEMA}.archive_partitions SET rows = (SELECT COUNT(*) FROM {SCHEMA}.{name}) "
+                "WHERE table_name = ? AND month = ?",
+                (table, month),
+            )
+            moved[month] = len(ids)
+        conn.execute(f"INSERT INTO {SCHEMA}.archive_runs (moved) VALUES (?)", (sum(moved.values()),))
+    return moved
+
+
+def _read(db: DatabaseManager, fn):
+    """Run `fn(conn)` in one read transaction with the archive attached read-only."""
+    conn = db.connect_readonly()
+    try:
+        conn.execute(f"ATTACH DATABASE ? AS {SCHEMA}", (f"file:{archive_path(db)}?mode=ro",))
+        conn.execute("BEGIN")
+        result = fn(conn)
+        conn.commit()
+        return result
+    finally:
+        conn.close()
+
+
+def archive_generation(db: Optional[DatabaseManager] = None) -> int:
+    """Id of the latest archive run (0 without an archive); changes whenever rows move."""
+    db = db or DatabaseManager()
+    if not has_archive(db):
+        return 0
+    return _read(db, lambda conn: conn.execute(
+        f"SELECT COALESCE(MAX(id), 0) FROM {SCHEMA}.archive_runs"
+    ).fetchone()[0])
+
+
+def overlapping_partitions(conn, table: str, start: Optional[str], end: Optional[str]) -> List[str]:
+    """Names of `table`'s partitions whose month overlaps [start, end]; needs the archive attached."""
+    sql = f"SELECT partition FROM {SCHEMA}.archive_partitions WHERE table_name = ?"
+    params = [table]
+    if start:
+        sql += " AND month >= ?"
+        params.append(start[:7])
+    if end:
+        sql += " AND month <= ?"
+        params.append(end[:7])
+    return [r[0] for r in conn.execute(sql + " ORDER BY month", params)]
+
+
+def archived_bounds(table: str, db: Optional[DatabaseManager] = None) -> Tuple[Optional[str], Optional[str]]:
+    """(first, last) date of `table`'s archived rows; (None, None) when nothing is archived."""
+    db = db or DatabaseManager()
+    if table not in ARCHIVE_POLICIES or not has_archive(db):
+        return None, None
+    date_col = ARCHIVE_POLICIES[table][0]
+
+    def read(conn):
+        names = overlapping_partitions(conn, table, None, None)
+        if not names:
+            return None, None
+        # Partitions are monthly, so the extremes sit in the first and last one
+        first = conn.execute(f"SELECT MIN({date_col}) FROM {SCHEMA}.{names[0]}").fetchone()[0]
+        last = conn.execute(f"SELECT MAX({date_col}) FROM {SCHEMA}.{names[-1]}").fetchone()[0]
+        return first, last
+
+    return _read(db, read)
+
+
+def partitions(table: str, db: Optional[DatabaseManager] = None) -> List[Dict]:
+    """Return [{month, partition, rows}] for `table`'s archive partitions."""
+    db = db or DatabaseManager()
+    if not has_archive(db):
+        return []
+    return _read(db, lambda conn: [
+        dict(r) for r in conn.execute(
+            f"SELECT month, partition, rows FROM {SCHEMA}.archive_partitions "
+            "WHERE table_name = ? ORDER BY month",
+            (table,),
+        )
+    ])
+
+
+def _range_sql(source: str, date_col: str, start: Optional[str], end: Optional[str]) -> Tuple[str, list]:
+    where, params = where_date_range(date_col, start, end)
+    return f"SELECT * FROM {source}{where}", params
+
+
+def load_archive(
+    table: str, start: Optional[str] = None, end: Optional[str] = None, db: Optional[DatabaseManager] = None
+) -> Tuple[int, pd.DataFrame]:
+    """Return (generation, archived rows of `table` within [start, end]).
+
+    Dates are ISO strings; either bound may be None. Only partitions whose
+    month overlaps the range are read.
+    """
+    db = db or DatabaseManager()
+    date_col = ARCHIVE_POLICIES[table][0]
+    if not has_archive(db):
+        return 0, pd.DataFrame()
+
+    def read(conn):
+        generation = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {SCHEMA}.archive_runs").fetchone()[0]
+        parts = [
+            _range_sql(f"{SCHEMA}.{p}", date_col, start, end) for p in overlapping_partitions(conn, table, start, end)
+        ]
+        if not parts:
+            return generation, pd.DataFrame()
+        sql = " UNION ALL ".join(s for s, _ in parts) + f" ORDER BY {date_col}"
+        return generation, pd.read_sql_query(sql, conn, params=[p for _, ps in parts for p in ps])
+
+    return _read(db, read)
+
+
+def load_range(
+    table: str, start: Optional[str] = None, end: Optional[str] = None, db: Optional[DatabaseManager] = None
+) -> pd.DataFrame:
+    """Rows of `table` within [start, end], hot and archived.
+
+    Served from the hot table alone unless the range reaches an archived
+    month, in which case those partitions are added in the same query.
+    """
+    db = db or DatabaseManager()
+    date_col = ARCHIVE_POLICIES[table][0]
+    hot_sql, hot_params = _range_sql(f"main.{table}", date_col, start, end)
+    if not has_archive(db):
+        conn = db.connect_readonly()
+        try:
+            return pd.read_sql_query(f"{hot_sql} ORDER BY {date_col}", conn, params=hot_params)
+        finally:
+            conn.close()
+
+    def read(conn):
+        parts = [(hot_sql, hot_params)] + [
+            _range_sql(f"{SCHEMA}.{p}", date_col, start, end) for p in overlapping_partitions(conn, table, start, end)
+        ]
+        sql = " UNION ALL ".join(s for s, _ in parts) + f" ORDER BY {date_col}"
+        return pd.read_sql_query(sql, conn, params=[p for _, ps in parts for p in ps])
+
+    return _read(db, read)
+
+
+def archived_ids_among(conn, table: str, ids_table: str) -> set:
+    """Ids in temp table `ids_table` (column `id`) that were archived; needs the archive attached."""
+    return {
+        r[0] for r in conn.execute(
+            f"SELECT a.row_id FROM {ids_table} s JOIN {SCHEMA}.archived_ids a "
+            "ON a.table_name = ? AND a.row_id = s.id",
+            (table,),
+        )
+    }
+
+
+def compact(db: Optional[DatabaseManager] = None) -> Dict[str, int]:
+    """Checkpoint and VACUUM app.db and archive.db; returns file sizes in bytes.
+
+    Rewrites both files and briefly blocks writers, so run it off-peak.
+    """
+    db = db or DatabaseManager()
+    sizes = {}
+    targets = [db] + ([DatabaseManager(archive_path(db))] if has_archive(db) else [])
+    for target in targets:
+        target.checkpoint("TRUNCATE")
+        target.vacuum()
+        conn = target.connect()
+        try:
+            conn.execute("PRAGMA optimize")
+        finally:
+            conn.close()
+        sizes[target.db_path] = os.path.getsize(target.db_path)
+    return sizes
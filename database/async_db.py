@@ -0,0 +1,84 @@
+"""
+asyncio-friendly access to the SQLite DBs.
+
+sqlite3 is blocking, so `AsyncDatabaseManager` runs each call of a
+`DatabaseManager` on a shared thread pool. Independent queries (e.g. a
+dashboard's KPI, trend and breakdown queries) can then be awaited together
+and finish in roughly the time of the slowest one. Each call opens its own
+connection, so queries never share a sqlite3 connection across threads.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Optional
+
+from database.db_manager import DatabaseManager
+
+MAX_WORKERS = 8
+
+_executor = None
+_executor_guard = threading.Lock()
+
+
+def _default_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_guard:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="sqlite")
+        return _executor
+
+
+class AsyncDatabaseManager:
+    """
+    Awaitable counterpart of `DatabaseManager`.
+
+    `fetch_all` and `execute` mirror the sync API; `gather` runs several
+    named SELECTs concurrently and returns {name: rows}.
+    """
+
+    def __init__(self, db_path="data/app.db", executor: Optional[ThreadPoolExecutor] = None):
+        self.db = DatabaseManager(db_path=db_path)
+        self.executor = executor or _default_executor()
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(fn, *args))
+
+    async def fetch_all(self, query, params=()) -> List[Dict[str, Any]]:
+        """Run a SELECT on a read-only connection and return list[dict]."""
+        return await self._run(self.db.fetch_all, query, params)
+
+    async def execute(self, query, params=(), fetch=False):
+        """Run a write statement (still serialized by the writer lock)."""
+        return await self._run(self.db.execute, query, params, fetch)
+
+    async def gather(self, **queries) -> Dict[str, List[Dict[str, Any]]]:
+        """Run named queries concurrently.
+
+        Each value is either a SQL string or a (sql, params) tuple.
+        """
+        names = list(queries)
+        calls = []
+        for name in names:
+            q = queries[name]
+            sql, params = (q, ()) if isinstance(q, str) else q
+            calls.append(self.fetch_all(sql, params))
+        results = await asyncio.gather(*calls)
+        return dict(zip(names, results))
+
+
+def run_sync(coro):
+    """Run `coro` to completion from synchronous code (e.g. a Streamlit script).
+
+    Streamlit scripts have no running event loop, so this is normally just
+    `asyncio.run`; inside an already running loop the coroutine is run on a
+    helper thread instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
@@ -0,0 +1,67 @@
+"""
+Set-based write helpers used by the service layer's batch APIs.
+
+Each helper runs in one writer transaction and binds ids in chunks so a
+request for thousands of rows stays under SQLite's bound-parameter limit
+(SQLITE_MAX_VARIABLE_NUMBER, 999 on older builds).
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from database.db_manager import DatabaseManager
+from database.storage import encode_values, storage_table
+
+MAX_VARIABLES = 900
+
+
+def chunks(items: Sequence[Any], size: int = MAX_VARIABLES) -> Iterator[Sequence[Any]]:
+    """Yield consecutive slices of `items` of at most `size` elements."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _unique(ids: Iterable[int]) -> List[int]:
+    return list(dict.fromkeys(int(i) for i in ids))
+
+
+def update_by_ids(
+    table: str,
+    values: Dict[str, Any],
+    ids: Iterable[int],
+    db: Optional[DatabaseManager] = None,
+) -> int:
+    """Set the same column values on every row in `ids`; returns rows changed."""
+    ids = _unique(ids)
+    if not ids or not values:
+        return 0
+    db = db or DatabaseManager()
+    changed = 0
+    with db.writer() as conn:
+        table, values = encode_values(conn, table, values)
+        assignments = ", ".join(f"{col} = ?" for col in values)
+        set_params = tuple(values.values())
+        for chunk in chunks(ids, MAX_VARIABLES - len(set_params)):
+            cur = conn.execute(
+                f"UPDATE {table} SET {assignments} WHERE id IN ({', '.join('?' * len(chunk))})",
+                set_params + tuple(chunk),
+            )
+            changed += cur.rowcount
+    return changed
+
+
+def delete_by_ids(table: str, ids: Iterable[int], db: Optional[DatabaseManager] = None) -> int:
+    """Delete every row in `ids`; returns rows deleted."""
+    ids = _unique(ids)
+    if not ids:
+        return 0
+    db = db or DatabaseManager()
+    deleted = 0
+    with db.writer() as conn:
+        table = storage_table(conn, table)
+        for chunk in chunks(ids):
+            cur = conn.execute(
+                f"DELETE FROM {table} WHERE id IN ({', '.join('?' * len(chunk))})",
+                tuple(chunk),
+            )
+            deleted += cur.rowcount
+    return deleted
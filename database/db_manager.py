@@ -1,10 +1,36 @@
+import os
 import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Seconds a connection waits on a locked DB before raising
+# "database is locked" (sqlite3's `timeout`, i.e. PRAGMA busy_timeout).
+BUSY_TIMEOUT = 30.0
+
+# One writer lock per DB path, shared by every DatabaseManager in the process.
+_writer_locks = {}
+_writer_locks_guard = threading.Lock()
+
+
+# Absolute DB path -> ReadReplica serving its reads (database/replica.py)
+_replicas = {}
+_replicas_guard = threading.Lock()
+
+
+def _writer_lock(db_path):
+    with _writer_locks_guard:
+        return _writer_locks.setdefault(db_path, threading.RLock())
 
 
 class DatabaseManager:
     """
     `execute` for running statements and
     `fetch_all` for returning query results as a list of dicts.
+
+    The DB runs in WAL mode: reads go through read-only connections and see
+    a consistent snapshot even while a sync is writing, and writes are
+    serialized through `writer()` so only one transaction holds the write
+    lock at a time.
     """
 
     def __init__(self, db_path="data/app.db"):
@@ -13,25 +39,101 @@ class DatabaseManager:
     def connect(self):
         # Create a sqlite3 connection and configure rows to be accessible
         # as mapping objects (sqlite3.Row) so callers can use keys.
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT)
         conn.row_factory = sqlite3.Row
+        # WAL is persistent in the file; setting it again is a no-op.
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
         return conn
 
+    def connect_readonly(self):
+        """Open a read-only connection for dashboard queries.
+
+        Falls back to a regular connection when the DB file does not exist
+        yet (read-only mode cannot create it). When a read replica is
+        enabled for this DB, the connection goes to the in-memory copy.
+        """
+        if _replicas:
+            replica = _replicas.get(os.path.abspath(self.db_path))
+            if replica is not None:
+                return replica.connect()
+        try:
+            conn = sqlite3.connect(
+                f"file:{self.db_path}?mode=ro", uri=True, timeout=BUSY_TIMEOUT
+            )
+        except sqlite3.OperationalError:
+            return self.connect()
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def writer(self, attach=None):
+        """Yield a connection holding the write lock; commit on success.
+
+        `BEGIN IMMEDIATE` takes SQLite's write lock up front, so a writer
+        waits (up to BUSY_TIMEOUT) instead of failing halfway through.
+        `attach` maps schema names to DB files to attach first (SQLite
+        cannot attach inside a transaction); they are put in WAL mode too.
+        """
+        with _writer_lock(self.db_path):
+            conn = self.connect()
+            try:
+                for schema, path in (attach or {}).items():
+                    conn.execute("ATTACH DATABASE ? AS " + schema, (path,))
+                    conn.execute(f"PRAGMA {schema}.journal_mode=WAL")
+                conn.execute("BEGIN IMMEDIATE")
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
+
     def execute(self, query, params=(), fetch=False):
         """Execute a SQL statement. Set `fetch=True` to return rows."""
-        conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        conn.commit()
-        data = cursor.fetchall() if fetch else None
-        conn.close()
+        with _writer_lock(self.db_path):
+            conn = self.connect()
+            try:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+                conn.commit()
+                data = cursor.fetchall() if fetch else None
+            finally:
+                conn.close()
         return data
 
     def fetch_all(self, query, params=()):
         """Execute a SELECT and return rows as list[dict]."""
-        conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
+        conn = self.connect_readonly()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+        finally:
+            conn.close()
         return [dict(row) for row in rows]
+
+    def vacuum(self):
+        """Rebuild the DB file to reclaim free pages (holds the write lock)."""
+        with _writer_lock(self.db_path):
+            conn = self.connect()
+            try:
+                conn.execute("VACUUM")
+            finally:
+                conn.close()
+
+    def checkpoint(self, mode="PASSIVE"):
+        """Copy WAL content back into the main DB file.
+
+        SQLite checkpoints automatically every `wal_autocheckpoint` pages;
+        call this after a large sync (mode "TRUNCATE" also shrinks the
+        -wal file). Returns (busy, wal_pages, checkpointed_pages).
+        """
+        if mode.upper() not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+            raise ValueError(f"Unknown checkpoint mode: {mode}")
+        conn = self.connect()
+        try:
+            return tuple(conn.execute(f"PRAGMA wal_checkpoint({mode.upper()})").fetchone())
+        finally:
+            conn.close()
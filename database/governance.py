@@ -0,0 +1,217 @@
+"""
+Stored governance classification of the dataset inventory.
+
+`Dataset.size_category()` and `Dataset.is_archive_candidate()` classify one
+object at a time. Here the same rules live in SQLite: `dataset_classes`
+holds each dataset's size category and archive flag, kept current by
+triggers on the datasets table and indexed, so counts, totals and pages of
+archive candidates are answered without loading the inventory.
+
+The thresholds are stored in the single-row `governance_thresholds` table.
+Changing them with `set_thresholds()` reclassifies only the datasets whose
+size or row count lies between an old and a new boundary.
+"""
+
+from typing import Dict, Optional
+
+from database.db_manager import DatabaseManager
+from database.storage import storage_table
+from database.versioning import bump_version, ensure_versioning
+
+# Defaults match the original rules in models/dataset.py
+DEFAULT_THRESHOLDS = {
+    "small_max_mb": 100.0,      # Small: size_mb < small_max_mb
+    "medium_max_mb": 1000.0,    # Medium: size_mb < medium_max_mb, else Large
+    "archive_min_mb": 1000.0,   # archive candidate: size_mb > archive_min_mb
+    "archive_max_rows": 100000,  # ... and rows < archive_max_rows
+}
+
+# `table_versions` entry bumped whenever the thresholds or classes are
+# recomputed; datasets edits are already covered by the datasets version.
+GOVERNANCE_VERSION = "governance"
+
+# Classification of the row aliased `d` under thresholds aliased `t`
+_CLASS_EXPR = """
+    CASE WHEN COALESCE(d.size_mb, 0) < t.small_max_mb THEN 'Small'
+         WHEN COALESCE(d.size_mb, 0) < t.medium_max_mb THEN 'Medium'
+         ELSE 'Large' END,
+    COALESCE(d.size_mb, 0) > t.archive_min_mb AND COALESCE(d.rows, 0) < t.archive_max_rows
+"""
+
+# DB paths already checked by this process
+_ensured = set()
+
+
+def _classify_trigger(name: str, event: str, source: str) -> str:
+    return f"""
+        CREATE TRIGGER IF NOT EXISTS datasets_classify_{name}
+        AFTER {event} ON {source}
+        BEGIN
+            -- Delete + insert rather than OR REPLACE: the firing statement's
+            -- conflict clause (e.g. the sync's upsert) would override it.
+            DELETE FROM dataset_classes WHERE dataset_id = NEW.id;
+            INSERT INTO dataset_classes (dataset_id, size_category, archive_candidate)
+            SELECT d.id, {_CLASS_EXPR}
+            FROM (SELECT NEW.id AS id, NEW.size_mb AS size_mb, NEW.rows AS rows) d, governance_thresholds t;
+        END
+    """
+
+
+def ensure_governance(db: Optional[DatabaseManager] = None) -> None:
+    """Create the classification tables and triggers, classifying existing rows.
+
+    A no-op until the datasets table exists.
+    """
+    db = db or DatabaseManager()
+    if db.db_path in _ensured:
+        return
+    with db.writer() as conn:
+        if not conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'datasets' AND type IN ('table', 'view')"
+        ).fetchone():
+            return
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS governance_thresholds (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                small_max_mb REAL NOT NULL,
+                medium_max_mb REAL NOT NULL,
+                archive_min_mb REAL NOT NULL,
+                archive_max_rows INTEGER NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            "INSERT OR IGNORE INTO governance_thresholds "
+            "(id, small_max_mb, medium_max_mb, archive_min_mb, archive_max_rows) "
+            "VALUES (1, :small_max_mb, :medium_max_mb, :archive_min_mb, :archive_max_rows)",
+            DEFAULT_THRESHOLDS,
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS dataset_classes (
+                dataset_id INTEGER PRIMARY KEY,
+                size_category TEXT NOT NULL,
+                archive_candidate INTEGER NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_dataset_classes_category ON dataset_classes (size_category)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_dataset_classes_archive "
+            "ON dataset_classes (dataset_id) WHERE archive_candidate"
+        )
+        source = storage_table(conn, "datasets")
+        # Classify existing rows only when the triggers are new (first run,
+        # or the table was rebuilt by a storage layout switch).
+        fresh = not conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'datasets_classify_insert'"
+        ).fetchone()
+        conn.execute(_classify_trigger("insert", "INSERT", source))
+        conn.execute(_classify_trigger("update", "UPDATE OF id, size_mb, rows", source))
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS datasets_classify_delete
+            AFTER DELETE ON {source}
+            BEGIN
+                DELETE FROM dataset_classes WHERE dataset_id = OLD.id;
+            END
+            """
+        )
+        # The update trigger re-adds NEW.id; drop a renamed row's old entry
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS datasets_classify_rekey
+            AFTER UPDATE OF id ON {source}
+            WHEN OLD.id IS NOT NEW.id
+            BEGIN
+                DELETE FROM dataset_classes WHERE dataset_id = OLD.id;
+            END
+            """
+        )
+        if fresh:
+            _reclassify(conn, source, prune=True)
+    _ensured.add(db.db_path)
+
+
+def _reclassify(conn, source: str, where: str = "1", params: tuple = (), prune: bool = False) -> int:
+    """Recompute classes for rows of `source` matching `where`; returns rows changed."""
+    before = conn.total_changes
+    conn.execute(
+        f"""
+        INSERT OR REPLACE INTO dataset_classes (dataset_id, size_category, archive_candidate)
+        SELECT d.id, {_CLASS_EXPR}
+        FROM {source} d, governance_thresholds t
+        WHERE ({where}) AND NOT EXISTS (
+            SELECT 1 FROM dataset_classes c
+            WHERE c.dataset_id = d.id
+              AND (c.size_category, c.archive_candidate) = (SELECT {_CLASS_EXPR})
+        )
+        """,
+        params,
+    )
+    if prune:
+        conn.execute(f"DELETE FROM dataset_classes WHERE dataset_id NOT IN (SELECT id FROM {source})")
+    return conn.total_changes - before
+
+
+def get_thresholds(db: Optional[DatabaseManager] = None) -> Dict[str, float]:
+    db = db or DatabaseManager()
+    ensure_governance(db)
+    rows = db.fetch_all(
+        "SELECT small_max_mb, medium_max_mb, archive_min_mb, archive_max_rows FROM governance_thresholds"
+    )
+    return rows[0] if rows else dict(DEFAULT_THRESHOLDS)
+
+
+def set_thresholds(db: Optional[DatabaseManager] = None, **changes: float) -> int:
+    """Update thresholds and reclassify affected datasets; returns rows reclassified.
+
+    Only datasets whose size (or row count) lies between an old and a new
+    threshold can change class, so the reclassification is a range search
+    on the datasets indexes rather than a pass over the inventory.
+    """
+    unknown = set(changes) - set(DEFAULT_THRESHOLDS)
+    if unknown:
+        raise ValueError(f"Unknown thresholds: {', '.join(sorted(unknown))}")
+    db = db or DatabaseManager()
+    ensure_governance(db)
+    ensure_versioning(db)
+    with db.writer() as conn:
+        old = dict(conn.execute(
+            "SELECT small_max_mb, medium_max_mb, archive_min_mb, archive_max_rows FROM governance_thresholds"
+        ).fetchone())
+        new = {**old, **changes}
+        if new["small_max_mb"] > new["medium_max_mb"]:
+            raise ValueError("small_max_mb must not exceed medium_max_mb")
+        moved = {k for k in DEFAULT_THRESHOLDS if new[k] != old[k]}
+        if not moved:
+            return 0
+        conn.execute(
+            "UPDATE governance_thresholds SET small_max_mb = :small_max_mb, medium_max_mb = :medium_max_mb, "
+            "archive_min_mb = :archive_min_mb, archive_max_rows = :archive_max_rows",
+            new,
+        )
+        bump_version(conn, GOVERNANCE_VERSION)
+        terms, params = [], []
+        for key in moved:
+            column = "rows" if key == "archive_max_rows" else "size_mb"
+            low, high = min(old[key], new[key]), max(old[key], new[key])
+            # Bare column so the range can use idx_datasets_size / idx_datasets_rows
+            terms.append(f"d.{column} BETWEEN ? AND ?")
+            params += [low, high]
+            if low <= 0 <= high:
+                terms.append(f"d.{column} IS NULL")
+        return _reclassify(conn, storage_table(conn, "datasets"), " OR ".join(terms), tuple(params))
+
+
+def reclassify_all(db: Optional[DatabaseManager] = None) -> int:
+    """Recompute every dataset's class (e.g. after editing the thresholds table by hand)."""
+    db = db or DatabaseManager()
+    ensure_governance(db)
+    ensure_versioning(db)
+    with db.writer() as conn:
+        bump_version(conn, GOVERNANCE_VERSION)
+        return _reclassify(conn, storage_table(conn, "datasets"), prune=True)
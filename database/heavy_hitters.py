@@ -0,0 +1,172 @@
+"""
+Bounded-memory top-k of incident types and ticket staff per day.
+
+For each tracked column, every day (bucket) keeps a Space-Saving summary
+of at most CAPACITY (value, count, error) rows in `heavy_hitters`. A value
+already in the summary has its count raised. A new value takes a free
+slot, or replaces the value with the smallest count, inheriting that
+count as its error. Within a bucket a value's true count is between
+`count - error` and `count`, and any value seen more than
+records / CAPACITY times is guaranteed to be in the summary.
+
+`top_k()` answers any window by adding up the summaries of the days in
+it: one indexed query over at most CAPACITY rows per day, however many
+distinct values the records hold. While a day has at most CAPACITY
+distinct values its summary is exact.
+
+Like the anomaly detectors (`database/anomaly.py`) the summaries consume
+the change journal. `update_heavy_hitters()` runs inside the sync's write
+transaction, takes the INSERT entries since `heavy_hitter_cursor`, and
+seeds itself from the existing rows on its first run.
+
+The summaries are an approximate sidecar, not a view of the current
+data: they count records as they were inserted. Space-Saving cannot take
+a record back out, so deletes, edits of a value and archiving are never
+subtracted, and a re-sync that deletes rows and inserts them again under
+new ids (a cyber CSV without ids) counts them again. The dashboards'
+top-k charts and the API's top-k endpoints therefore count exactly
+(`database/ranges.py` `top_values()`, or the dashboard frame); `top_k()`
+suits insert-only streams where an estimate with error bounds is enough.
+"""
+
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+from database.batch import chunks
+from database.db_manager import DatabaseManager
+from database.versioning import changed_row_ids
+
+CAPACITY = 64  # counters per column and day
+
+# logical table -> (date column, columns to track)
+TRACKED = {
+    "cyber_incidents": ("reported_date", ("type",)),
+    "it_tickets": ("opened_date", ("staff",)),
+}
+
+# Bucket of records without a usable date; only counted in unbounded windows
+UNDATED = ""
+
+
+def ensure_heavy_hitter_tables(conn) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS heavy_hitters (
+            table_name TEXT NOT NULL,
+            column_name TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            item TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            error INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (table_name, column_name, bucket, item)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS heavy_hitter_cursor (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+        """
+    )
+
+
+def space_saving(summary: Dict[str, List[int]], counts: Counter, capacity: int = CAPACITY) -> None:
+    """Add `counts` ({value: n}) to `summary` ({value: [count, error]}) in place.
+
+    Weighted Space-Saving: the largest counts are added first, so a
+    batch's own heavy values claim the free slots.
+    """
+    for item, n in counts.most_common():
+        if item in summary:
+            summary[item][0] += n
+        elif len(summary) < capacity:
+            summary[item] = [n, 0]
+        else:
+            victim = min(summary, key=lambda i: summary[i][0])
+            floor = summary.pop(victim)[0]
+            summary[item] = [floor + n, floor]
+
+
+def _add(conn, table: str, column: str, bucket: str, counts: Counter) -> None:
+    key = (table, column, bucket)
+    summary = {
+        item: [count, error]
+        for item, count, error in conn.execute(
+            "SELECT item, count, error FROM heavy_hitters WHERE table_name = ? AND column_name = ? AND bucket = ?",
+            key,
+        )
+    }
+    space_saving(summary, counts)
+    conn.execute("DELETE FROM heavy_hitters WHERE table_name = ? AND column_name = ? AND bucket = ?", key)
+    conn.executemany(
+        "INSERT INTO heavy_hitters (table_name, column_name, bucket, item, count, error) VALUES (?, ?, ?, ?, ?, ?)",
+        [key + (item, count, error) for item, (count, error) in summary.items()],
+    )
+
+
+def update_heavy_hitters(conn, table: str) -> int:
+    """Add records inserted into `table` since the last call to the day summaries.
+
+    `conn` is the caller's write connection (the sync's transaction).
+    Returns the number of records added.
+    """
+    if table not in TRACKED:
+        return 0
+    ensure_heavy_hitter_tables(conn)
+    date_col, columns = TRACKED[table]
+    select = f"SELECT substr({date_col}, 1, 10), {', '.join(columns)} FROM {table}"
+    latest = conn.execute("SELECT COALESCE(MAX(version), 0) FROM change_log").fetchone()[0]
+    seen = conn.execute("SELECT version FROM heavy_hitter_cursor WHERE table_name = ?", (table,)).fetchone()
+    if seen is None:
+        # First run: seed the summaries from what is already there
+        rows = conn.execute(select).fetchall()
+    else:
+        ids = changed_row_ids(conn, table, seen[0], ops=("INSERT",))
+        rows = [
+            row for chunk in chunks(ids)
+            for row in conn.execute(f"{select} WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+        ]
+    batches = defaultdict(Counter)
+    for day, *values in rows:
+        for column, value in zip(columns, values):
+            if value:
+                batches[(column, day or UNDATED)][value] += 1
+    for (column, bucket), counts in batches.items():
+        _add(conn, table, column, bucket, counts)
+    conn.execute("INSERT OR REPLACE INTO heavy_hitter_cursor (table_name, version) VALUES (?, ?)", (table, latest))
+    return len(rows)
+
+
+def top_k(
+    table: str,
+    column: str,
+    k: int = 5,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    db: Optional[DatabaseManager] = None,
+) -> List[Dict]:
+    """The `k` most frequent values of `column` within [start, end], most frequent first.
+
+    Dates are ISO strings; either bound may be None. Returns dicts with
+    item, count and error: the summed day summaries give `count`, and the
+    value's true count is at least `count - error`. A value missing from
+    some day's full summary may have had up to that day's smallest count
+    there as well.
+    """
+    db = db or DatabaseManager()
+    if not db.fetch_all("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'heavy_hitters'"):
+        return []
+    sql = "SELECT item, SUM(count) AS count, SUM(error) AS error FROM heavy_hitters WHERE table_name = ? AND column_name = ?"
+    params = [table, column]
+    if start or end:
+        sql += " AND bucket <> ?"
+        params.append(UNDATED)
+    if start:
+        sql += " AND bucket >= ?"
+        params.append(start[:10])
+    if end:
+        sql += " AND bucket <= ?"
+        params.append(end[:10])
+    return db.fetch_all(sql + " GROUP BY item ORDER BY count DESC, item LIMIT ?", tuple(params + [k]))
@@ -0,0 +1,90 @@
+"""
+Secondary indexes behind the KPI and dashboard aggregate queries.
+
+Partial indexes hold only the rows a KPI counts (critical incidents, open
+incidents, open tickets), so those counts read a handful of index entries.
+Covering indexes carry every column the grouped aggregates touch, so they
+are answered from the index without visiting the table rows.
+`full_scans()` reports queries that still fall back to scanning a table;
+`scripts/check_query_plans.py` runs it over every KPI and dashboard query.
+"""
+
+import sqlite3
+from typing import List, Optional, Sequence, Tuple
+
+from database.db_manager import DatabaseManager
+from database.storage import CATEGORICAL_COLUMNS, data_table, is_normalized
+
+# (name, table, columns, partial-index condition as (column, value) or None)
+INDEXES: Sequence[Tuple[str, str, Tuple[str, ...], Optional[Tuple[str, str]]]] = (
+    ("idx_cyber_incidents_reported", "cyber_incidents", ("reported_date", "severity", "type", "status"), None),
+    ("idx_cyber_incidents_critical", "cyber_incidents", ("reported_date", "severity"), ("severity", "Critical")),
+    ("idx_cyber_incidents_open", "cyber_incidents", ("reported_date", "status"), ("status", "Open")),
+    ("idx_cyber_incidents_open_severity", "cyber_incidents", ("severity", "status"), ("status", "Open")),
+    ("idx_it_tickets_opened", "it_tickets", ("opened_date", "staff", "status", "category"), None),
+    ("idx_it_tickets_open", "it_tickets", ("staff", "status"), ("status", "Open")),
+    # Range searches of the governance reclassification (database/governance.py)
+    ("idx_datasets_size", "datasets", ("size_mb",), None),
+    ("idx_datasets_rows", "datasets", ("rows",), None),
+    # Date-range filters (database/ranges.py)
+    ("idx_datasets_uploaded", "datasets", ("upload_date",), None),
+)
+
+# DB paths already indexed by this process
+_ensured = set()
+
+
+def ensure_indexes(db: Optional[DatabaseManager] = None) -> None:
+    """Create the indexes in INDEXES for tables that exist.
+
+    With normalized storage the indexes are built on the `{table}_data`
+    id columns instead. A text predicate cannot match an id column, so a
+    partial index becomes a full index led by its condition column, which
+    the view's lookup join searches by id.
+    """
+    db = db or DatabaseManager()
+    if db.db_path in _ensured:
+        return
+    with db.writer() as conn:
+        existing = {
+            r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")
+        }
+        for name, table, columns, where in INDEXES:
+            if table not in existing:
+                continue
+            clause = ""
+            if is_normalized(conn, table):
+                categorical = CATEGORICAL_COLUMNS[table]
+                if where:
+                    columns = (where[0],) + tuple(c for c in columns if c != where[0])
+                table = data_table(table)
+                columns = tuple(f"{c}_id" if c in categorical else c for c in columns)
+            elif where:
+                clause = f" WHERE {where[0]} = '{where[1]}'"
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)}){clause}"
+            )
+    if existing.issuperset(table for _, table, _, _ in INDEXES):
+        _ensured.add(db.db_path)
+
+
+def full_scans(conn: sqlite3.Connection, sql: str, params: Sequence = ()) -> List[str]:
+    """Return the `EXPLAIN QUERY PLAN` steps of `sql` that scan a whole table.
+
+    Only index searches (`SEARCH ...`) and scans of a covering index
+    (`SCAN t USING COVERING INDEX ...`, which never touch the table) pass.
+    `SCAN t USING INDEX ...` walks the whole index and looks up every row
+    in the table, so it is counted like a plain `SCAN t`. Scans of a
+    subquery's result (`SCAN (subquery-1)`, or `SCAN g` after
+    `CO-ROUTINE g` / `MATERIALIZE g`) are not counted.
+    """
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    subqueries = {
+        row[3].split(" ", 1)[1] for row in plan if row[3].startswith(("CO-ROUTINE ", "MATERIALIZE "))
+    }
+    return [
+        row[3] for row in plan
+        if row[3].startswith("SCAN ") and " USING COVERING INDEX " not in row[3]
+        and not row[3].startswith(("SCAN CONSTANT ROW", "SCAN (subquery"))
+        and row[3].split(" ")[1] not in subqueries
+    ]
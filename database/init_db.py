@@ -1,4 +1,7 @@
 from database.db_manager import DatabaseManager
+from database.governance import ensure_governance
+from database.indexes import ensure_indexes
+from database.versioning import ensure_versioning
 
 
 def init_db():
@@ -42,6 +45,13 @@ def init_db():
     )
     """)
 
+    # Data versions used by the snapshot cache (database/snapshot.py)
+    ensure_versioning(main_db)
+    # Indexes behind the KPI and aggregate queries (database/indexes.py)
+    ensure_indexes(main_db)
+    # Stored dataset governance classes (database/governance.py)
+    ensure_governance(main_db)
+
     # Authentication DB (separate file for usernames/passwords)
     auth_db = DatabaseManager(db_path="data/auth.db")
     auth_db.execute("""
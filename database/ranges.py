@@ -0,0 +1,81 @@
+"""
+Date-range predicates on the domain tables' date columns.
+
+Every range filter (dashboards, models, exports, the archive) is built
+here as bare comparisons on the date column, `col >= start` and
+`col < end + 1 day`, which is `BETWEEN start AND end` for whole days
+that also takes timestamps on the last day. A bare column keeps the date
+indexes usable: the query reads only the rows inside the range.
+`top_values()` counts the most frequent values of a column in a range.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from database.db_manager import DatabaseManager
+
+# table -> date column ranges apply to (each leads an index, database/indexes.py)
+DATE_COLUMNS = {
+    "cyber_incidents": "reported_date",
+    "it_tickets": "opened_date",
+    "datasets": "upload_date",
+}
+
+
+def date_range(column: str, start: Optional[str] = None, end: Optional[str] = None) -> Tuple[List[str], list]:
+    """(terms, params) selecting `column` within [start, end]; ISO dates, either may be None."""
+    terms, params = [], []
+    if start:
+        terms.append(f"{column} >= ?")
+        params.append(str(start)[:10])
+    if end:
+        terms.append(f"{column} < date(?, '+1 day')")
+        params.append(str(end)[:10])
+    return terms, params
+
+
+def where_date_range(column: str, start: Optional[str] = None, end: Optional[str] = None) -> Tuple[str, list]:
+    """`date_range()` as a WHERE clause (empty when neither bound is set)."""
+    terms, params = date_range(column, start, end)
+    return (f" WHERE {' AND '.join(terms)}" if terms else ""), params
+
+
+def date_bounds(table: str, db: Optional[DatabaseManager] = None) -> Tuple[Optional[str], Optional[str]]:
+    """(first, last) date of `table` from the date index (None, None when empty)."""
+    db = db or DatabaseManager()
+    column = DATE_COLUMNS[table]
+    row = db.fetch_all(
+        f"SELECT (SELECT MIN({column}) FROM {table} WHERE {column} IS NOT NULL) AS first, "
+        f"(SELECT MAX({column}) FROM {table}) AS last"
+    )[0]
+    return (row["first"][:10] if row["first"] else None), (row["last"][:10] if row["last"] else None)
+
+
+def top_values_query(
+    table: str, column: str, k: int, start: Optional[str] = None, end: Optional[str] = None
+) -> Tuple[str, list]:
+    """(sql, params) of the `k` most frequent non-empty values of `column` within [start, end].
+
+    Rows are (item, count), most frequent first and ties by value; the
+    range is on the table's date column (DATE_COLUMNS).
+    """
+    terms, params = date_range(DATE_COLUMNS[table], start, end)
+    terms.append(f"{column} <> ''")
+    return (
+        f"SELECT {column} AS item, COUNT(*) AS count FROM {table} WHERE {' AND '.join(terms)} "
+        f"GROUP BY {column} ORDER BY count DESC, item LIMIT ?",
+        params + [int(k)],
+    )
+
+
+def top_values(
+    table: str,
+    column: str,
+    k: int,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    db: Optional[DatabaseManager] = None,
+) -> List[Dict]:
+    """Exact `top_values_query()` result as [{item, count}]."""
+    db = db or DatabaseManager()
+    sql, params = top_values_query(table, column, k, start, end)
+    return db.fetch_all(sql, tuple(params))
@@ -0,0 +1,107 @@
+"""
+Optional in-memory read replica of `app.db`.
+
+With the replica enabled, `DatabaseManager.connect_readonly()` for that DB
+returns a connection to a shared-cache `:memory:` copy made with the
+sqlite3 backup API, so dashboard reads never touch the disk or the WAL
+locks. Writes still go to the file.
+
+Before handing out a connection the replica checks `PRAGMA data_version`
+on a connection it keeps open to the file; that value changes whenever
+any other connection commits (a sync, a batch update, an archive run).
+The new copy is built in a second in-memory DB and swapped in under a
+lock, so a reader sees either the old or the new data, never a mix.
+Readers that still hold a connection to the old copy keep using it until
+they close it.
+
+Enable it for the Streamlit app with `APP_READ_REPLICA=1` (see app.py),
+or call `enable_read_replica()`.
+"""
+
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from database import db_manager
+from database.db_manager import BUSY_TIMEOUT
+
+_names = itertools.count()
+
+
+class ReadReplica:
+    """
+    In-memory copy of one DB file, refreshed when the file's data changes.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        # Watches the file for commits by other connections
+        self._source = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._uri: Optional[str] = None
+        # Keeps the current in-memory DB alive between readers
+        self._anchor: Optional[sqlite3.Connection] = None
+        self._seen: Optional[int] = None
+        self.refreshes = 0
+        self.last_refresh_s = 0.0
+
+    def _data_version(self) -> int:
+        return self._source.execute("PRAGMA data_version").fetchone()[0]
+
+    def _refresh(self) -> None:
+        start = time.perf_counter()
+        uri = f"file:replica_{os.getpid()}_{next(_names)}?mode=memory&cache=shared"
+        copy = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        # pages=-1 copies everything in one step inside one read
+        # transaction, so the copy is a consistent snapshot of the file.
+        self._source.backup(copy)
+        old, self._anchor, self._uri = self._anchor, copy, uri
+        if old is not None:
+            old.close()
+        self.refreshes += 1
+        self.last_refresh_s = time.perf_counter() - start
+
+    def connect(self) -> sqlite3.Connection:
+        """Return a connection to an up-to-date copy."""
+        with self._lock:
+            version = self._data_version()
+            if self._uri is None or version != self._seen:
+                self._refresh()
+                self._seen = version
+            uri = self._uri
+        conn = sqlite3.connect(uri, uri=True, timeout=BUSY_TIMEOUT)
+        conn.row_factory = sqlite3.Row
+        # Like the file's read-only connections: writes belong on the file
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._anchor is not None:
+                self._anchor.close()
+            self._source.close()
+            self._anchor = self._uri = None
+
+
+def enable_read_replica(db_path: str = "data/app.db") -> Optional[ReadReplica]:
+    """Serve reads of `db_path` from an in-memory replica; returns it.
+
+    Returns None (and leaves reads on the file) when the DB does not exist
+    yet. Calling it again for the same path returns the existing replica.
+    """
+    key = os.path.abspath(db_path)
+    with db_manager._replicas_guard:
+        replica = db_manager._replicas.get(key)
+        if replica is None and os.path.exists(db_path):
+            replica = db_manager._replicas[key] = ReadReplica(db_path)
+        return replica
+
+
+def disable_read_replica(db_path: str = "data/app.db") -> None:
+    with db_manager._replicas_guard:
+        replica = db_manager._replicas.pop(os.path.abspath(db_path), None)
+    if replica is not None:
+        replica.close()
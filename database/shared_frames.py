@@ -0,0 +1,142 @@
+"""
+Process-wide, read-only table frames shared by every Streamlit session.
+
+Without this each session kept its own copy of the incident, ticket and
+dataset frames, so memory grew with the number of analysts. The store
+keeps one `SharedFrame` per (DB, table, data version) instead: the
+table's snapshot as a memory-mapped Arrow table plus a pandas frame over
+the same buffers (`pd.ArrowDtype` columns, so nothing is copied).
+
+Sessions only ever get views: their own DataFrame objects over the shared
+columns. Under pandas' copy-on-write, adding or overwriting a column in a
+view copies just that column and never changes the shared frame, and
+selecting columns or a contiguous range of rows copies nothing.
+
+Entries are reference-counted by their holders: the store keeps weak
+references, plus a strong one to the newest version of each table, so an
+old version is freed as soon as no session's `FrameCache` holds it.
+
+Without pyarrow the shared frame is a regular DataFrame; views still
+share its memory through copy-on-write.
+"""
+
+import os
+import threading
+import weakref
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from database.db_manager import DatabaseManager
+from database.snapshot import load_versioned_table
+from database.versioning import get_version
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+
+class SharedFrame:
+    """
+    One table at one data version. Never modified after construction.
+
+    `arrow` is the backing `pyarrow.Table` (None without pyarrow).
+    """
+
+    def __init__(self, table: str, version: int, data):
+        self.table = table
+        self.version = version
+        if pa is not None and isinstance(data, pa.Table):
+            self.arrow = data
+            self._frame = data.to_pandas(types_mapper=pd.ArrowDtype)
+        else:
+            self.arrow = None
+            self._frame = data
+
+    def __len__(self) -> int:
+        return len(self._frame)
+
+    @property
+    def nbytes(self) -> int:
+        if self.arrow is not None:
+            return self.arrow.nbytes
+        return int(self._frame.memory_usage(deep=True).sum())
+
+    def view(self, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Return a new DataFrame over the shared columns (all, or `columns`); no data is copied."""
+        frame = self._frame if columns is None else self._frame[list(columns)]
+        return frame.copy(deep=False)
+
+    def rows(self, ids: Iterable[int]) -> pd.DataFrame:
+        """Rows whose `id` is in `ids`, as a small standalone frame."""
+        return self._frame[self._frame["id"].isin(list(ids))].reset_index(drop=True)
+
+
+class SharedFrameStore:
+    """
+    SharedFrames by (absolute DB path, table, version).
+    """
+
+    def __init__(self):
+        self._frames: "weakref.WeakValueDictionary[Tuple[str, str, int], SharedFrame]" = (
+            weakref.WeakValueDictionary()
+        )
+        # (DB path, table) -> newest frame, kept for the next session to open
+        self._latest: Dict[Tuple[str, str], SharedFrame] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    @staticmethod
+    def _path(db: DatabaseManager) -> str:
+        return os.path.abspath(db.db_path)
+
+    def get(self, db: DatabaseManager, table: str, version: int) -> Optional[SharedFrame]:
+        return self._frames.get((self._path(db), table, version))
+
+    def put(self, db: DatabaseManager, table: str, version: int, data) -> SharedFrame:
+        """Share `data` as `table` at `version`; returns the stored frame.
+
+        If another session stored that version first, its frame is
+        returned and `data` is dropped.
+        """
+        shared = SharedFrame(table, version, data)
+        path = self._path(db)
+        with self._lock:
+            existing = self._frames.get((path, table, version))
+            if existing is not None:
+                return existing
+            self._frames[(path, table, version)] = shared
+            latest = self._latest.get((path, table))
+            if latest is None or latest.version < version:
+                self._latest[(path, table)] = shared
+            self.loads += 1
+        return shared
+
+    def load(self, table: str, db: Optional[DatabaseManager] = None) -> SharedFrame:
+        """Return `table` at its current version, mapping its snapshot on a miss."""
+        db = db or DatabaseManager()
+        shared = self.get(db, table, get_version(table, db))
+        if shared is not None:
+            return shared
+        version, data = load_versioned_table(table, db)
+        return self.put(db, table, version, data)
+
+    def stats(self) -> List[Dict]:
+        """One {db, table, version, rows, bytes} row per frame still alive."""
+        with self._lock:
+            frames = list(self._frames.items())
+        return [
+            {"db": path, "table": table, "version": version, "rows": len(f), "bytes": f.nbytes}
+            for (path, table, version), f in sorted(frames, key=lambda kv: kv[0])
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._frames.clear()
+            self._latest.clear()
+            self.loads = 0
+
+
+# Shared by all sessions in the Streamlit process.
+shared_frames = SharedFrameStore()
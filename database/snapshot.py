@@ -0,0 +1,193 @@
+"""
+Versioned columnar snapshots of the domain tables.
+
+After a sync, each table is written to an Arrow IPC file in a
+`snapshots/` folder next to the DB (`data/snapshots/` by default) whose
+name carries the table's data version. Dashboards call `load_frame()`,
+which memory-maps the snapshot when its version matches the DB and only
+falls back to SQLite when it does not. Because the file is mapped rather
+than read, several Streamlit worker processes share the same pages
+through the OS page cache.
+
+`pyarrow` is optional: without it `load_frame()` simply reads SQLite.
+"""
+
+import glob
+import os
+import re
+import tempfile
+from typing import Optional
+
+import pandas as pd
+
+from database.db_manager import DatabaseManager
+from database.versioning import ensure_versioning, get_version
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    ipc = None
+
+# Row order each dashboard expects (mirrors the models' get_all()).
+ORDER_BY = {"cyber_incidents": "reported_date"}
+
+
+def snapshot_dir(db: DatabaseManager) -> str:
+    return os.path.join(os.path.dirname(db.db_path) or ".", "snapshots")
+
+
+def snapshot_path(table: str, version: int, db: DatabaseManager) -> str:
+    return os.path.join(snapshot_dir(db), f"{table}.v{version}.arrow")
+
+
+def _snapshot_version(path: str) -> Optional[int]:
+    match = re.search(r"\.v(\d+)\.arrow$", path)
+    return int(match.group(1)) if match else None
+
+
+def _select_sql(table: str) -> str:
+    sql = f"SELECT * FROM {table}"
+    if table in ORDER_BY:
+        sql += f" ORDER BY {ORDER_BY[table]}"
+    return sql
+
+
+def _read_table(table: str, db: DatabaseManager):
+    """Read `table` and its data version inside one read transaction."""
+    ensure_versioning(db)
+    # In WAL mode a read transaction sees one consistent snapshot, even if
+    # a sync commits between the two SELECTs.
+    conn = db.connect_readonly()
+    try:
+        conn.execute("BEGIN")
+        row = conn.execute(
+            "SELECT version FROM table_versions WHERE table_name = ?", (table,)
+        ).fetchone()
+        version = row[0] if row else 0
+        df = pd.read_sql_query(_select_sql(table), conn)
+        conn.commit()
+    finally:
+        conn.close()
+    return version, df
+
+
+def write_snapshot(table: str, db: Optional[DatabaseManager] = None) -> Optional[str]:
+    """Write the current contents of `table` to a versioned snapshot.
+
+    Returns the snapshot path, or None when pyarrow is not installed.
+    Snapshots of older versions of the same table are removed.
+    """
+    if pa is None:
+        return None
+    db = db or DatabaseManager()
+    version, df = _read_table(table, db)
+    return _write(table, version, df, db)
+
+
+def _write(table: str, version: int, df: pd.DataFrame, db: DatabaseManager) -> str:
+    os.makedirs(snapshot_dir(db), exist_ok=True)
+    path = snapshot_path(table, version, db)
+    arrow_table = pa.Table.from_pandas(df, preserve_index=False)
+    # A unique temp file per writer: threads of one process, and other
+    # processes, may write the same version at the same time.
+    with tempfile.NamedTemporaryFile(
+        dir=snapshot_dir(db), prefix=f"{table}.v{version}.", suffix=".tmp", delete=False
+    ) as sink:
+        tmp = sink.name
+        try:
+            with ipc.new_file(sink, arrow_table.schema) as writer:
+                writer.write_table(arrow_table)
+        except BaseException:
+            sink.close()
+            os.remove(tmp)
+            raise
+    # Atomic rename so concurrent readers never see a partial file.
+    os.replace(tmp, path)
+    # Only older versions go: a concurrent writer may already have
+    # published a newer one.
+    for old in glob.glob(os.path.join(snapshot_dir(db), f"{table}.v*.arrow")):
+        old_version = _snapshot_version(old)
+        if old_version is not None and old_version < version:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+    return path
+
+
+def read_snapshot(
+    table: str, version: int, db: Optional[DatabaseManager] = None
+) -> Optional[pd.DataFrame]:
+    """Memory-map the snapshot for `version`, or return None if absent."""
+    if pa is None:
+        return None
+    path = snapshot_path(table, version, db or DatabaseManager())
+    if not os.path.exists(path):
+        return None
+    try:
+        with pa.memory_map(path, "r") as source:
+            return ipc.open_file(source).read_all().to_pandas()
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+
+def read_snapshot_table(table: str, version: int, db: Optional[DatabaseManager] = None):
+    """Memory-map the snapshot for `version` as a `pyarrow.Table`, or return None.
+
+    Unlike `read_snapshot()` nothing is copied: the table's buffers point
+    into the mapped file and keep it mapped while referenced.
+    """
+    if pa is None:
+        return None
+    path = snapshot_path(table, version, db or DatabaseManager())
+    if not os.path.exists(path):
+        return None
+    try:
+        with pa.memory_map(path, "r") as source:
+            return ipc.open_file(source).read_all()
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+
+def load_versioned_table(table: str, db: Optional[DatabaseManager] = None):
+    """Return (version, data) with data a memory-mapped `pyarrow.Table`.
+
+    Falls back to a DataFrame read from SQLite when pyarrow is missing or
+    the snapshot cannot be written.
+    """
+    db = db or DatabaseManager()
+    version = get_version(table, db)
+    data = read_snapshot_table(table, version, db)
+    if data is not None:
+        return version, data
+    version, df = _read_table(table, db)
+    if pa is not None:
+        _write(table, version, df, db)
+        data = read_snapshot_table(table, version, db)
+        if data is not None:
+            return version, data
+    return version, df
+
+
+def load_frame(table: str, db: Optional[DatabaseManager] = None) -> pd.DataFrame:
+    """Return `table` as a DataFrame, served from the snapshot when current.
+
+    A missing or stale snapshot is rebuilt from SQLite so the next caller
+    (in this or another process) gets the fast path.
+    """
+    return load_versioned_frame(table, db)[1]
+
+
+def load_versioned_frame(table: str, db: Optional[DatabaseManager] = None):
+    """Like `load_frame()`, but return (version, frame) for the same data."""
+    db = db or DatabaseManager()
+    version = get_version(table, db)
+    df = read_snapshot(table, version, db)
+    if df is not None:
+        return version, df
+    version, df = _read_table(table, db)
+    if pa is not None:
+        _write(table, version, df, db)
+    return version, df
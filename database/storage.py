@@ -0,0 +1,363 @@
+"""
+Optional normalized (dictionary-encoded) storage for the domain tables.
+
+In the default layout every incident, ticket and dataset row repeats its
+category strings ("Phishing", "In Progress", ...). In normalized mode each
+table's rows live in `{table}_data`, where the categorical columns listed
+in CATEGORICAL_COLUMNS are stored as integer ids into one `lookup_values`
+dictionary, and `{table}` becomes a view that joins the strings back in.
+Readers (`SELECT * FROM cyber_incidents`, `Model.from_row`, snapshots)
+see exactly the same columns in either layout.
+
+Views cannot be upserted into, so writers go through `encode_rows()` /
+`encode_values()`, which return the physical table and column names and
+translate categorical values to ids. In either layout they also store the
+enumerated columns (CANONICAL_VALUES) in their canonical spelling, so the
+exact comparisons of the KPI queries and partial indexes see every row
+whichever writer stored it.
+
+Switch a DB with `enable_normalized_storage()` / `disable_normalized_storage()`
+or `python -m database.storage {enable,disable,status}`.
+"""
+
+import sqlite3
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from database.db_manager import DatabaseManager
+
+LOOKUP_TABLE = "lookup_values"
+
+# table -> columns stored as lookup ids in normalized mode
+CATEGORICAL_COLUMNS = {
+    "cyber_incidents": ("type", "severity", "status"),
+    "it_tickets": ("staff", "status", "category"),
+    "datasets": ("source",),
+}
+
+# Canonical spelling of the enumerated columns, in every table that has them
+CANONICAL_VALUES = {
+    "severity": ("Low", "Medium", "High", "Critical"),
+    "status": ("Open", "In Progress", "Resolved", "Closed"),
+}
+_CANONICAL = {col: {v.lower(): v for v in values} for col, values in CANONICAL_VALUES.items()}
+
+
+def canonical(column: str, value: Any) -> Any:
+    """`value` in the canonical spelling of `column` ("critical " -> "Critical").
+
+    Values of other columns, non-strings and unknown spellings are returned as given.
+    """
+    if column not in _CANONICAL or not isinstance(value, str):
+        return value
+    return _CANONICAL[column].get(value.strip().lower(), value)
+
+
+def _canonical_rows(columns: Sequence[str], rows: List[Sequence[Any]]) -> List[Sequence[Any]]:
+    positions = [i for i, col in enumerate(columns) if col in _CANONICAL]
+    if not positions or not rows:
+        return rows
+    # Looked up once per distinct value, rows rebuilt only if one changes
+    spelled = {
+        i: {v: canonical(columns[i], v) for v in {r[i] for r in rows}} for i in positions
+    }
+    if all(k == v for m in spelled.values() for k, v in m.items()):
+        return rows
+    return [
+        tuple(spelled[i][v] if i in spelled else v for i, v in enumerate(r))
+        for r in rows
+    ]
+
+
+def data_table(table: str) -> str:
+    return f"{table}_data"
+
+
+def is_normalized(conn: sqlite3.Connection, table: str) -> bool:
+    """True when `table` is the compatibility view over `{table}_data`."""
+    row = conn.execute("SELECT type FROM sqlite_master WHERE name = ?", (table,)).fetchone()
+    return row is not None and row[0] == "view"
+
+
+def uses_normalized_storage(table: str, db: Optional[DatabaseManager] = None) -> bool:
+    """`is_normalized()` checked on a short-lived read connection of `db`."""
+    conn = (db or DatabaseManager()).connect_readonly()
+    try:
+        return is_normalized(conn, table)
+    finally:
+        conn.close()
+
+
+def lookup_id_sql(table: str, column: str, value: str) -> str:
+    """Scalar subquery for the lookup id of `value` in `table.column` (NULL if never stored)."""
+    return f"(SELECT id FROM {LOOKUP_TABLE} WHERE kind = '{table}.{column}' AND value = '{value}')"
+
+
+def storage_table(conn: sqlite3.Connection, table: str) -> str:
+    """Name of the table that physically holds `table`'s rows."""
+    return data_table(table) if is_normalized(conn, table) else table
+
+
+class Encoder:
+    """
+    Maps categorical values to `lookup_values` ids, adding unseen values.
+
+    Use one encoder per write transaction; ids are cached on the instance.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self._ids: Dict[Tuple[str, str], int] = {}
+
+    def ids(self, kind: str, values: Iterable[Any]) -> Dict[Any, Optional[int]]:
+        """Return {value: id} for `values`; None stays None."""
+        wanted = {v for v in values if v is not None and (kind, v) not in self._ids}
+        if wanted:
+            self.conn.executemany(
+                f"INSERT INTO {LOOKUP_TABLE} (kind, value) VALUES (?, ?) ON CONFLICT (kind, value) DO NOTHING",
+                [(kind, v) for v in wanted],
+            )
+            for value in wanted:
+                self._ids[(kind, value)] = self.conn.execute(
+                    f"SELECT id FROM {LOOKUP_TABLE} WHERE kind = ? AND value = ?", (kind, value)
+                ).fetchone()[0]
+        return {v: (None if v is None else self._ids[(kind, v)]) for v in values}
+
+
+def encode_rows(
+    conn: sqlite3.Connection,
+    table: str,
+    columns: Sequence[str],
+    rows: List[Sequence[Any]],
+    encoder: Optional[Encoder] = None,
+) -> Tuple[str, Tuple[str, ...], List[tuple]]:
+    """Translate logical `rows` of `table` for writing.
+
+    Returns (physical table, physical column names, rows). In the default
+    layout only the enumerated columns' spelling may change (`canonical()`).
+    """
+    rows = _canonical_rows(columns, rows)
+    if not is_normalized(conn, table):
+        return table, tuple(columns), rows
+    encoder = encoder or Encoder(conn)
+    categorical = CATEGORICAL_COLUMNS[table]
+    mappings = {
+        i: encoder.ids(f"{table}.{col}", {r[i] for r in rows})
+        for i, col in enumerate(columns) if col in categorical
+    }
+    encoded = [
+        tuple(mappings[i][v] if i in mappings else v for i, v in enumerate(r))
+        for r in rows
+    ]
+    names = tuple(f"{c}_id" if c in categorical else c for c in columns)
+    return data_table(table), names, encoded
+
+
+def encode_values(
+    conn: sqlite3.Connection, table: str, values: Dict[str, Any]
+) -> Tuple[str, Dict[str, Any]]:
+    """`encode_rows()` for a single {column: value} mapping (e.g. an UPDATE's SET)."""
+    physical, names, rows = encode_rows(conn, table, list(values), [tuple(values.values())])
+    return physical, dict(zip(names, rows[0]))
+
+
+def insert_row(
+    conn: sqlite3.Connection,
+    table: str,
+    columns: Sequence[str],
+    row: Sequence[Any],
+    verb: str = "INSERT",
+) -> sqlite3.Cursor:
+    """Insert one logical row; `cursor.lastrowid` is the new row's id."""
+    physical, names, rows = encode_rows(conn, table, columns, [tuple(row)])
+    return conn.execute(
+        f"{verb} INTO {physical} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+        rows[0],
+    )
+
+
+def upsert_sql(physical: str, columns: Sequence[str]) -> str:
+    """Upsert by id into `physical` (`columns[0]` is the id), skipping unchanged rows.
+
+    Unlike INSERT OR REPLACE, an existing row is updated in place, so the
+    change journal records an UPDATE rather than a new INSERT that the
+    journal consumers (anomaly detectors, top-k summaries) would count a
+    second time.
+    """
+    data = columns[1:]
+    return f"""
+        INSERT INTO {physical} ({", ".join(columns)})
+        VALUES ({", ".join("?" * len(columns))})
+        ON CONFLICT(id) DO UPDATE SET
+            {", ".join(f"{c} = excluded.{c}" for c in data)}
+        WHERE {" OR ".join(f"{c} IS NOT excluded.{c}" for c in data)}
+    """
+
+
+def upsert_rows(
+    conn: sqlite3.Connection,
+    table: str,
+    columns: Sequence[str],
+    rows: List[Sequence[Any]],
+    encoder: Optional[Encoder] = None,
+) -> sqlite3.Cursor:
+    """Upsert logical `rows` of `table` by id (see `upsert_sql()`); rows without an id are inserted."""
+    physical, names, rows = encode_rows(conn, table, columns, [tuple(r) for r in rows], encoder)
+    return conn.executemany(upsert_sql(physical, names), rows)
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> List[Tuple[str, str]]:
+    return [(r[1], r[2]) for r in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _view_sql(table: str, columns: Sequence[str]) -> str:
+    categorical = CATEGORICAL_COLUMNS[table]
+    select, joins = [], []
+    for col in columns:
+        if col in categorical:
+            select.append(f"l_{col}.value AS {col}")
+            # The kind term lets a filter on the text value start from the
+            # lookup's (kind, value) index.
+            joins.append(
+                f"LEFT JOIN {LOOKUP_TABLE} l_{col} "
+                f"ON l_{col}.kind = '{table}.{col}' AND l_{col}.id = d.{col}_id"
+            )
+        else:
+            select.append(f"d.{col}")
+    return (
+        f"CREATE VIEW {table} AS SELECT {', '.join(select)} "
+        f"FROM {data_table(table)} d {' '.join(joins)}"
+    )
+
+
+def _copy_sequence(conn: sqlite3.Connection, source: str, target: str) -> None:
+    # Keep AUTOINCREMENT from handing out ids the old table already used.
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (source,)).fetchone()
+    if row:
+        conn.execute("DELETE FROM sqlite_sequence WHERE name = ?", (target,))
+        conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (target, row[0]))
+
+
+def _normalize(conn: sqlite3.Connection, table: str) -> None:
+    categorical = CATEGORICAL_COLUMNS[table]
+    columns = _columns(conn, table)
+    names = [c for c, _ in columns]
+    defs = ["id INTEGER PRIMARY KEY AUTOINCREMENT"] + [
+        f"{c}_id INTEGER REFERENCES {LOOKUP_TABLE} (id)" if c in categorical else f"{c} {t}"
+        for c, t in columns if c != "id"
+    ]
+    conn.execute(f"CREATE TABLE {data_table(table)} ({', '.join(defs)})")
+    for col in categorical:
+        conn.execute(
+            f"INSERT INTO {LOOKUP_TABLE} (kind, value) SELECT DISTINCT ?, {col} FROM {table} "
+            f"WHERE {col} IS NOT NULL ON CONFLICT (kind, value) DO NOTHING",
+            (f"{table}.{col}",),
+        )
+    select = [
+        f"(SELECT id FROM {LOOKUP_TABLE} WHERE kind = '{table}.{c}' AND value = t.{c})"
+        if c in categorical else f"t.{c}"
+        for c in names
+    ]
+    physical = [f"{c}_id" if c in categorical else c for c in names]
+    conn.execute(
+        f"INSERT INTO {data_table(table)} ({', '.join(physical)}) "
+        f"SELECT {', '.join(select)} FROM {table} t"
+    )
+    _copy_sequence(conn, table, data_table(table))
+    conn.execute(f"DROP TABLE {table}")
+    conn.execute(_view_sql(table, names))
+
+
+def _denormalize(conn: sqlite3.Connection, table: str) -> None:
+    categorical = CATEGORICAL_COLUMNS[table]
+    columns = _columns(conn, data_table(table))
+    names = [c[:-3] if c[:-3] in categorical else c for c, _ in columns]
+    defs = ["id INTEGER PRIMARY KEY AUTOINCREMENT"] + [
+        f"{n} TEXT" if n in categorical else f"{n} {t}"
+        for n, (_, t) in zip(names, columns) if n != "id"
+    ]
+    conn.execute(f"DROP VIEW {table}")
+    conn.execute(f"CREATE TABLE {table} ({', '.join(defs)})")
+    conn.execute(_view_sql(table, names).replace(f"VIEW {table} AS", "VIEW _denormalize AS", 1))
+    conn.execute(f"INSERT INTO {table} ({', '.join(names)}) SELECT * FROM _denormalize")
+    conn.execute("DROP VIEW _denormalize")
+    _copy_sequence(conn, data_table(table), table)
+    conn.execute(f"DROP TABLE {data_table(table)}")
+
+
+def _reinstall_dependents(db: DatabaseManager) -> None:
+    # Dropping a table drops its triggers and indexes; recreate them on the
+    # new physical tables. Imported here: these modules import this one.
+    from database import governance, indexes, versioning
+
+    versioning._ensured.discard(db.db_path)
+    versioning.ensure_versioning(db)
+    indexes._ensured.discard(db.db_path)
+    indexes.ensure_indexes(db)
+    governance._ensured.discard(db.db_path)
+    governance.ensure_governance(db)
+
+
+def enable_normalized_storage(db: Optional[DatabaseManager] = None) -> List[str]:
+    """Convert the domain tables to the normalized layout; returns converted tables.
+
+    Row contents and data versions are unchanged, so snapshots stay valid.
+    """
+    db = db or DatabaseManager()
+    converted = []
+    with db.writer() as conn:
+        conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {LOOKUP_TABLE} (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                value TEXT NOT NULL,
+                UNIQUE (kind, value)
+            )
+            """
+        )
+        for table in CATEGORICAL_COLUMNS:
+            row = conn.execute("SELECT type FROM sqlite_master WHERE name = ?", (table,)).fetchone()
+            if row and row[0] == "table":
+                _normalize(conn, table)
+                converted.append(table)
+    _reinstall_dependents(db)
+    return converted
+
+
+def disable_normalized_storage(db: Optional[DatabaseManager] = None) -> List[str]:
+    """Convert normalized tables back to plain tables; returns converted tables."""
+    db = db or DatabaseManager()
+    converted = []
+    with db.writer() as conn:
+        for table in CATEGORICAL_COLUMNS:
+            if is_normalized(conn, table):
+                _denormalize(conn, table)
+                converted.append(table)
+    _reinstall_dependents(db)
+    return converted
+
+
+def main(argv=None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    action = args[0] if args else "status"
+    db = DatabaseManager(args[1]) if len(args) > 1 else DatabaseManager()
+    if action == "enable":
+        print("normalized:", ", ".join(enable_normalized_storage(db)) or "nothing to do")
+    elif action == "disable":
+        print("denormalized:", ", ".join(disable_normalized_storage(db)) or "nothing to do")
+    elif action == "status":
+        conn = db.connect_readonly()
+        try:
+            for table in CATEGORICAL_COLUMNS:
+                print(f"{table}: {'normalized' if is_normalized(conn, table) else 'plain'}")
+        finally:
+            conn.close()
+    else:
+        print("usage: python -m database.storage {enable,disable,status} [db_path]")
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Per-table data versions and the change journal for `data/app.db`.
+
+Every insert, update and delete on a domain table is appended to the
+`change_log` journal by triggers. Each entry gets the next value of one
+monotonically increasing version, and `table_versions` holds the latest
+version per table, so caches can tell whether what they hold is still
+current without re-reading the table. Consumers that keep state (the
+frame caches, the anomaly detectors and the top-k summaries) call
+`changes_since()` / `changed_row_ids()` with the last version they saw
+and only touch the rows that changed.
+"""
+
+from typing import Dict, Iterable, List, Optional
+from database.db_manager import DatabaseManager
+from database.storage import storage_table
+
+DOMAIN_TABLES = ("cyber_incidents", "it_tickets", "datasets")
+
+# DB paths already checked by this process, so readers don't re-run DDL.
+_ensured = set()
+
+
+def _journal_trigger(
+    table: str, name: str, event: str, row_ref: str, op: str, when: str = "", source: str = ""
+) -> str:
+    # `source` is the physical table when `table` is a normalized view
+    return f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_changes_{name}
+        AFTER {event} ON {source or table}
+        {when}
+        BEGIN
+            INSERT INTO change_log (table_name, row_id, op) VALUES ('{table}', {row_ref}.id, '{op}');
+            UPDATE table_versions SET version = last_insert_rowid() WHERE table_name = '{table}';
+        END
+    """
+
+
+def ensure_versioning(db: Optional[DatabaseManager] = None) -> None:
+    """Create `table_versions`, `change_log` and their triggers if missing.
+
+    Triggers are only installed for domain tables that already exist, so
+    this is safe to call before or after `init_db()`.
+    """
+    db = db or DatabaseManager()
+    if db.db_path in _ensured:
+        return
+    with db.writer() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS table_versions (
+                table_name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        existing = {
+            r[0] for r in cur.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")
+        }
+        if "change_log" not in existing:
+            cur.execute(
+                """
+                CREATE TABLE change_log (
+                    version INTEGER PRIMARY KEY AUTOINCREMENT,
+                    table_name TEXT NOT NULL,
+                    row_id INTEGER,
+                    op TEXT NOT NULL CHECK (op IN ('INSERT', 'UPDATE', 'DELETE')),
+                    changed_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+                )
+                """
+            )
+            cur.execute("CREATE INDEX idx_change_log_table ON change_log (table_name, version)")
+            # Continue numbering after any counter-based versions already
+            # handed out, so a version is never reused for different data.
+            start = cur.execute("SELECT COALESCE(MAX(version), 0) FROM table_versions").fetchone()[0]
+            if start:
+                cur.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('change_log', ?)", (start,))
+        for table in DOMAIN_TABLES:
+            if table not in existing:
+                continue
+            cur.execute(
+                "INSERT OR IGNORE INTO table_versions (table_name, version) VALUES (?, 0)",
+                (table,),
+            )
+            source = storage_table(conn, table)
+            for op in ("insert", "update", "delete"):
+                # Counter-only triggers from before the journal existed
+                cur.execute(f"DROP TRIGGER IF EXISTS {table}_version_{op}")
+            cur.execute(_journal_trigger(table, "insert", "INSERT", "NEW", "INSERT", source=source))
+            cur.execute(_journal_trigger(table, "update", "UPDATE", "NEW", "UPDATE", source=source))
+            cur.execute(_journal_trigger(table, "delete", "DELETE", "OLD", "DELETE", source=source))
+            # An update that changes the id also retires the old id
+            cur.execute(_journal_trigger(
+                table, "rekey", "UPDATE OF id", "OLD", "DELETE",
+                when="WHEN OLD.id IS NOT NEW.id", source=source,
+            ))
+    if existing.issuperset(DOMAIN_TABLES):
+        _ensured.add(db.db_path)
+
+
+def bump_version(conn, name: str) -> int:
+    """Give `name` the next version without a journal entry; returns it.
+
+    For state outside the domain tables whose readers still key caches on
+    a version (the governance thresholds). `conn` is a write connection.
+    The number is reserved in change_log's sequence, so it is never handed
+    out twice.
+    """
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'").fetchone()
+    if row is None:
+        version = conn.execute("SELECT COALESCE(MAX(version), 0) FROM table_versions").fetchone()[0] + 1
+        conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('change_log', ?)", (version,))
+    else:
+        version = row[0] + 1
+        conn.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = 'change_log'", (version,))
+    conn.execute(
+        "INSERT INTO table_versions (table_name, version) VALUES (?, ?) "
+        "ON CONFLICT(table_name) DO UPDATE SET version = excluded.version",
+        (name, version),
+    )
+    return version
+
+
+def get_versions(db: Optional[DatabaseManager] = None) -> Dict[str, int]:
+    """Return the current data version of every tracked table."""
+    db = db or DatabaseManager()
+    ensure_versioning(db)
+    rows = db.fetch_all("SELECT table_name, version FROM table_versions")
+    return {r["table_name"]: r["version"] for r in rows}
+
+
+def get_version(table: str, db: Optional[DatabaseManager] = None) -> int:
+    """Return the current data version of `table` (0 if untracked)."""
+    return get_versions(db).get(table, 0)
+
+
+def latest_version(db: Optional[DatabaseManager] = None) -> int:
+    """Return the highest version handed out across all tables."""
+    return max(get_versions(db).values(), default=0)
+
+
+def changes_since(
+    version: int,
+    tables: Optional[Iterable[str]] = None,
+    db: Optional[DatabaseManager] = None,
+    ops: Optional[Iterable[str]] = None,
+    conn=None,
+) -> List[Dict]:
+    """Return journal entries newer than `version`, oldest first.
+
+    Each entry is a dict with version, table_name, row_id, op and
+    changed_at. Pass `tables` to restrict the result to some tables and
+    `ops` to some operations (e.g. `("INSERT",)`). With `conn` the journal
+    is read on the caller's connection, inside its transaction, so the
+    entries agree with the rows it reads next.
+    """
+    sql = "SELECT version, table_name, row_id, op, changed_at FROM change_log WHERE version > ?"
+    params = [version]
+    for column, values in (("table_name", tables), ("op", ops)):
+        if values is not None:
+            values = list(values)
+            sql += f" AND {column} IN ({', '.join('?' * len(values))})"
+            params += values
+    sql += " ORDER BY version"
+    if conn is None:
+        db = db or DatabaseManager()
+        ensure_versioning(db)
+        return db.fetch_all(sql, tuple(params))
+    cur = conn.execute(sql, params)
+    names = [d[0] for d in cur.description]
+    return [dict(zip(names, row)) for row in cur]
+
+
+def changed_row_ids(conn, table: str, version: int, ops: Optional[Iterable[str]] = None) -> List[int]:
+    """Ids of `table`'s rows with journal entries newer than `version`, ascending (see `changes_since()`)."""
+    return sorted({e["row_id"] for e in changes_since(version, (table,), ops=ops, conn=conn)})
@@ -1,18 +1,22 @@
 from dataclasses import dataclass
 from typing import Optional, List, Dict, Any
 from datetime import datetime
+from database.batch import delete_by_ids, update_by_ids
 from database.db_manager import DatabaseManager
+from database.storage import insert_row
+from models.date_range import DateRangeMixin
 
 DB_PATH = "data/app.db"
 
 
 @dataclass
-class CyberIncident:
+class CyberIncident(DateRangeMixin):
     """
       `save()` inserts or updates a record.
       `delete()` removes a record by id.
       `resolution_time_days()` computes days between reported and resolved dates.
       `get_all()` loads all incidents from the DB (class method).
+      `get_between()` loads only the incidents in a reported_date range (class method).
     """
     id: Optional[int]
     type: str
@@ -21,42 +25,36 @@ class CyberIncident:
     reported_date: Optional[str]
     resolved_date: Optional[str] = None
 
+    COLUMNS = ("id", "type", "severity", "status", "reported_date", "resolved_date")
+    TABLE = "cyber_incidents"
+    DATE_COLUMN = "reported_date"
+
     def save(self):
         # Upsert behavior: INSERT if no id, otherwise UPDATE the existing row.
         db = DatabaseManager()
         if self.id is None:
-            conn = db.connect()
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                INSERT INTO cyber_incidents
-                (type, severity, status, reported_date, resolved_date)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (self.type, self.severity, self.status,
-                 self.reported_date, self.resolved_date)
-            )
-            conn.commit()
-            # Populate id with the auto-assigned row id for caller convenience.
-            self.id = cursor.lastrowid
-            conn.close()
+            with db.writer() as conn:
+                cursor = insert_row(
+                    conn, "cyber_incidents", self.COLUMNS[1:],
+                    (self.type, self.severity, self.status,
+                     self.reported_date, self.resolved_date)
+                )
+                # Populate id with the auto-assigned row id for caller convenience.
+                self.id = cursor.lastrowid
         else:
-            db.execute(
-                """
-                UPDATE cyber_incidents
-                SET type = ?, severity = ?, status = ?, reported_date = ?, resolved_date = ?
-                WHERE id = ?
-                """,
-                (self.type, self.severity, self.status,
-                 self.reported_date, self.resolved_date, self.id)
+            update_by_ids(
+                "cyber_incidents",
+                dict(zip(self.COLUMNS[1:], (self.type, self.severity, self.status,
+                                            self.reported_date, self.resolved_date))),
+                [self.id],
+                db,
             )
 
     def delete(self) -> None:
         """Delete this incident from the DB (no-op if id is None)."""
         if self.id is None:
             return
-        db = DatabaseManager(db_path=DB_PATH)
-        db.execute("DELETE FROM cyber_incidents WHERE id = ?", (self.id,))
+        delete_by_ids("cyber_incidents", [self.id], DatabaseManager(db_path=DB_PATH))
 
     def resolution_time_days(self) -> Optional[int]:
         """Return resolution time in days (if both dates are present).
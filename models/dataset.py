@@ -1,10 +1,14 @@
 from dataclasses import dataclass
 from typing import Optional, List, Dict, Any
+from database.batch import delete_by_ids
 from database.db_manager import DatabaseManager
+from database.governance import DEFAULT_THRESHOLDS
+from database.storage import upsert_rows
+from models.date_range import DateRangeMixin
 
 
 @dataclass
-class Dataset:
+class Dataset(DateRangeMixin):
     """
     This model provides convenience helpers used by the Data Science
     dashboard and simple persistence methods (save/delete/get_all).
@@ -16,31 +20,40 @@ class Dataset:
     rows: int
     upload_date: Optional[str]
 
-    def size_category(self) -> str:
-        """Categorize dataset size for governance decisions."""
-        if self.size_mb < 100:
+    COLUMNS = ("id", "dataset_name", "source", "size_mb", "rows", "upload_date")
+    TABLE = "datasets"
+    DATE_COLUMN = "upload_date"
+
+    def size_category(self, thresholds: Optional[Dict[str, float]] = None) -> str:
+        """Categorize dataset size for governance decisions.
+
+        Same rule as the stored classification in database/governance.py;
+        use services/governance_service.py to classify the whole inventory.
+        """
+        t = thresholds or DEFAULT_THRESHOLDS
+        if self.size_mb < t["small_max_mb"]:
             return "Small"
-        elif self.size_mb < 1000:
+        elif self.size_mb < t["medium_max_mb"]:
             return "Medium"
         return "Large"
 
-    def is_archive_candidate(self) -> bool:
+    def is_archive_candidate(self, thresholds: Optional[Dict[str, float]] = None) -> bool:
         """Simple rule-based archiving logic used by the UI."""
-        return self.size_mb > 1000 and self.rows < 100000
+        t = thresholds or DEFAULT_THRESHOLDS
+        return self.size_mb > t["archive_min_mb"] and self.rows < t["archive_max_rows"]
 
     def save(self) -> None:
         # Perform an upsert so CSV re-exports with the same id overwrite DB rows.
-        db = DatabaseManager()
-        db.execute(
-            "INSERT OR REPLACE INTO datasets (id, dataset_name, source, size_mb, rows, upload_date) VALUES (?, ?, ?, ?, ?, ?)",
-            (self.id, self.dataset_name, self.source, self.size_mb, self.rows, self.upload_date),
-        )
+        with DatabaseManager().writer() as conn:
+            upsert_rows(
+                conn, "datasets", self.COLUMNS,
+                [(self.id, self.dataset_name, self.source, self.size_mb, self.rows, self.upload_date)],
+            )
 
     def delete(self) -> None:
         if not self.id:
             return
-        db = DatabaseManager()
-        db.execute("DELETE FROM datasets WHERE id = ?", (self.id,))
+        delete_by_ids("datasets", [self.id])
 
     @classmethod
     def from_row(cls, row: Dict[str, Any]) -> "Dataset":
@@ -0,0 +1,58 @@
+"""
+Date-range queries shared by the models of the dated domain tables.
+
+A model sets `TABLE` and `DATE_COLUMN` and inherits paging, counting and
+window loading, all filtered with the indexed date predicate of
+`database/ranges.py`.
+"""
+
+from typing import List, Optional, Tuple
+
+from database.db_manager import DatabaseManager
+from database.ranges import where_date_range
+
+
+class DateRangeMixin:
+    """
+    Class methods for a model with `TABLE`, `DATE_COLUMN` and `from_row()`.
+
+    Dates are ISO strings and either bound may be None.
+    """
+
+    TABLE = None        # table name, e.g. "it_tickets"
+    DATE_COLUMN = None  # its date column, e.g. "opened_date"
+
+    @classmethod
+    def get_page(
+        cls, page: int = 1, page_size: int = 50, start: Optional[str] = None, end: Optional[str] = None
+    ) -> List:
+        """Return one page (1-based, ordered by id) of records, optionally within a date range."""
+        if page < 1 or page_size < 1:
+            raise ValueError("page and page_size must be positive")
+        db = DatabaseManager()
+        where, params = where_date_range(cls.DATE_COLUMN, start, end)
+        rows = db.fetch_all(
+            f"SELECT * FROM {cls.TABLE}{where} ORDER BY id LIMIT ? OFFSET ?",
+            tuple(params) + (page_size, (page - 1) * page_size),
+        )
+        return [cls.from_row(r) for r in rows]
+
+    @classmethod
+    def count(cls, start: Optional[str] = None, end: Optional[str] = None) -> int:
+        """Number of records, optionally within a date range."""
+        db = DatabaseManager()
+        where, params = where_date_range(cls.DATE_COLUMN, start, end)
+        return db.fetch_all(f"SELECT COUNT(*) AS n FROM {cls.TABLE}{where}", tuple(params))[0]["n"]
+
+    @classmethod
+    def range_query(cls, start: Optional[str] = None, end: Optional[str] = None) -> Tuple[str, list]:
+        """(sql, params) selecting the records dated within [start, end], in date order."""
+        where, params = where_date_range(cls.DATE_COLUMN, start, end)
+        return f"SELECT * FROM {cls.TABLE}{where} ORDER BY {cls.DATE_COLUMN}", params
+
+    @classmethod
+    def get_between(cls, start: Optional[str] = None, end: Optional[str] = None) -> List:
+        """Load only the records in the date range, read through the date column's index."""
+        db = DatabaseManager()
+        sql, params = cls.range_query(start, end)
+        return [cls.from_row(r) for r in db.fetch_all(sql, tuple(params))]
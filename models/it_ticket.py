@@ -1,11 +1,14 @@
 from dataclasses import dataclass
 from typing import Optional, List, Dict, Any
 from datetime import datetime
+from database.batch import delete_by_ids
 from database.db_manager import DatabaseManager
+from database.storage import upsert_rows
+from models.date_range import DateRangeMixin
 
 
 @dataclass
-class ITTicket:
+class ITTicket(DateRangeMixin):
     """
     Model for service desk tickets used by the IT Operations dashboard.
     """
@@ -16,6 +19,10 @@ class ITTicket:
     opened_date: Optional[str]
     closed_date: Optional[str]
 
+    COLUMNS = ("id", "staff", "status", "category", "opened_date", "closed_date")
+    TABLE = "it_tickets"
+    DATE_COLUMN = "opened_date"
+
     def resolution_days(self) -> Optional[int]:
         """Return resolution time in days between opened and closed dates."""
         if not self.opened_date or not self.closed_date:
@@ -33,17 +40,16 @@ class ITTicket:
 
     def save(self) -> None:
         # Upsert by id so CSV updates replace existing tickets when id provided
-        db = DatabaseManager()
-        db.execute(
-            "INSERT OR REPLACE INTO it_tickets (id, staff, status, category, opened_date, closed_date) VALUES (?, ?, ?, ?, ?, ?)",
-            (self.id, self.staff, self.status, self.category, self.opened_date, self.closed_date),
-        )
+        with DatabaseManager().writer() as conn:
+            upsert_rows(
+                conn, "it_tickets", self.COLUMNS,
+                [(self.id, self.staff, self.status, self.category, self.opened_date, self.closed_date)],
+            )
 
     def delete(self) -> None:
         if not self.id:
             return
-        db = DatabaseManager()
-        db.execute("DELETE FROM it_tickets WHERE id = ?", (self.id,))
+        delete_by_ids("it_tickets", [self.id])
 
     @classmethod
     def from_row(cls, row: Dict[str, Any]) -> "ITTicket":
@@ -0,0 +1,67 @@
+"""Move old resolved/closed incidents and tickets to `data/archive.db`, then compact.
+
+Meant to be scheduled nightly; outside the off-peak window
+(`services.archive_service.OFF_PEAK_HOURS`) it exits without doing
+anything unless `--force` is given.
+
+    # cron: every night at 02:00
+    0 2 * * * cd /path/to/app && python scripts/archive.py
+
+Usage:
+    python scripts/archive.py [--older-than DAYS] [--only cyber_incidents,it_tickets]
+                              [--no-compact] [--force]
+    python scripts/archive.py --status
+"""
+
+import sys, os
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+import argparse
+import time
+
+from database.archive import ARCHIVE_AFTER_DAYS, ARCHIVE_POLICIES, partitions
+from database.db_manager import DatabaseManager
+from services.archive_service import run_maintenance
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive old closed records and compact the DBs")
+    parser.add_argument("--older-than", type=int, default=ARCHIVE_AFTER_DAYS,
+                        help=f"archive records closed more than DAYS ago (default {ARCHIVE_AFTER_DAYS})")
+    parser.add_argument("--only", default=",".join(ARCHIVE_POLICIES),
+                        help="comma-separated tables (default: all archivable tables)")
+    parser.add_argument("--no-compact", action="store_true", help="skip checkpoint/VACUUM")
+    parser.add_argument("--force", action="store_true", help="run even outside off-peak hours")
+    parser.add_argument("--status", action="store_true", help="list archive partitions and exit")
+    parser.add_argument("--db", default=os.path.join(ROOT, "data", "app.db"), help="hot SQLite DB")
+    args = parser.parse_args(argv)
+    tables = [t.strip() for t in args.only.split(",") if t.strip()]
+    unknown = [t for t in tables if t not in ARCHIVE_POLICIES]
+    if unknown:
+        parser.error(f"unknown table(s): {', '.join(unknown)}")
+    db = DatabaseManager(db_path=args.db)
+
+    if args.status:
+        for table in tables:
+            parts = partitions(table, db)
+            print(f"{table}: {sum(p['rows'] for p in parts)} archived rows in {len(parts)} partitions")
+            for p in parts:
+                print(f"  {p['month']}  {p['rows']:>8}  {p['partition']}")
+        return 0
+
+    start = time.perf_counter()
+    result = run_maintenance(args.older_than, tables, not args.no_compact, args.force, db=db)
+    if "skipped" in result:
+        print(f"skipped: {result['skipped']} (use --force to run now)")
+        return 0
+    for table, months in result["moved"].items():
+        print(f"{table}: {sum(months.values())} rows archived"
+              + (f" ({', '.join(f'{m}: {n}' for m, n in months.items())})" if months else ""))
+    for path, size in result.get("sizes", {}).items():
+        print(f"compacted {path}: {size / 1024:.0f} KiB")
+    print(f"total: {time.perf_counter() - start:.3f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
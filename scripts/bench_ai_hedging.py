@@ -0,0 +1,70 @@
+"""Show the effect of hedged requests on AI assistant tail latency, offline.
+
+Two `StubProvider` backends share a heavy-tailed latency distribution
+(most replies in ~`--fast-ms`, a `--slow-share` of them in ~`--slow-ms`,
+seeded so runs repeat). The same requests are sent without hedging and
+with hedging after `--hedge-ms`, and the measured p50/p95/p99 of each
+run are printed with the per-provider histograms.
+
+Usage:
+    python scripts/bench_ai_hedging.py [--requests N] [--hedge-ms MS]
+"""
+
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import math
+import random
+import time
+
+from services.ai_providers import StubProvider, hedged_completion, latency_stats
+
+
+def heavy_tail(seed, fast_ms, slow_ms, slow_share):
+    rnd = random.Random(seed)
+
+    def latency(messages):
+        base = slow_ms if rnd.random() < slow_share else fast_ms
+        return base * rnd.uniform(0.8, 1.2) / 1000
+
+    return latency
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def run(label, providers, hedge_ms, n):
+    times = []
+    for i in range(n):
+        start = time.perf_counter()
+        hedged_completion([{"role": "user", "content": f"question {i}"}], providers, hedge_after_ms=hedge_ms)
+        times.append((time.perf_counter() - start) * 1000)
+    print(f"{label:<14}{percentile(times, 50):>9.0f}{percentile(times, 95):>9.0f}{percentile(times, 99):>9.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark hedged AI requests with stub providers")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--fast-ms", type=float, default=20)
+    parser.add_argument("--slow-ms", type=float, default=400)
+    parser.add_argument("--slow-share", type=float, default=0.05)
+    parser.add_argument("--hedge-ms", type=float, default=60)
+    args = parser.parse_args(argv)
+
+    print(f"{'':<14}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    primary = StubProvider("primary", heavy_tail(1, args.fast_ms, args.slow_ms, args.slow_share))
+    run("single", [primary], args.hedge_ms, args.requests)
+    primary = StubProvider("primary", heavy_tail(1, args.fast_ms, args.slow_ms, args.slow_share))
+    secondary = StubProvider("secondary", heavy_tail(2, args.fast_ms, args.slow_ms, args.slow_share))
+    run(f"hedged@{args.hedge_ms:.0f}ms", [primary, secondary], args.hedge_ms, args.requests)
+    # Let abandoned slow attempts finish so their latency is recorded
+    time.sleep(args.slow_ms * 1.3 / 1000)
+    for name, stats in latency_stats().items():
+        print(f"{name}: {stats['requests']} attempts, p50<={stats['p50_ms']} ms, p99<={stats['p99_ms']} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
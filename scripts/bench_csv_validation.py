@@ -0,0 +1,92 @@
+"""Time the vectorized CSV validation against a row-by-row parse.
+
+Writes an incidents CSV of N rows (messy spellings and a share of
+non-integer ids) to a temporary file, then parses it twice: with
+`services.csv_validation.validate` and with a per-row loop in the style
+of the old `parse_*` functions (`iterrows()`, `.strip()` and `int(...)`
+inside try/except). Both must keep the same rows.
+
+Usage:
+    python scripts/bench_csv_validation.py [--rows N] [--bad 0.01]
+"""
+
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import csv
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+from services.csv_validation import CANONICAL_VALUES, NA_VALUES, validate
+
+CANONICAL = {col: {v.lower(): v for v in values} for col, values in CANONICAL_VALUES.items()}
+
+
+def write_csv(path, rows, bad):
+    rng = random.Random(1)
+    with open(path, "w", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["incident_id", "category", "severity", "reported_date", "status", "resolved_date"])
+        for i in range(rows):
+            writer.writerow([
+                f"x{i}" if rng.random() < bad else i,
+                rng.choice(["Phishing", " Malware ", "DDoS"]),
+                rng.choice(["high", "Low ", "MEDIUM", "Critical"]),
+                f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                rng.choice(["open", "Resolved", "in progress"]),
+                rng.choice(["Na", "N/A", "", "2025-12-30"]),
+            ])
+
+
+def per_row(path):
+    df = pd.read_csv(path, dtype=str, keep_default_na=False, na_filter=False)
+    rows, errors = [], []
+    for idx, row in df.iterrows():
+        try:
+            text = {k: v.strip() for k, v in row.items()}
+            text = {k: None if v in NA_VALUES else v for k, v in text.items()}
+            rows.append((
+                int(text["incident_id"]) if text["incident_id"] is not None else None,
+                text["category"] or "",
+                CANONICAL["severity"].get((text["severity"] or "").lower(), text["severity"] or ""),
+                CANONICAL["status"].get((text["status"] or "").lower(), text["status"] or ""),
+                text["reported_date"],
+                text["resolved_date"],
+            ))
+        except Exception as e:
+            errors.append(f"row {idx}: {e}")
+    return rows, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000, help="CSV rows (default 200000)")
+    parser.add_argument("--bad", type=float, default=0.01, help="share of rows with a bad id (default 0.01)")
+    args = parser.parse_args(argv)
+
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    try:
+        write_csv(path, args.rows, args.bad)
+        start = time.perf_counter()
+        result = validate("cyber", path)
+        kept = result.rows()
+        vectorized_s = time.perf_counter() - start
+        start = time.perf_counter()
+        looped, errors = per_row(path)
+        looped_s = time.perf_counter() - start
+    finally:
+        os.remove(path)
+    print(f"{args.rows} rows, {result.invalid_rows} invalid")
+    print(f"vectorized: {vectorized_s:8.2f} s  {len(kept)} rows kept, {len(result.messages())} error message(s)")
+    print(f"per row:    {looped_s:8.2f} s  {len(looped)} rows kept, {len(errors)} error message(s)")
+    same = kept == looped
+    print("same rows" if same else "ROWS DIFFER")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
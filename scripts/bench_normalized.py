@@ -0,0 +1,127 @@
+"""Compare the plain and normalized (dictionary-encoded) storage layouts.
+
+Builds two throwaway copies of the incidents and tickets tables filled
+with the same synthetic rows, converts one with
+`database.storage.enable_normalized_storage()`, then reports the file
+size of each and times the dashboard's aggregates and KPIs three ways:
+the plain queries on the plain layout, the same queries through the
+normalized layout's compatibility views, and the id-grouped queries the
+services run on normalized storage (`NORMALIZED_INCIDENT_AGGREGATES`,
+`NORMALIZED_KPI_QUERIES`). All three must return the same rows.
+
+Usage:
+    python scripts/bench_normalized.py [--rows N] [--repeat N]
+"""
+
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import random
+import shutil
+import tempfile
+import time
+from database.db_manager import DatabaseManager
+from database.indexes import ensure_indexes
+from database.storage import enable_normalized_storage
+from services.cyber_service import INCIDENT_AGGREGATES, NORMALIZED_INCIDENT_AGGREGATES
+from services.kpi_service import KPI_QUERIES, NORMALIZED_KPI_QUERIES
+
+TYPES = ['Phishing', 'Malware', 'Ransomware', 'DDoS', 'Insider Threat', 'Data Leak']
+SEVERITIES = ['Low', 'Medium', 'High', 'Critical']
+STATUSES = ['Open', 'In Progress', 'Resolved', 'Closed']
+STAFF = [f'Analyst {i}' for i in range(40)]
+CATEGORIES = ['Printer', 'Email', 'Software', 'Network', 'Database', 'Laptop', 'VPN', 'Cloud']
+
+PLAIN_QUERIES = dict(INCIDENT_AGGREGATES, **{f'kpi.{k}': v for k, v in KPI_QUERIES.items()})
+ID_QUERIES = dict(NORMALIZED_INCIDENT_AGGREGATES, **{f'kpi.{k}': v for k, v in NORMALIZED_KPI_QUERIES.items()})
+
+
+def build(path, n):
+    rnd = random.Random(42)
+    db = DatabaseManager(path)
+    with db.writer() as conn:
+        conn.execute("""
+            CREATE TABLE cyber_incidents (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, type TEXT, severity TEXT,
+                status TEXT, reported_date TEXT, resolved_date TEXT)""")
+        conn.execute("""
+            CREATE TABLE it_tickets (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, staff TEXT, status TEXT,
+                category TEXT, opened_date TEXT, closed_date TEXT)""")
+        conn.executemany(
+            "INSERT INTO cyber_incidents (type, severity, status, reported_date, resolved_date) VALUES (?, ?, ?, ?, ?)",
+            [(rnd.choice(TYPES), rnd.choice(SEVERITIES), rnd.choice(STATUSES),
+              f"2024-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}", None) for _ in range(n)],
+        )
+        conn.executemany(
+            "INSERT INTO it_tickets (staff, status, category, opened_date, closed_date) VALUES (?, ?, ?, ?, ?)",
+            [(rnd.choice(STAFF), rnd.choice(STATUSES), rnd.choice(CATEGORIES),
+              f"2024-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}", None) for _ in range(n)],
+        )
+    return db
+
+
+def file_size(db):
+    conn = db.connect()
+    try:
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+    return os.path.getsize(db.db_path)
+
+
+def timed(db, queries, repeat):
+    conn = db.connect_readonly()
+    try:
+        best = {}
+        for name, sql in queries.items():
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                conn.execute(sql).fetchall()
+                samples.append(time.perf_counter() - start)
+            best[name] = min(samples)
+        return best
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000, help='rows per table (default 200000)')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per query; the best is reported')
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='bench_normalized_')
+    try:
+        plain = build(os.path.join(workdir, 'plain.db'), args.rows)
+        normalized = build(os.path.join(workdir, 'normalized.db'), args.rows)
+        # Same indexes in both (enabling normalized storage builds its own)
+        ensure_indexes(plain)
+        enable_normalized_storage(normalized)
+
+        plain_size, norm_size = file_size(plain), file_size(normalized)
+        print(f"{args.rows} rows per table")
+        print(f"file size: plain {plain_size / 1e6:.2f} MB, normalized {norm_size / 1e6:.2f} MB "
+              f"({norm_size / plain_size:.0%})")
+
+        base = timed(plain, PLAIN_QUERIES, args.repeat)
+        view = timed(normalized, PLAIN_QUERIES, args.repeat)
+        ids = timed(normalized, ID_QUERIES, args.repeat)
+        print(f"{'query':<18} {'plain ms':>9} {'view ms':>9} {'ids ms':>9}")
+        for name in PLAIN_QUERIES:
+            print(f"{name:<18} {base[name] * 1000:9.2f} {view[name] * 1000:9.2f} {ids[name] * 1000:9.2f}")
+
+        # Both layouts, and both query forms, must answer the same
+        for name, sql in PLAIN_QUERIES.items():
+            expected = plain.fetch_all(sql)
+            assert expected == normalized.fetch_all(sql), name
+            assert expected == normalized.fetch_all(ID_QUERIES[name]), name
+        print("results match")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Compare dashboard read latency from `app.db` and from its in-memory replica.
+
+Works on a temporary copy of the DB. Times the Cybersecurity aggregates
+and a full-table read through `DatabaseManager` with reads on the file,
+then with `database.replica.enable_read_replica()`, and reports how long
+a replica refresh (backup of the whole file) takes after a write.
+
+Usage:
+    python scripts/bench_replica.py [--db data/app.db] [--repeat N]
+"""
+
+import sys, os
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+import argparse
+import shutil
+import sqlite3
+import tempfile
+import time
+from database.db_manager import DatabaseManager
+from database.replica import disable_read_replica, enable_read_replica
+from services.cyber_service import INCIDENT_AGGREGATES
+
+QUERIES = dict(INCIDENT_AGGREGATES, all_incidents="SELECT * FROM cyber_incidents")
+
+
+def _time(db, repeat):
+    timings = {}
+    for name, sql in QUERIES.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            db.fetch_all(sql)
+        timings[name] = (time.perf_counter() - start) / repeat
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark reads from the in-memory replica")
+    parser.add_argument("--db", default=os.path.join(ROOT, "data", "app.db"), help="SQLite DB to read")
+    parser.add_argument("--repeat", type=int, default=200, help="runs per query")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.db):
+        parser.error(f"{args.db} does not exist; run python scripts/sync.py first")
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "app.db")
+    src, dst = sqlite3.connect(args.db), sqlite3.connect(path)
+    src.backup(dst)
+    src.close()
+    dst.close()
+    db = DatabaseManager(db_path=path)
+
+    on_file = _time(db, args.repeat)
+    replica = enable_read_replica(path)
+    try:
+        in_memory = _time(db, args.repeat)
+        print(f"{'query':<16}{'file ms':>10}{'replica ms':>12}{'speedup':>9}")
+        for name in QUERIES:
+            print(f"{name:<16}{on_file[name] * 1000:>10.3f}{in_memory[name] * 1000:>12.3f}"
+                  f"{on_file[name] / in_memory[name]:>8.1f}x")
+        # Touch the file so the next read rebuilds the copy
+        with db.writer() as conn:
+            conn.execute("UPDATE cyber_incidents SET id = id WHERE id = (SELECT MIN(id) FROM cyber_incidents)")
+        db.fetch_all("SELECT 1")
+        print(f"refresh after a write: {replica.last_refresh_s * 1000:.1f} ms "
+              f"({os.path.getsize(path) / 1024:.0f} KiB file)")
+    finally:
+        disable_read_replica(path)
+        shutil.rmtree(tmp, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
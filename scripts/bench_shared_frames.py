@@ -0,0 +1,68 @@
+"""Compare per-session frame memory with and without the shared frame store.
+
+Simulates N sessions opening the incidents, tickets and datasets frames:
+once with a private copy each (`load_versioned_frame`, the old
+behaviour) and once through `FrameCache`, whose frames are views of the
+process-wide `shared_frames` store. Memory is measured with tracemalloc
+plus Arrow's allocator; memory-mapped snapshot pages are not counted
+because the OS page cache holds them once for every process.
+
+Usage:
+    python scripts/bench_shared_frames.py [--sessions N]
+"""
+
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import time
+import tracemalloc
+
+import pyarrow as pa
+
+from database.shared_frames import shared_frames
+from database.snapshot import load_versioned_frame
+from services.frame_service import FrameCache
+
+TABLES = ("cyber_incidents", "it_tickets", "datasets")
+
+
+def _measure(open_session, sessions):
+    tracemalloc.start()
+    arrow_before = pa.total_allocated_bytes()
+    start = time.perf_counter()
+    held = [open_session() for _ in range(sessions)]
+    elapsed = time.perf_counter() - start
+    python_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return held, python_bytes + pa.total_allocated_bytes() - arrow_before, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark shared vs per-session frames")
+    parser.add_argument("--sessions", type=int, default=20, help="simulated concurrent sessions")
+    args = parser.parse_args(argv)
+
+    def private():
+        return [load_versioned_frame(t)[1] for t in TABLES]
+
+    def shared():
+        caches = [FrameCache(t) for t in TABLES]
+        for c in caches:
+            c.refresh()
+        return caches
+
+    held, copies, copies_s = _measure(private, args.sessions)
+    rows = sum(len(f) for f in held[0])
+    del held
+    shared_frames.clear()
+    held, views, views_s = _measure(shared, args.sessions)
+    print(f"{args.sessions} sessions x {rows} rows")
+    print(f"private copies: {copies / 1024:>10.0f} KiB  {copies_s * 1000:8.1f} ms")
+    print(f"shared views:   {views / 1024:>10.0f} KiB  {views_s * 1000:8.1f} ms")
+    for s in shared_frames.stats():
+        print(f"  {s['table']} v{s['version']}: {s['rows']} rows, {s['bytes'] / 1024:.0f} KiB (mapped)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
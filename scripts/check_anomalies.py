@@ -0,0 +1,172 @@
+"""Check the streaming anomaly detectors against exact daily counts.
+
+Builds a throwaway DB and feeds it one day of synthetic tickets at a
+time through the normal sync path (`write_domain`), the way a growing CSV
+would arrive. One category gets a spike of `--spike` times its usual
+volume on one day. Then checks that:
+
+- every series' EWMA mean matches pandas' `ewm(alpha, adjust=False)` over
+  the exact daily counts (empty days included),
+- each sync fed the detectors only that day's new records,
+- the spike day is flagged, and reports how many other days were,
+- re-syncing the same incident CSV, whose rows have no ids and are
+  therefore deleted and inserted again under new ids, flags nothing new
+  and leaves every series' state as it was.
+
+Usage:
+    python scripts/check_anomalies.py [--days N] [--per-day N] [--spike X] [--seed N]
+"""
+
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import random
+import shutil
+import tempfile
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+import pandas as pd
+
+CATEGORIES = ['Printer', 'Email', 'Software', 'Network', 'Database', 'Laptop', 'VPN', 'Cloud']
+TYPES = ['Phishing', 'Malware', 'DDoS', 'Insider', 'Ransomware']
+SEVERITIES = ['Low', 'Medium', 'High', 'Critical']
+
+
+def check_resync(start, days, per_day, spike, rnd, db):
+    """Sync an incident CSV without ids, then twice more unchanged.
+
+    Returns the number of problems found.
+    """
+    from services.sync_service import write_domain
+
+    rows = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        n = rnd.randint(per_day // 2, per_day * 3 // 2)
+        if offset == days - 5:
+            n = int(n * spike)
+        rows += [(None, rnd.choice(TYPES), rnd.choice(SEVERITIES), "Open", day.isoformat(), None) for _ in range(n)]
+    write_domain("cyber", list(rows), db)
+    state = (
+        "SELECT series, day, count, mean, var, days, late FROM anomaly_series "
+        "WHERE table_name = 'cyber_incidents' ORDER BY series"
+    )
+    flags = "SELECT series, day, count, expected, z FROM anomalies WHERE table_name = 'cyber_incidents' ORDER BY 1, 2"
+    before = (db.fetch_all(state), db.fetch_all(flags))
+    for _ in range(2):
+        write_domain("cyber", list(rows), db)
+    after = (db.fetch_all(state), db.fetch_all(flags))
+    new = [f for f in after[1] if f not in before[1]]
+    total = db.fetch_all("SELECT count FROM anomaly_series WHERE series = 'cyber_incidents'")[0]["count"]
+    problems = 0
+    print(f"re-synced {len(rows)} incidents without ids twice: {len(new)} new flagged days, "
+          f"series {'unchanged' if after[0] == before[0] else 'CHANGED'}")
+    if new:
+        print(pd.DataFrame(new).to_string(index=False))
+        problems += 1
+    problems += after[0] != before[0]
+    last = sum(1 for r in rows if r[4] == (start + timedelta(days=days - 1)).isoformat())
+    if total != last:
+        print(f"cyber_incidents: current day count {total} != {last}")
+        problems += 1
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check streaming anomaly detection on synthetic tickets")
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--per-day", type=int, default=40, help="average tickets per day")
+    parser.add_argument("--spike", type=float, default=4.0, help="spike multiplier for one category")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="anomaly_check_")
+    os.chdir(workdir)
+    os.makedirs("data")
+    try:
+        from database.anomaly import ALPHA, MIN_DAYS, SeriesState
+        from database.db_manager import DatabaseManager
+        from database.init_db import init_db
+        from services.anomaly_service import get_anomalies
+        from services.sync_service import write_domain
+
+        init_db()
+        db = DatabaseManager()
+        rnd = random.Random(args.seed)
+        start = date(2025, 1, 1)
+        spike_day = start + timedelta(days=args.days - 5)
+        spike_category = "VPN"
+        rows, daily = [], Counter()
+        ingest_s, failures = [], 0
+        for offset in range(args.days):
+            day = start + timedelta(days=offset)
+            # Weekends are quiet
+            n = rnd.randint(args.per_day // 2, args.per_day * 3 // 2)
+            if day.weekday() >= 5:
+                n //= 4
+            new = [rnd.choice(CATEGORIES) for _ in range(n)]
+            if day == spike_day:
+                new += [spike_category] * int(args.spike * args.per_day / len(CATEGORIES))
+            for category in new:
+                rows.append((len(rows) + 1, "Analyst", "Open", category, day.isoformat(), None))
+                daily[("it_tickets", day)] += 1
+                daily[(f"it_tickets.category={category}", day)] += 1
+            t0 = time.perf_counter()
+            write_domain("it", list(rows), db)
+            ingest_s.append(time.perf_counter() - t0)
+            # Only today's records may reach the detectors, so none is late
+            late = db.fetch_all("SELECT late FROM anomaly_series WHERE series = 'it_tickets'")
+            if late and late[0]["late"]:
+                print(f"day {day}: {late[0]['late']} records arrived late")
+                failures += 1
+
+        # EWMA means against pandas over the exact daily counts
+        states = {
+            r["series"]: r for r in db.fetch_all("SELECT * FROM anomaly_series WHERE table_name = 'it_tickets'")
+        }
+        worst = 0.0
+        for series, state in states.items():
+            first = min(d for (s, d) in daily if s == series)
+            last = date.fromisoformat(state["day"])
+            days = pd.date_range(first, last - timedelta(days=1))
+            counts = pd.Series([daily.get((series, d.date()), 0) for d in days], dtype=float)
+            if counts.empty:
+                continue
+            expected_mean = counts.ewm(alpha=ALPHA, adjust=False).mean().iloc[-1]
+            replay = SeriesState(series, "it_tickets", first)
+            for value in counts:
+                replay._fold(int(value))
+            worst = max(worst, abs(state["mean"] - expected_mean), abs(state["var"] - replay.var))
+            if state["count"] != daily.get((series, last), 0):
+                print(f"{series}: current day count {state['count']} != {daily.get((series, last), 0)}")
+                failures += 1
+        print(f"{len(states)} series over {args.days} days, {len(rows)} tickets")
+        print(f"max |EWMA - exact| = {worst:.2e}")
+        if worst > 1e-9:
+            failures += 1
+
+        flagged = get_anomalies("it_tickets", days=args.days, db=db)
+        hit = flagged[(flagged["Day"] == spike_day.isoformat()) & (flagged["Series"] == f"category: {spike_category}")]
+        others = flagged.drop(hit.index)
+        print(f"spike on {spike_day} ({spike_category}): {'flagged, z=' + str(hit['z-score'].iloc[0]) if len(hit) else 'MISSED'}")
+        checked = sum(max(args.days - MIN_DAYS, 0) for s in states if s != "it_tickets")
+        print(f"other flagged days: {len(others)} of ~{checked} series-days checked (baseline needs {MIN_DAYS} days)")
+        if len(others):
+            print(others.to_string(index=False))
+        if hit.empty:
+            failures += 1
+        failures += check_resync(start, args.days, args.per_day, args.spike, rnd, db)
+        ingest_s.sort()
+        print(f"sync + detectors per day: median {ingest_s[len(ingest_s) // 2] * 1000:.1f} ms, "
+              f"max {ingest_s[-1] * 1000:.1f} ms")
+        print("OK" if not failures else f"FAILED ({failures} problems)")
+        return 1 if failures else 0
+    finally:
+        os.chdir("/")
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Check that values written in any case count in the KPIs.
+
+Builds a throwaway DB and writes incidents and tickets whose severity and
+status are spelled in lower or upper case through the model and service
+APIs (`CyberIncident.save()`, `create_incidents()`, `create_tickets()`,
+the bulk status updates), then checks that the stored values are
+canonical and that `get_incident_kpis()` / `get_ticket_kpis()` count
+every row. Runs once in the plain and once in the normalized layout.
+
+Usage:
+    python scripts/check_canonical_values.py
+"""
+
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import shutil
+import tempfile
+
+
+def check(db):
+    from database.storage import CANONICAL_VALUES
+    from models.cyber_incident import CyberIncident
+    from models.it_ticket import ITTicket
+    from services.cyber_service import create_incidents, update_incident_status_bulk
+    from services.it_service import create_tickets, update_ticket_status_bulk
+    from services.kpi_service import get_incident_kpis, get_ticket_kpis
+
+    CyberIncident(None, "Phishing", "critical", "open", "2025-01-01").save()
+    created = [
+        CyberIncident(None, "Malware", "CRITICAL", "Open", "2025-01-02"),
+        CyberIncident(None, "Malware", "low", "resolved", "2025-01-03"),
+    ]
+    create_incidents(created)
+    update_incident_status_bulk([created[1].id], "open ")
+    ids = [t.id for t in ITTicket.get_all()]
+    create_tickets([
+        ITTicket(None, "Alice", "open", "Email", "2025-01-01", None),
+        ITTicket(None, "Bob", "in progress", "VPN", "2025-01-02", None),
+        ITTicket(None, "Bob", "closed", "VPN", "2025-01-03", "2025-01-04"),
+    ])
+    new = [t.id for t in ITTicket.get_all() if t.id not in ids]
+    update_ticket_status_bulk(new[-1:], "IN PROGRESS")
+
+    failures = []
+    stored = db.fetch_all(
+        "SELECT severity AS value FROM cyber_incidents UNION SELECT status FROM cyber_incidents "
+        "UNION SELECT status FROM it_tickets"
+    )
+    known = {v for values in CANONICAL_VALUES.values() for v in values}
+    odd = sorted(r["value"] for r in stored if r["value"] not in known)
+    if odd:
+        failures.append(f"non-canonical values stored: {odd}")
+    incidents = dict(get_incident_kpis(db))
+    if incidents != {"total": 3, "critical": 2, "open": 3}:
+        failures.append(f"incident KPIs {incidents}")
+    tickets = dict(get_ticket_kpis(db))
+    if tickets != {"total": 3, "open": 1, "in_progress": 2}:
+        failures.append(f"ticket KPIs {tickets}")
+    return failures
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix="canonical_check_")
+    try:
+        from database.db_manager import DatabaseManager
+        from database.init_db import init_db
+        from database.storage import enable_normalized_storage
+
+        failures = 0
+        for layout in ("plain", "normalized"):
+            os.chdir(workdir)
+            os.makedirs(os.path.join(layout, "data"))
+            os.chdir(layout)
+            init_db()
+            db = DatabaseManager(os.path.abspath(os.path.join("data", "app.db")))
+            if layout == "normalized":
+                enable_normalized_storage(db)
+            problems = check(db)
+            print(f"{layout:<10} " + ("ok" if not problems else "; ".join(problems)))
+            failures += bool(problems)
+        print("OK" if not failures else f"FAILED ({failures} layouts)")
+        return 1 if failures else 0
+    finally:
+        os.chdir("/")
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
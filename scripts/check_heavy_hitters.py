@@ -0,0 +1,197 @@
+"""Check the ingest-time top-k summaries against exact counts.
+
+Builds a throwaway DB and syncs `--days` days of synthetic tickets one
+day at a time through `write_domain`, with staff names drawn from a Zipf
+distribution over `--staff` people (many more than the summaries'
+CAPACITY per day). Then, for several windows, compares `top_k()` with
+exact counts: recall of the true top-k, the largest relative count error,
+that every reported `count - error` is a true lower bound, and that the
+counts and the reported top-k stay within the Space-Saving error bound.
+The same windows are then checked on a second DB whose days never hold
+more than CAPACITY distinct staff, where the summaries are exact and
+`top_k()` must return exactly the true top-k.
+
+Also compares the stored summary size and query time with counting a
+frame of every ticket (`value_counts().nlargest(k)`). Finally re-saves
+existing tickets (`ITTicket.save()`, `create_tickets()`) and syncs again:
+updates must leave the summaries and the anomaly detector state unchanged.
+
+Usage:
+    python scripts/check_heavy_hitters.py [--days N] [--per-day N] [--staff N] [--zipf S] [--k N]
+"""
+
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import shutil
+import tempfile
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+
+def ingest(days, per_day, staff, zipf, rng, db):
+    """Sync `per_day` tickets for each day; returns {day: Counter of staff}."""
+    from services.sync_service import write_domain
+
+    weights = 1.0 / np.arange(1, staff + 1) ** zipf
+    weights /= weights.sum()
+    names = np.array([f"Staff {i:05d}" for i in rng.permutation(staff)])
+    exact = {}
+    for day in days:
+        picked = names[rng.choice(staff, size=per_day, p=weights)]
+        exact[day] = Counter(picked.tolist())
+        # New tickets without ids are inserted, as a CSV of new rows would be
+        rows = [(None, s, "Open", "Email", day.isoformat(), None) for s in picked.tolist()]
+        write_domain("it", rows, db)
+    return exact
+
+
+def check_windows(exact, days, k, db):
+    """Compare `top_k()` with the exact counts over several windows; returns the failed windows."""
+    from database.heavy_hitters import CAPACITY, top_k
+
+    windows = {
+        "all": (None, None),
+        "last 7 days": (days[-7], days[-1]),
+        "last 30 days": (days[-30], days[-1]),
+        "first half": (days[0], days[len(days) // 2 - 1]),
+        "single day": (days[10], days[10]),
+    }
+    failures = 0
+    for label, (lo, hi) in windows.items():
+        in_window = [d for d in days if (lo is None or d >= lo) and (hi is None or d <= hi)]
+        truth = Counter()
+        for day in in_window:
+            truth.update(exact[day])
+        # True top-k, ties broken by name as top_k() does
+        expected = sorted(truth.items(), key=lambda kv: (-kv[1], kv[0]))[:k]
+        got = top_k("it_tickets", "staff", k,
+                    lo.isoformat() if lo else None, hi.isoformat() if hi else None, db)
+        recall = len({r["item"] for r in got} & {s for s, _ in expected}) / len(expected)
+        rel = max(abs(r["count"] - truth[r["item"]]) / truth[r["item"]] for r in got)
+        unsound = [r["item"] for r in got if r["count"] - r["error"] > truth[r["item"]]]
+        problems = [f"unsound bounds: {unsound}"] if unsound else []
+        if all(len(exact[d]) <= CAPACITY for d in in_window):
+            # No day ever evicted a value: every summary is exact, so the
+            # top-k must be too, counts included, with no error.
+            if [(r["item"], r["count"]) for r in got] != expected or any(r["error"] for r in got):
+                problems.append(f"not exact: expected {expected}")
+            mode = "exact"
+        else:
+            # Space-Saving: in a day of n records, a value in the summary is
+            # overcounted by at most the smallest counter (<= n / CAPACITY),
+            # and a value evicted or never kept occurred at most that often,
+            # so its absence undercounts it by no more. Summed over the
+            # window's N records every value's summed count is within
+            # eps = N / CAPACITY of the truth, and a reported value can only
+            # have displaced a true top-k one whose count it is within
+            # 2 * eps of: its true count is at least the true k-th's - 2 * eps.
+            eps = sum(truth.values()) / CAPACITY
+            kth = expected[-1][1]
+            off = [r["item"] for r in got if abs(r["count"] - truth[r["item"]]) > eps]
+            wrong = [r["item"] for r in got if truth[r["item"]] < kth - 2 * eps]
+            if off:
+                problems.append(f"count error above {eps:.0f}: {off}")
+            if wrong:
+                problems.append(f"outside the top-{k} bound: {wrong}")
+            mode = f"eps {eps:.0f}"
+        print(f"  {label:<13} {mode:<9} recall {recall:.0%}  max rel. error {rel:.2%}"
+              + "".join(f"  {p}" for p in problems))
+        failures += bool(problems)
+    return failures
+
+
+def in_db(workdir, name):
+    """A fresh initialized DB in its own folder (the app's paths are relative to the cwd).
+
+    The returned manager has an absolute path: per-DB caches (versioning,
+    indexes) are keyed by path, and both DBs are `data/app.db` relatively.
+    """
+    from database.db_manager import DatabaseManager
+    from database.init_db import init_db
+
+    os.chdir(workdir)
+    os.makedirs(os.path.join(name, "data"))
+    os.chdir(name)
+    init_db()
+    return DatabaseManager(os.path.abspath(os.path.join("data", "app.db")))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check heavy-hitter summaries against exact counts")
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--per-day", type=int, default=2000, help="tickets per day")
+    parser.add_argument("--staff", type=int, default=5000, help="distinct staff")
+    parser.add_argument("--zipf", type=float, default=1.2, help="Zipf exponent of staff workload")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="heavy_hitters_check_")
+    try:
+        from database.heavy_hitters import CAPACITY, top_k
+        from models.it_ticket import ITTicket
+        from services.it_service import create_tickets
+        from services.sync_service import write_domain
+
+        rng = np.random.default_rng(args.seed)
+        start = date(2025, 1, 1)
+        days = [start + timedelta(days=i) for i in range(args.days)]
+
+        db = in_db(workdir, "over_capacity")
+        t0 = time.perf_counter()
+        exact = ingest(days, args.per_day, args.staff, args.zipf, rng, db)
+        ingest_s = time.perf_counter() - t0
+        print(f"{args.days} days x {args.per_day} tickets, {args.staff} staff (Zipf {args.zipf}), "
+              f"CAPACITY {CAPACITY}/day, k={args.k}")
+        failures = check_windows(exact, days, args.k, db)
+
+        stored = db.fetch_all("SELECT COUNT(*) AS n FROM heavy_hitters WHERE column_name = 'staff'")[0]["n"]
+        distinct = sum(len(c) for c in exact.values())
+        print(f"summary rows: {stored} (exact per-day counts would need {distinct})")
+        print(f"sync incl. summaries: {ingest_s / args.days * 1000:.1f} ms/day")
+
+        frame = pd.DataFrame({"staff": [s for c in exact.values() for s in c.elements()]})
+        t0 = time.perf_counter()
+        frame["staff"].value_counts().nlargest(args.k)
+        counted = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        top_k("it_tickets", "staff", args.k, db=db)
+        queried = time.perf_counter() - t0
+        print(f"top-{args.k} over all tickets: value_counts {counted * 1000:.1f} ms, "
+              f"top_k {queried * 1000:.1f} ms")
+
+        # Re-saving a ticket is an update, not a new ticket to count again
+        summaries = "SELECT * FROM heavy_hitters ORDER BY 1, 2, 3, 4"
+        detectors = "SELECT * FROM anomaly_series ORDER BY series"
+        before = (db.fetch_all(summaries), db.fetch_all(detectors))
+        saved = [ITTicket.from_row(r) for r in db.fetch_all("SELECT * FROM it_tickets ORDER BY id LIMIT 3")]
+        saved[0].save()
+        saved[1].status = "Closed"
+        saved[1].save()
+        create_tickets(saved)
+        write_domain("it", [], db)
+        resaved = before == (db.fetch_all(summaries), db.fetch_all(detectors))
+        print(f"re-saved tickets: summaries {'unchanged' if resaved else 'CHANGED'}")
+        failures += not resaved
+
+        # Few enough staff that no day exceeds CAPACITY: summaries are exact
+        staff = CAPACITY // 2
+        db = in_db(workdir, "within_capacity")
+        exact = ingest(days, args.per_day, staff, args.zipf, rng, db)
+        print(f"{args.days} days x {args.per_day} tickets, {staff} staff (within CAPACITY)")
+        failures += check_windows(exact, days, args.k, db)
+
+        print("OK" if not failures else f"FAILED ({failures} checks)")
+        return 1 if failures else 0
+    finally:
+        os.chdir("/")
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
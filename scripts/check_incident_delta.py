@@ -0,0 +1,90 @@
+"""Check incrementally patched incident aggregates against a fresh query.
+
+Builds a throwaway DB of incidents whose types, severities and statuses
+have tied counts (and one incident without a severity), loads them into
+a `FrameCache` and the dashboard's aggregates, then changes some rows
+through the service API. After each refresh, the aggregates patched by
+`refresh_incident_aggregates()` from the cache's delta must equal those
+of `INCIDENT_AGGREGATES`, order included. Runs once in the plain and
+once in the normalized layout.
+
+Usage:
+    python scripts/check_incident_delta.py
+"""
+
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import shutil
+import tempfile
+
+TYPES = ['Phishing', 'Malware', 'DDoS', 'Insider']
+SEVERITIES = ['Low', 'Medium', 'High', 'Critical']
+STATUSES = ['Open', 'In Progress', 'Resolved', 'Closed']
+
+
+def check(layout):
+    from database.async_db import run_sync
+    from models.cyber_incident import CyberIncident
+    from services.cyber_service import (
+        create_incidents, delete_incidents, get_incident_aggregates, refresh_incident_aggregates,
+        update_incident_status_bulk,
+    )
+    from services.frame_service import FrameCache
+
+    # 4 of each type, severity and status: every group ties
+    create_incidents([
+        CyberIncident(None, TYPES[i % 4], SEVERITIES[i // 4], STATUSES[(i + i // 4) % 4], f"2025-01-{1 + i:02d}")
+        for i in range(16)
+    ])
+    cache, state = FrameCache("cyber_incidents"), {}
+    cache.refresh()
+    refresh_incident_aggregates(cache, state)
+    steps = {
+        "new incidents": lambda: create_incidents([
+            CyberIncident(None, "Ransomware", "Low", "Open", "2025-02-01"),
+            CyberIncident(None, "Worm", None, "Open", "2025-02-02"),
+        ]),
+        "status changes": lambda: update_incident_status_bulk([1, 6], "Closed"),
+        "deletes": lambda: delete_incidents([2, 7, 12]),
+    }
+    failures = []
+    for label, change in steps.items():
+        change()
+        cache.refresh()
+        patched = cache.delta is not None
+        got = refresh_incident_aggregates(cache, state)
+        expected = run_sync(get_incident_aggregates())
+        wrong = [name for name in expected if got[name] != expected[name]]
+        print(f"[{layout}] {label}: {'patched' if patched else 'reloaded'}, "
+              + (f"differs in {', '.join(wrong)}" if wrong else "matches the query"))
+        if wrong:
+            for name in wrong:
+                print(f"    {name}: patched {got[name]}\n    {' ' * len(name)}  query   {expected[name]}")
+            failures.append(label)
+    return failures
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix="incident_delta_check_")
+    try:
+        from database.init_db import init_db
+        from database.storage import enable_normalized_storage
+
+        failures = 0
+        for layout in ("plain", "normalized"):
+            os.chdir(workdir)
+            os.makedirs(os.path.join(layout, "data"))
+            os.chdir(layout)
+            init_db()
+            if layout == "normalized":
+                enable_normalized_storage()
+            failures += len(check(layout))
+        print("OK" if not failures else f"FAILED ({failures} steps)")
+        return 1 if failures else 0
+    finally:
+        os.chdir("/")
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""Guard: no KPI or dashboard aggregate query may fall back to a full table scan.
+
+Copies the app DB to a temporary file (the original is not modified),
+creates the indexes from `database/indexes.py` and runs
+`EXPLAIN QUERY PLAN` on every query in `services.kpi_service.KPI_QUERIES`
+and `services.cyber_service.INCIDENT_AGGREGATES`, plus the date-range
+window queries of the models (`range_query()`, `count()`), the top-k
+counts of the API (`top_values_query()`) and the date bounds of the
+period filters, first in the plain layout and then after
+converting the copy to normalized storage, where the id-grouped
+`NORMALIZED_KPI_QUERIES` and `NORMALIZED_INCIDENT_AGGREGATES` are
+checked as well. Exits with status 1 when any query scans a table.
+
+Full frame loads (`SELECT * FROM ...` for snapshots and FrameCache) read
+every row by design and are not checked.
+
+Usage:
+    python scripts/check_query_plans.py [--db data/app.db]
+"""
+
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import shutil
+import sqlite3
+import tempfile
+from database.db_manager import DatabaseManager
+from database.indexes import ensure_indexes, full_scans
+from database.storage import enable_normalized_storage
+from database.ranges import DATE_COLUMNS, top_values_query, where_date_range
+from services.cyber_service import INCIDENT_AGGREGATES, NORMALIZED_INCIDENT_AGGREGATES
+from services.frame_service import WINDOW_MODELS
+from services.kpi_service import KPI_QUERIES, NORMALIZED_KPI_QUERIES
+
+# Any 30-day window: the plan does not depend on the dates
+WINDOW = ('2024-01-01', '2024-01-30')
+
+
+def queries(normalized=False):
+    yield from (('kpi.' + name, sql, ()) for name, sql in KPI_QUERIES.items())
+    yield from (('cyber.' + name, sql, ()) for name, sql in INCIDENT_AGGREGATES.items())
+    if normalized:
+        yield from (('kpi.ids.' + name, sql, ()) for name, sql in NORMALIZED_KPI_QUERIES.items())
+        yield from (('cyber.ids.' + name, sql, ()) for name, sql in NORMALIZED_INCIDENT_AGGREGATES.items())
+    for table, model in WINDOW_MODELS.items():
+        sql, params = model.range_query(*WINDOW)
+        yield f'window.{table}', sql, params
+        where, params = where_date_range(DATE_COLUMNS[table], *WINDOW)
+        yield f'window.{table}.count', f"SELECT COUNT(*) FROM {table}{where}", params
+        column = DATE_COLUMNS[table]
+        yield f'bounds.{table}', f"SELECT MIN({column}) FROM {table} WHERE {column} IS NOT NULL", ()
+    for table, column in (('cyber_incidents', 'type'), ('it_tickets', 'staff')):
+        yield f'top.{table}.{column}', *top_values_query(table, column, 5)
+        yield f'top.{table}.{column}.window', *top_values_query(table, column, 5, *WINDOW)
+
+
+def check(db, layout):
+    ensure_indexes(db)
+    conn = db.connect_readonly()
+    failures = 0
+    try:
+        for name, sql, params in queries(layout == 'normalized'):
+            scans = full_scans(conn, sql, params)
+            print(f"[{layout}] {name}: {'FULL SCAN ' + '; '.join(scans) if scans else 'ok'}")
+            failures += bool(scans)
+    finally:
+        conn.close()
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default='data/app.db', help='DB to copy (default data/app.db)')
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.db):
+        print(f"{args.db} not found; run `python -m database.init_db` first")
+        return 2
+
+    workdir = tempfile.mkdtemp(prefix='query_plans_')
+    try:
+        copy = os.path.join(workdir, 'app.db')
+        src, dst = sqlite3.connect(args.db), sqlite3.connect(copy)
+        try:
+            src.backup(dst)
+        finally:
+            src.close()
+            dst.close()
+        db = DatabaseManager(copy)
+        failures = check(db, 'plain')
+        enable_normalized_storage(db)
+        failures += check(db, 'normalized')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(f"{failures} quer{'y' if failures == 1 else 'ies'} with full scans" if failures else "no full scans")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
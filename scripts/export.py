@@ -0,0 +1,56 @@
+"""Stream a filtered export of incidents, tickets or datasets to a file.
+
+Rows are read from one DB cursor and written batch by batch, so memory
+stays flat however many rows match (`services/export_service.py`).
+
+Usage:
+    python scripts/export.py TABLE [--format csv|jsonl|parquet] [--start YYYY-MM-DD] [--end YYYY-MM-DD]
+                             [--where column=value[,value...]] ... [--include-archive] [--out FILE]
+"""
+
+import sys, os
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+import argparse
+import time
+
+from database.db_manager import DatabaseManager
+from services.export_service import EXPORT_FORMATS, EXPORT_TABLES, export_filename, write_export
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a table as CSV, JSON Lines or Parquet")
+    parser.add_argument("table", choices=sorted(EXPORT_TABLES))
+    parser.add_argument("--format", default="csv", choices=list(EXPORT_FORMATS))
+    parser.add_argument("--start", help="first date (inclusive) of the table's date column")
+    parser.add_argument("--end", help="last date (inclusive)")
+    parser.add_argument("--where", action="append", default=[], metavar="COLUMN=VALUES",
+                        help="equality filter; comma-separate several values")
+    parser.add_argument("--include-archive", action="store_true", help="add archived incidents/tickets")
+    parser.add_argument("--out", help="output file (default: named after table, range and format)")
+    parser.add_argument("--db", default=os.path.join(ROOT, "data", "app.db"), help="hot SQLite DB")
+    args = parser.parse_args(argv)
+    filters = {}
+    for term in args.where:
+        column, sep, values = term.partition("=")
+        if not sep:
+            parser.error(f"--where expects COLUMN=VALUES, got {term!r}")
+        filters[column.strip()] = [v.strip() for v in values.split(",")]
+
+    out = args.out or export_filename(args.table, args.format, args.start, args.end)
+    start = time.perf_counter()
+    try:
+        with open(out, "wb") as fh:
+            written = write_export(
+                fh, args.table, args.format, start=args.start, end=args.end, filters=filters,
+                include_archive=args.include_archive, db=DatabaseManager(db_path=args.db),
+            )
+    except ValueError as e:
+        os.remove(out)
+        parser.error(str(e))
+    print(f"wrote {out}: {written / 1024:.0f} KiB in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""Load-test `app.py` with concurrent headless sessions (Streamlit AppTest).
+
+Seeds a throwaway copy of the app's `data/` folder with synthetic CSVs
+(`--rows` per domain), one user per role and a synced `app.db`, then runs
+N sessions at once against it. Each session logs in through the Login
+form as its role (sessions cycle through `--roles`) and visits every
+dashboard the role can open, `--iterations` times.
+
+AppTest swaps process-global Streamlit state on every run, so each
+session runs in its own process; they start together on a barrier and
+contend for the same SQLite files, snapshots and CPU. Process-wide caches
+(figures, shared frames) warm once per session instead of once per
+server, so the latencies are an upper bound for a single server process.
+
+Reports throughput and p50/p95/p99 rerun latency per dashboard (and for
+the login rerun). The run fails (exit 1) when a session raised, when a
+dashboard's p95 exceeds `--max-p95`, or when it regressed by more than
+`--tolerance` against a `--baseline` saved earlier with `--save`.
+
+Usage:
+    python scripts/load_test.py [--sessions N] [--iterations N] [--rows N]
+                                [--roles Admin,Cybersecurity,...]
+                                [--max-p95 MS] [--baseline FILE] [--tolerance 0.25]
+                                [--save FILE]
+"""
+
+import sys, os
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+import argparse
+import json
+import math
+import random
+import shutil
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
+
+import bcrypt
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+ROLES = ("Admin", "Cybersecurity", "Data Science", "IT Operations")
+PASSWORD = "load-test"
+
+TYPES = ['Phishing', 'Malware', 'Ransomware', 'DDoS', 'Insider Threat', 'Data Leak']
+SEVERITIES = ['Low', 'Medium', 'High', 'Critical']
+STATUSES = ['Open', 'In Progress', 'Resolved', 'Closed']
+STAFF = [f'Analyst {i}' for i in range(40)]
+CATEGORIES = ['Printer', 'Email', 'Software', 'Network', 'Database', 'Laptop', 'VPN', 'Cloud']
+SOURCES = ['IT', 'HR', 'Finance', 'Marketing', 'Sales', 'Operations']
+
+
+def _date(rnd):
+    return f"2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}"
+
+
+def _closed(rnd, opened):
+    return (pd.Timestamp(opened) + pd.Timedelta(days=rnd.randint(0, 30))).strftime("%Y-%m-%d")
+
+
+def seed(workdir, rows, seed_value=42):
+    """Write synthetic CSVs and users into `workdir/data` and sync them (cwd must be `workdir`)."""
+    rnd = random.Random(seed_value)
+    data = os.path.join(workdir, "data")
+    os.makedirs(data, exist_ok=True)
+    incidents = []
+    for i in range(1, rows + 1):
+        reported, status = _date(rnd), rnd.choice(STATUSES)
+        resolved = _closed(rnd, reported) if status in ("Resolved", "Closed") else "Na"
+        incidents.append((i, rnd.choice(TYPES), rnd.choice(SEVERITIES), reported, status, resolved))
+    pd.DataFrame(incidents, columns=["id", "category", "severity", "reported_date", "status", "resolved_date"]) \
+        .to_csv(os.path.join(data, "cyber_incidents.csv"), index=False)
+    tickets = []
+    for i in range(1, rows + 1):
+        opened, status = _date(rnd), rnd.choice(STATUSES)
+        tickets.append((i, rnd.choice(CATEGORIES), rnd.choice(STAFF), status, opened, _closed(rnd, opened)))
+    pd.DataFrame(tickets, columns=["id", "category", "staff", "status", "opened_date", "closed_date"]) \
+        .to_csv(os.path.join(data, "it_tickets.csv"), index=False)
+    datasets = [
+        (i, f"dataset_{i}", rnd.choice(SOURCES), round(rnd.uniform(1, 5000), 1), rnd.randint(100, 2_000_000), _date(rnd))
+        for i in range(1, rows + 1)
+    ]
+    pd.DataFrame(datasets, columns=["id", "dataset_name", "source", "size_mb", "rows", "upload_date"]) \
+        .to_csv(os.path.join(data, "datasets.csv"), index=False)
+
+    from database.init_db import init_db
+    from services.sync_service import DOMAINS, sync_domain
+    from services.user_service import create_user
+    init_db()
+    for domain in DOMAINS:
+        sync_domain(domain)
+    hashed = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt()).decode()
+    for role in ROLES:
+        create_user(_username(role), hashed, role)
+
+
+def _username(role):
+    return "load_" + role.lower().replace(" ", "_")
+
+
+def run_session(role, iterations, timeout, start_barrier):
+    """Log in as `role` and visit its dashboards.
+
+    Returns ([(page, seconds)], [failure], (first start, last end)) with
+    wall-clock times for the throughput window.
+    """
+    timings, failures = [], []
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=timeout)
+    at.run()
+    at.text_input[0].input(_username(role))
+    at.text_input[1].input(PASSWORD)
+    start_barrier.wait()
+    began = time.time()
+    try:
+        start = time.perf_counter()
+        at.button[0].click().run()
+        at.run()  # the rerun after login renders the first dashboard
+        timings.append(("login", time.perf_counter() - start))
+        if at.exception or not at.session_state["logged_in"]:
+            failures.append(f"{role}: login failed {[e.value for e in at.exception]}")
+            return timings, failures, (began, time.time())
+        names = at.sidebar.selectbox[0].options
+        for _ in range(iterations):
+            for name in names:
+                start = time.perf_counter()
+                at.sidebar.selectbox[0].select(name).run()
+                timings.append((name, time.perf_counter() - start))
+                if at.exception:
+                    failures.append(f"{role} / {name}: {at.exception[0].value}")
+                    return timings, failures, (began, time.time())
+    except Exception as e:
+        failures.append(f"{role}: {e!r}")
+    return timings, failures, (began, time.time())
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of `values` (p in 0-100)."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def summarize(timings, wall):
+    by_name = defaultdict(list)
+    for name, seconds in timings:
+        by_name[name].append(seconds)
+    return {
+        name: {
+            "reruns": len(values),
+            "per_s": len(values) / wall,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+        }
+        for name, values in sorted(by_name.items())
+    }
+
+
+def check(report, max_p95=None, baseline=None, tolerance=0.25):
+    """Return the threshold violations in `report`."""
+    problems = []
+    for name, stats in report.items():
+        if name == "login":
+            # Dominated by bcrypt's deliberate cost
+            continue
+        if max_p95 is not None and stats["p95_ms"] > max_p95:
+            problems.append(f"{name}: p95 {stats['p95_ms']:.0f} ms > {max_p95:.0f} ms")
+        if baseline and name in baseline:
+            limit = baseline[name]["p95_ms"] * (1 + tolerance)
+            if stats["p95_ms"] > limit:
+                problems.append(
+                    f"{name}: p95 {stats['p95_ms']:.0f} ms regressed past {limit:.0f} ms "
+                    f"(baseline {baseline[name]['p95_ms']:.0f} ms + {tolerance:.0%})"
+                )
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for app.py")
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent sessions")
+    parser.add_argument("--iterations", type=int, default=3, help="passes over each session's dashboards")
+    parser.add_argument("--rows", type=int, default=2000, help="synthetic rows per domain")
+    parser.add_argument("--roles", default=",".join(ROLES), help="comma-separated roles, assigned round-robin")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds allowed per rerun")
+    parser.add_argument("--max-p95", type=float, default=None, help="fail if any dashboard's p95 exceeds MS")
+    parser.add_argument("--baseline", default=None, help="JSON report from --save to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 regression vs baseline")
+    parser.add_argument("--save", default=None, help="write the report as JSON")
+    args = parser.parse_args(argv)
+    roles = [r.strip() for r in args.roles.split(",") if r.strip()]
+    unknown = [r for r in roles if r not in ROLES]
+    if unknown:
+        parser.error(f"unknown role(s): {', '.join(unknown)}")
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["dashboards"]
+
+    # The app uses paths relative to the working directory (data/app.db, ...)
+    workdir = tempfile.mkdtemp(prefix="load_test_")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        start = time.perf_counter()
+        seed(workdir, args.rows)
+        print(f"seeded {args.rows} rows per domain in {time.perf_counter() - start:.1f}s ({workdir})")
+
+        timings, failures, windows = [], [], []
+        with Manager() as manager, ProcessPoolExecutor(max_workers=args.sessions) as pool:
+            barrier = manager.Barrier(args.sessions)
+            futures = [
+                pool.submit(run_session, roles[i % len(roles)], args.iterations, args.timeout, barrier)
+                for i in range(args.sessions)
+            ]
+            for future in futures:
+                session_timings, session_failures, window = future.result()
+                timings += session_timings
+                failures += session_failures
+                windows.append(window)
+        wall = max(end for _, end in windows) - min(began for began, _ in windows)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = summarize(timings, wall)
+    print(f"{args.sessions} sessions x {args.iterations} iterations in {wall:.1f}s "
+          f"({len(timings) / wall:.1f} reruns/s)")
+    print(f"{'page':<16}{'reruns':>8}{'per s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name, s in report.items():
+        print(f"{name:<16}{s['reruns']:>8}{s['per_s']:>8.2f}{s['p50_ms']:>9.0f}{s['p95_ms']:>9.0f}{s['p99_ms']:>9.0f}")
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"sessions": args.sessions, "rows": args.rows, "dashboards": report}, f, indent=2)
+
+    problems = failures + check(report, args.max_p95, baseline, args.tolerance)
+    for p in problems:
+        print(f"FAIL {p}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
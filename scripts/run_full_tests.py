@@ -31,10 +31,10 @@ def restore(fp):
             print(f"Warning: backup not found for {fp}: {bak}")
 
 def sync_cyber():
-    subprocess.check_call([sys.executable, os.path.join(ROOT, 'scripts', 'sync_csv_now.py')])
+    subprocess.check_call([sys.executable, os.path.join(ROOT, 'scripts', 'sync.py'), '--only', 'cyber'])
 
 def sync_others():
-    subprocess.check_call([sys.executable, os.path.join(ROOT, 'scripts', 'sync_other_csvs.py')])
+    subprocess.check_call([sys.executable, os.path.join(ROOT, 'scripts', 'sync.py'), '--only', 'datasets,it'])
 
 def query(sql):
     conn = sqlite3.connect(DB)
@@ -0,0 +1,120 @@
+"""Sync the domain CSVs in `data/` into `data/app.db`.
+
+CSVs are parsed and normalized in parallel in a process pool; the parsed
+rows are then written one domain at a time by this process, so SQLite only
+ever sees a single writer.
+
+Rows that fail validation are left out and reported as warnings. The
+exit status is 1 when a domain could not be parsed or written (the other
+domains are still synced), or with `--strict` when any row is invalid, in
+which case nothing is written.
+
+Usage:
+    python scripts/sync.py                      # all domains
+    python scripts/sync.py --only cyber,it      # a subset
+    python scripts/sync.py --dry-run            # parse and report only
+    python scripts/sync.py --strict             # invalid rows are fatal
+"""
+
+import sys, os
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from database.db_manager import DatabaseManager
+from database.snapshot import write_snapshot
+from services.sync_service import DOMAINS, parse_domain, write_domain
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sync domain CSVs into app.db")
+    parser.add_argument(
+        "--only",
+        default=",".join(DOMAINS),
+        help=f"comma-separated domains to sync (default: all of {', '.join(DOMAINS)})",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="parse and validate without writing")
+    parser.add_argument("--strict", action="store_true", help="fail without writing if any row is invalid")
+    parser.add_argument("--workers", type=int, default=None, help="parser processes (default: one per domain)")
+    parser.add_argument(
+        "--checkpoint",
+        default="PASSIVE",
+        choices=["PASSIVE", "FULL", "RESTART", "TRUNCATE", "none"],
+        help="WAL checkpoint to run after writing (default: PASSIVE)",
+    )
+    parser.add_argument("--db", default=os.path.join(ROOT, "data", "app.db"), help="target SQLite DB")
+    args = parser.parse_args(argv)
+    args.only = [d.strip() for d in args.only.split(",") if d.strip()]
+    unknown = [d for d in args.only if d not in DOMAINS]
+    if unknown:
+        parser.error(f"unknown domain(s): {', '.join(unknown)}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    total_start = time.perf_counter()
+    db = DatabaseManager(db_path=args.db)
+
+    # --- Parse stage: one process per CSV ---
+    start = time.perf_counter()
+    workers = args.workers or len(args.only)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            d: pool.submit(parse_domain, d, os.path.join(ROOT, DOMAINS[d][0]))
+            for d in args.only
+        }
+        results, failed = [], []
+        for domain, future in futures.items():
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"  {domain}: parse failed: {e}")
+                failed.append(domain)
+    print(f"parse: {time.perf_counter() - start:.3f}s wall")
+
+    invalid = False
+    for res in results:
+        domain = res["domain"]
+        print(f"  {domain}: {len(res['rows'])} rows parsed in {res['parse_s']:.3f}s, {res['invalid_rows']} invalid")
+        for msg in res["errors"][:10]:
+            print(f"    warning: {msg}")
+        invalid = invalid or bool(res["errors"])
+
+    if args.dry_run or (args.strict and invalid):
+        reason = "dry run" if args.dry_run else "invalid rows with --strict"
+        print(f"{reason}, nothing written ({time.perf_counter() - total_start:.3f}s total)")
+        return 1 if failed or (args.strict and invalid) else 0
+
+    # --- Write stage: single writer, one transaction per domain ---
+    for res in results:
+        domain = res["domain"]
+        table = DOMAINS[domain][1]
+        start = time.perf_counter()
+        try:
+            changes = write_domain(domain, res["rows"], db)
+        except Exception as e:
+            print(f"write {table} failed, nothing written: {e}")
+            failed.append(domain)
+            continue
+        write_s = time.perf_counter() - start
+        start = time.perf_counter()
+        write_snapshot(table, db)
+        print(f"write {table}: {changes} changes in {write_s:.3f}s, snapshot: {time.perf_counter() - start:.3f}s")
+
+    if args.checkpoint != "none":
+        start = time.perf_counter()
+        busy, wal_pages, done = db.checkpoint(args.checkpoint)
+        print(f"checkpoint {args.checkpoint}: {done}/{wal_pages} pages in {time.perf_counter() - start:.3f}s"
+              + (" (readers busy, will retry automatically)" if busy else ""))
+
+    print(f"total: {time.perf_counter() - total_start:.3f}s")
+    if failed:
+        print(f"failed: {', '.join(failed)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
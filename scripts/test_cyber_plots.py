@@ -1,53 +1,115 @@
-"""Utility to validate the grouping logic used by the Cybersecurity dashboard.
+"""Benchmark the Cybersecurity dashboard's figures with and without the figure cache.
 
-This script loads incidents from the DB, computes monthly/daily groupings
-and attempts to construct Plotly figures to ensure the plotting code
-works outside of Streamlit.
+Loads incidents from the DB, checks that the monthly/daily groupings and
+Plotly figures build outside of Streamlit, then times each figure built
+from scratch (grouping + Plotly Express) against a warm hit from
+`services.figure_cache`. Both paths include the conversion that
+`st.plotly_chart` applies to what it is given, so the numbers reflect
+what a rerun actually pays.
+
+Usage:
+    python scripts/test_cyber_plots.py [--repeat N]
 """
 
 import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from models.cyber_incident import CyberIncident
-from dataclasses import asdict
+import argparse
+import time
 import pandas as pd
+import plotly.express as px
+import plotly.tools
+from database.snapshot import load_versioned_frame
+from services.figure_cache import FigureCache
+
+
+def prepare(df):
+    df = df.copy()
+    df['reported_date'] = pd.to_datetime(df['reported_date'], errors='coerce')
+    df = df.dropna(subset=['reported_date'])
+    df['month'] = df['reported_date'].dt.to_period('M').dt.to_timestamp()
+    return df
+
+
+def builders(df):
+    """Figure builders mirroring Dashboards/Cybersecurity.py (grouping included)."""
+    def time_fig():
+        d = prepare(df)
+        monthly = d.groupby('month').size().reset_index(name='count')
+        return px.line(monthly, x='month', y='count', title='Incidents Over Time (Monthly)')
+
+    def severity_fig():
+        d = prepare(df)
+        sev_time = d.groupby(['month', 'severity']).size().reset_index(name='count')
+        return px.area(sev_time, x='month', y='count', color='severity', title='Severity Distribution')
+
+    def status_fig():
+        counts = df['status'].value_counts().reset_index()
+        counts.columns = ['Status', 'Count']
+        return px.pie(counts, names='Status', values='Count', title='Incident Status Breakdown')
+
+    def categories_fig():
+        d = prepare(df)
+        top = d['type'].value_counts().nlargest(5).index.tolist()
+        top_df = d[d['type'].isin(top)]
+        cat_trends = top_df.groupby(['month', 'type']).size().reset_index(name='count')
+        return px.line(cat_trends, x='month', y='count', color='type', title='Top Categories Trends')
+
+    def severity_bar():
+        counts = df['severity'].value_counts().reset_index()
+        counts.columns = ['Severity', 'Count']
+        return px.bar(counts, x='Severity', y='Count', title='Incidents by Severity')
+
+    return {
+        'cyber.incidents_over_time': time_fig,
+        'cyber.severity_over_time': severity_fig,
+        'cyber.status_breakdown': status_fig,
+        'cyber.top_categories': categories_fig,
+        'cyber.severity_counts': severity_bar,
+    }
+
+
+def as_streamlit(fig_or_dict):
+    # What st.plotly_chart does with its argument before serializing it.
+    return plotly.tools.return_figure_from_figure_or_data(fig_or_dict, validate_figure=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    version, df = load_versioned_frame('cyber_incidents')
+    print('Loaded incidents:', len(df), 'at data version', version)
+    if df.empty:
+        raise SystemExit('No incidents')
+
+    charts = builders(df)
+    # Sanity check: every figure builds
+    for chart_id, build in charts.items():
+        as_streamlit(build())
+    print('Built figures:', ', '.join(charts))
+
+    cache = FigureCache()
+    print(f"\n{'chart':28} {'cold ms':>9} {'warm ms':>9} {'speedup':>8}")
+    total_cold = total_warm = 0.0
+    for chart_id, build in charts.items():
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            cache.clear()
+            as_streamlit(cache.get_or_build(chart_id, version, None, build))
+        cold = (time.perf_counter() - start) / args.repeat
+
+        cache.get_or_build(chart_id, version, None, build)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            as_streamlit(cache.get_or_build(chart_id, version, None, build))
+        warm = (time.perf_counter() - start) / args.repeat
+
+        total_cold += cold
+        total_warm += warm
+        print(f"{chart_id:28} {cold * 1000:9.2f} {warm * 1000:9.2f} {cold / warm:7.1f}x")
+    print(f"{'all figures':28} {total_cold * 1000:9.2f} {total_warm * 1000:9.2f} {total_cold / total_warm:7.1f}x")
 
 
-incidents = CyberIncident.get_all()
-print('Loaded incidents:', len(incidents))
-if not incidents:
-    raise SystemExit('No incidents')
-
-df = pd.DataFrame([asdict(i) for i in incidents])
-print('Columns:', df.columns.tolist())
-
-# Prepare dates
-df['reported_date'] = pd.to_datetime(df['reported_date'], errors='coerce')
-df = df.dropna(subset=['reported_date'])
-df['month'] = df['reported_date'].dt.to_period('M').dt.to_timestamp()
-print('After date parse, rows:', len(df))
-
-# monthly
-monthly = df.groupby('month').size().reset_index(name='count')
-print('Monthly groups:', len(monthly))
-print(monthly.head())
-
-# severity over time
-if 'severity' in df.columns:
-    sev_time = df.groupby(['month','severity']).size().reset_index(name='count')
-    print('Severity-time groups:', len(sev_time))
-    print(sev_time.head())
-
-# top categories trends
-if 'type' in df.columns:
-    top_categories = df['type'].value_counts().nlargest(5).index.tolist()
-    print('Top categories:', top_categories)
-    top_df = df[df['type'].isin(top_categories)]
-    cat_trends = top_df.groupby(['month','type']).size().reset_index(name='count')
-    print('Category trends groups:', len(cat_trends))
-    print(cat_trends.head())
-    # Try creating plotly figures to check for errors
-    import plotly.express as px
-    fig_time = px.line(monthly, x='month', y='count', title='Incidents Over Time (Monthly)')
-    fig_sev = px.area(sev_time, x='month', y='count', color='severity', title='Severity Distribution')
-    fig_cat = px.line(cat_trends, x='month', y='count', color='type', title='Top Categories Trends')
-    print('Created figures:', type(fig_time), type(fig_sev), type(fig_cat))
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Compact incident-data context for the AI assistant.
+
+`incident_context()` turns the Cybersecurity dashboard's cached aggregates
+(`services.cyber_service.INCIDENT_AGGREGATES`) into a short plain-text
+summary - headline counts, severity mix, open backlog, top categories and
+the monthly trend - that `with_context()` attaches to the chat messages.
+Sections are added in that order of priority until the token budget is
+used up; the category and trend lists are cut to fit. Nothing here reads
+the DB, and summaries are cached per (data version, budget), so a
+question costs no query and the text is only rebuilt after the data
+changes.
+"""
+
+import math
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+# Tokens the summary may use; override with AI_CONTEXT_TOKENS.
+DEFAULT_TOKEN_BUDGET = int(os.getenv("AI_CONTEXT_TOKENS", "400"))
+TOP_CATEGORIES = 5
+MAX_CACHED = 64
+
+_cache: "OrderedDict[tuple, str]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for English text)."""
+    return math.ceil(len(text) / 4)
+
+
+def _pairs(rows: List[Dict[str, Any]], key: str, count: str) -> List[tuple]:
+    return [(r[key] if r[key] is not None else "Unknown", int(r[count])) for r in rows if r[count]]
+
+
+def _share(pairs: List[tuple]) -> List[str]:
+    total = sum(n for _, n in pairs) or 1
+    return [f"{k} {n} ({n / total:.0%})" for k, n in pairs]
+
+
+def _fit(prefix: str, items: List[str], budget: int, keep_last: bool = False) -> Optional[str]:
+    """`prefix` plus as many `items` as fit in `budget` tokens (the last ones if `keep_last`)."""
+    chosen: List[str] = []
+    for item in (reversed(items) if keep_last else items):
+        candidate = [item] + chosen if keep_last else chosen + [item]
+        if estimate_tokens(prefix + ", ".join(candidate)) > budget:
+            break
+        chosen = candidate
+    return prefix + ", ".join(chosen) + "." if chosen else None
+
+
+def _sections(aggs: Dict[str, List[Dict[str, Any]]]) -> Iterable[tuple]:
+    """(prefix, items, keep_last) per section, most important first."""
+    kpis = aggs["kpis"][0]
+    yield (
+        "Incident data summary: ",
+        [f"{int(kpis['total'])} incidents with a reported date",
+         f"{int(kpis['critical'])} critical", f"{int(kpis['open'])} open"],
+        False,
+    )
+    yield "Severity mix: ", _share(_pairs(aggs["by_severity"], "Severity", "Count")), False
+    if "open_by_severity" in aggs:
+        backlog = _pairs(aggs["open_by_severity"], "Severity", "Count")
+        yield "Open backlog by severity: ", [f"{k} {n}" for k, n in backlog], False
+    yield "Status: ", [f"{k} {n}" for k, n in _pairs(aggs["by_status"], "Status", "Count")], False
+    if "by_type" in aggs:
+        top = _pairs(aggs["by_type"], "Type", "Count")[:TOP_CATEGORIES]
+        yield f"Top {len(top)} categories: ", [f"{k} {n}" for k, n in top], False
+    monthly = _pairs(aggs["monthly"], "month", "count")
+    if monthly:
+        yield "Incidents per month (oldest to newest): ", [f"{str(m)[:7]} {n}" for m, n in monthly], True
+
+
+def build_incident_summary(aggs: Dict[str, List[Dict[str, Any]]], budget: int = DEFAULT_TOKEN_BUDGET) -> str:
+    """Summarize incident aggregates in at most `budget` (estimated) tokens."""
+    lines: List[str] = []
+    remaining = budget
+    for prefix, items, keep_last in _sections(aggs):
+        # Each line costs one extra token for its newline
+        line = _fit(prefix, items, remaining - 1, keep_last)
+        if line is None:
+            continue
+        lines.append(line)
+        remaining -= estimate_tokens(line) + 1
+    return "\n".join(lines)
+
+
+def incident_context(version: Any, aggs: Dict[str, List[Dict[str, Any]]], budget: int = DEFAULT_TOKEN_BUDGET) -> str:
+    """`build_incident_summary()` cached per (data version, budget)."""
+    key = (version, budget)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    summary = build_incident_summary(aggs, budget)
+    with _cache_lock:
+        _cache[key] = summary
+        while len(_cache) > MAX_CACHED:
+            _cache.popitem(last=False)
+    return summary
+
+
+def with_context(messages: List[Dict[str, str]], context: str) -> List[Dict[str, str]]:
+    """Return `messages` with `context` as a system message after the leading system messages."""
+    if not context:
+        return list(messages)
+    at = 0
+    while at < len(messages) and messages[at]["role"] == "system":
+        at += 1
+    return messages[:at] + [{"role": "system", "content": context}] + messages[at:]
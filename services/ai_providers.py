@@ -0,0 +1,295 @@
+"""
+Chat completion backends for the AI assistant.
+
+A `Provider` turns chat messages into a reply. Three kinds exist:
+
+- `OpenAICompatibleProvider` for the OpenAI API or any endpoint speaking
+  the same `/chat/completions` protocol;
+- the same class pointed at a local server (llama.cpp, Ollama, vLLM, ...)
+  through `AI_LOCAL_URL` / `AI_LOCAL_MODEL`, with no API key;
+- `StubProvider`, an offline backend whose reply depends only on the
+  messages, for tests and benchmarks.
+
+`AI_PROVIDERS` lists the backends to use, in order (default "openai").
+`hedged_completion()` sends a request to the first one. If it has not
+answered after `AI_HEDGE_AFTER_MS` (or has failed), the next one is tried
+as well, and the first successful reply wins. Every attempt is recorded
+in a per-provider `LatencyHistogram` (`latency_stats()`).
+
+`services/ai_service.py` is the entry point the app calls and re-exports
+`AIServiceError`; this module depends on nothing in it.
+"""
+
+import bisect
+import hashlib
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+import requests
+
+OPENAI_API_URL = "https://api.openai.com/v1/chat/completions"
+
+HEDGE_AFTER_MS = float(os.getenv("AI_HEDGE_AFTER_MS", "4000"))
+
+# Upper bounds (ms) of the latency histogram buckets; the last is open-ended.
+BUCKETS_MS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 15000, 30000, 60000)
+
+Messages = List[Dict[str, str]]
+
+
+class AIServiceError(Exception):
+    """Raised for any errors when calling the AI service."""
+    pass
+
+
+def _get_api_key() -> str:
+    """Read API key from env and raise an error if missing."""
+    key = os.environ.get("OPENAI_API_KEY")
+    if not key:
+        raise AIServiceError("OPENAI_API_KEY not found in environment")
+    return key
+
+
+class Provider(ABC):
+    """
+    A chat completion backend.
+    """
+
+    name = "provider"
+
+    @abstractmethod
+    def complete(self, messages: Messages, model: Optional[str] = None,
+                 max_tokens: int = 500, temperature: float = 0.2) -> str:
+        """Return the assistant's reply to `messages`."""
+
+
+class OpenAICompatibleProvider(Provider):
+    """
+    POSTs to `{base_url}/chat/completions` in the OpenAI format.
+
+    `api_key_env` names the environment variable holding the key; None
+    sends no Authorization header (typical for local servers).
+    """
+
+    def __init__(self, name: str, base_url: str, default_model: str,
+                 api_key_env: Optional[str] = "OPENAI_API_KEY", timeout: float = 30):
+        self.name = name
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.default_model = default_model
+        self.api_key_env = api_key_env
+        self.timeout = timeout
+
+    def complete(self, messages: Messages, model: Optional[str] = None,
+                 max_tokens: int = 500, temperature: float = 0.2) -> str:
+        headers = {"Content-Type": "application/json"}
+        if self.api_key_env == "OPENAI_API_KEY":
+            headers["Authorization"] = f"Bearer {_get_api_key()}"
+        elif self.api_key_env:
+            key = os.environ.get(self.api_key_env)
+            if not key:
+                raise AIServiceError(f"{self.api_key_env} not found in environment")
+            headers["Authorization"] = f"Bearer {key}"
+        payload = {
+            "model": model or self.default_model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+
+        try:
+            resp = requests.post(self.url, json=payload, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise AIServiceError(f"Network error when calling {self.name}: {e}")
+
+        if resp.status_code != 200:
+            # try to include any API error message
+            try:
+                body = resp.json()
+                msg = body.get("error", {}).get("message") or str(body)
+            except Exception:
+                msg = resp.text
+            raise AIServiceError(f"{self.name} API error {resp.status_code}: {msg}")
+
+        data = resp.json()
+        try:
+            return data["choices"][0]["message"]["content"].strip()
+        except Exception as e:
+            raise AIServiceError(f"Unexpected response format from {self.name}: {e}")
+
+
+class StubProvider(Provider):
+    """
+    Offline backend: the reply is a fixed function of the messages.
+
+    `latency` is seconds to wait before answering, or a callable taking
+    the messages and returning seconds (to model a latency distribution).
+    """
+
+    def __init__(self, name: str = "stub", latency: Union[float, Callable[[Messages], float]] = 0.0):
+        self.name = name
+        self.latency = latency
+
+    def complete(self, messages: Messages, model: Optional[str] = None,
+                 max_tokens: int = 500, temperature: float = 0.2) -> str:
+        delay = self.latency(messages) if callable(self.latency) else self.latency
+        if delay:
+            time.sleep(delay)
+        question = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+        digest = hashlib.sha256(repr(messages).encode()).hexdigest()[:8]
+        context = sum(1 for m in messages if m["role"] == "system")
+        return f"[stub {digest}] {context} system message(s); question: {question[:200]}"
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram with success and error counts.
+    """
+
+    def __init__(self, bounds_ms: Sequence[float] = BUCKETS_MS):
+        self.bounds_ms = tuple(bounds_ms)
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, ok: bool = True) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.bounds_ms, seconds * 1000)] += 1
+            if not ok:
+                self.errors += 1
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Upper bound (ms) of the bucket holding the p-th percentile; inf past the last bound."""
+        with self._lock:
+            total = sum(self.counts)
+            if not total:
+                return None
+            rank, seen = p / 100 * total, 0
+            for i, n in enumerate(self.counts):
+                seen += n
+                if seen >= rank and n:
+                    return self.bounds_ms[i] if i < len(self.bounds_ms) else float("inf")
+        return float("inf")
+
+    def snapshot(self) -> Dict:
+        return {
+            "requests": self.total, "errors": self.errors,
+            "p50_ms": self.percentile(50), "p95_ms": self.percentile(95), "p99_ms": self.percentile(99),
+            "buckets": dict(zip([f"<={b}" for b in self.bounds_ms] + [f">{self.bounds_ms[-1]}"], self.counts)),
+        }
+
+
+_histograms: Dict[str, LatencyHistogram] = {}
+_histograms_guard = threading.Lock()
+
+
+def histogram(provider_name: str) -> LatencyHistogram:
+    with _histograms_guard:
+        return _histograms.setdefault(provider_name, LatencyHistogram())
+
+
+def latency_stats() -> Dict[str, Dict]:
+    """{provider name: histogram snapshot} for every provider used by this process."""
+    with _histograms_guard:
+        names = list(_histograms)
+    return {name: histogram(name).snapshot() for name in names}
+
+
+def _openai() -> Provider:
+    base = os.getenv("OPENAI_BASE_URL") or OPENAI_API_URL.rsplit("/chat/completions", 1)[0]
+    return OpenAICompatibleProvider("openai", base, os.getenv("OPENAI_MODEL", "gpt-3.5-turbo"))
+
+
+def _local() -> Provider:
+    return OpenAICompatibleProvider(
+        "local",
+        os.getenv("AI_LOCAL_URL", "http://localhost:8080/v1"),
+        os.getenv("AI_LOCAL_MODEL", "local-model"),
+        api_key_env=os.getenv("AI_LOCAL_KEY_ENV") or None,
+        timeout=float(os.getenv("AI_LOCAL_TIMEOUT", "60")),
+    )
+
+
+# AI_PROVIDERS names -> factories
+PROVIDERS: Dict[str, Callable[[], Provider]] = {
+    "openai": _openai,
+    "local": _local,
+    "stub": StubProvider,
+}
+
+
+def configured_providers() -> List[Provider]:
+    """Build the providers listed in AI_PROVIDERS (comma-separated, in order)."""
+    names = [n.strip() for n in os.getenv("AI_PROVIDERS", "openai").split(",") if n.strip()]
+    unknown = [n for n in names if n not in PROVIDERS]
+    if unknown:
+        raise AIServiceError(f"Unknown AI provider(s) in AI_PROVIDERS: {', '.join(unknown)}")
+    return [PROVIDERS[n]() for n in names]
+
+
+_executor = None
+_executor_guard = threading.Lock()
+
+
+def _default_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_guard:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ai-provider")
+        return _executor
+
+
+def _attempt(provider: Provider, messages: Messages, kwargs: Dict) -> str:
+    start = time.perf_counter()
+    try:
+        reply = provider.complete(messages, **kwargs)
+    except BaseException:
+        histogram(provider.name).record(time.perf_counter() - start, ok=False)
+        raise
+    histogram(provider.name).record(time.perf_counter() - start)
+    return reply
+
+
+def hedged_completion(
+    messages: Messages,
+    providers: Optional[Sequence[Provider]] = None,
+    hedge_after_ms: float = HEDGE_AFTER_MS,
+    **kwargs,
+) -> str:
+    """Return the first successful reply from `providers` (default: AI_PROVIDERS).
+
+    The next provider is started when every running attempt has been
+    going for `hedge_after_ms` without an answer, or as soon as one
+    fails. Slower attempts are left to finish in the background; their
+    latency is still recorded. Raises AIServiceError when all fail.
+    """
+    providers = list(providers) if providers is not None else configured_providers()
+    if not providers:
+        raise AIServiceError("No AI provider configured")
+    executor = _default_executor()
+    waiting: List[Future] = []
+    errors: List[str] = []
+    remaining = iter(providers)
+    started = 0
+    while True:
+        provider = next(remaining, None)
+        if provider is not None:
+            waiting.append(executor.submit(_attempt, provider, messages, kwargs))
+            started += 1
+        if not waiting:
+            raise AIServiceError("All AI providers failed: " + "; ".join(errors))
+        timeout = hedge_after_ms / 1000 if started < len(providers) else None
+        done, _ = wait(waiting, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            waiting.remove(future)
+            try:
+                return future.result()
+            except Exception as e:
+                errors.append(str(e))
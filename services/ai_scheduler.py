@@ -0,0 +1,299 @@
+"""
+Process-wide scheduler in front of `services.ai_service.chat_completion`.
+
+Every "Ask AI" goes through `scheduler.submit()`, which:
+
+- refuses at once with `BudgetExhausted` when what is left of the day's
+  token budget cannot cover the request, instead of letting the API
+  fail it;
+- joins an identical request that is already queued or running rather
+  than sending it twice;
+- queues the request under its user. A dispatcher thread hands requests
+  out round-robin across users, so one user's burst cannot starve the
+  others, with at most `max_concurrent` in flight and no faster than a
+  token bucket allows.
+
+The returned `Ticket` reports its place in the queue while it waits.
+
+A request is charged an estimate (prompt plus `max_tokens`) when it is
+admitted; once it finishes, the charge is corrected to prompt plus reply.
+The budget resets at local midnight and is tracked per process.
+Limits come from the environment: AI_RATE_PER_MINUTE, AI_BURST,
+AI_MAX_CONCURRENT and AI_DAILY_TOKEN_BUDGET.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from services import ai_service
+from services.ai_context import estimate_tokens
+from services.ai_service import AIServiceError
+
+
+class BudgetExhausted(AIServiceError):
+    """Raised by `submit()` when the daily token budget cannot cover a request."""
+    pass
+
+
+class TokenBucket:
+    """
+    Allows `rate` requests per second on average, in bursts of up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated = clock()
+
+    def take(self) -> float:
+        """Take a token if one is available; otherwise return the seconds until one is."""
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class _Job:
+    def __init__(self, key: str, user: str, messages: List[Dict[str, str]], kwargs: Dict[str, Any], cost: int):
+        self.key = key
+        self.user = user
+        self.messages = messages
+        self.kwargs = kwargs
+        self.cost = cost
+        self.day = date.today()
+        self.state = "queued"
+        self.waiters = 1
+        self.future: Future = Future()
+
+
+class Ticket:
+    """
+    A caller's handle on a scheduled request (possibly shared with others).
+    """
+
+    def __init__(self, scheduler: "AIScheduler", job: _Job, coalesced: bool):
+        self._scheduler = scheduler
+        self._job = job
+        self.coalesced = coalesced
+
+    def position(self) -> int:
+        """1-based place in the queue; 0 once the request is running or done."""
+        return self._scheduler._position(self._job)
+
+    def done(self) -> bool:
+        return self._job.future.done()
+
+    def result(self, timeout: Optional[float] = None) -> str:
+        """The assistant's reply; raises what the call raised (AIServiceError, ...)."""
+        return self._job.future.result(timeout)
+
+    def cancel(self) -> bool:
+        """Withdraw this caller; the request is dropped if it is still queued and nobody else waits on it."""
+        return self._scheduler._cancel(self._job)
+
+
+class AIScheduler:
+    """
+    Rate-limited, budgeted, per-user fair queue for chat completions.
+
+    `call` defaults to `ai_service.chat_completion` (looked up per call).
+    """
+
+    def __init__(
+        self,
+        call: Optional[Callable[..., str]] = None,
+        rate_per_minute: float = float(os.getenv("AI_RATE_PER_MINUTE", "20")),
+        burst: int = int(os.getenv("AI_BURST", "5")),
+        max_concurrent: int = int(os.getenv("AI_MAX_CONCURRENT", "2")),
+        daily_budget: int = int(os.getenv("AI_DAILY_TOKEN_BUDGET", "200000")),
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.call = call
+        self.max_concurrent = max_concurrent
+        self.daily_budget = daily_budget
+        self._bucket = TokenBucket(rate_per_minute / 60.0, burst, clock)
+        self._cond = threading.Condition()
+        # user -> queued jobs; iteration order is the round-robin order
+        self._queues: "OrderedDict[str, Deque[_Job]]" = OrderedDict()
+        # request key -> queued or running job
+        self._pending: Dict[str, _Job] = {}
+        self._running = 0
+        self._day = date.today()
+        self._used = 0
+        self._reserved = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.coalesced = 0
+        self.rejected = 0
+
+    @staticmethod
+    def request_key(messages: List[Dict[str, str]], kwargs: Dict[str, Any]) -> str:
+        return json.dumps([messages, kwargs], sort_keys=True, default=str)
+
+    def _roll_day(self) -> None:
+        today = date.today()
+        if today != self._day:
+            self._day, self._used = today, 0
+
+    def submit(self, user: str, messages: List[Dict[str, str]], **kwargs) -> Ticket:
+        """Queue a chat completion for `user`; kwargs go to the call (model, max_tokens, ...)."""
+        key = self.request_key(messages, kwargs)
+        cost = sum(estimate_tokens(m.get("content", "")) for m in messages) + kwargs.get("max_tokens", 500)
+        with self._cond:
+            job = self._pending.get(key)
+            if job is not None:
+                job.waiters += 1
+                self.coalesced += 1
+                return Ticket(self, job, coalesced=True)
+            self._roll_day()
+            if self._used + self._reserved + cost > self.daily_budget:
+                self.rejected += 1
+                left = max(0, self.daily_budget - self._used - self._reserved)
+                raise BudgetExhausted(
+                    f"Daily AI budget exhausted: {left} of {self.daily_budget} tokens left, "
+                    f"this request needs about {cost}"
+                )
+            job = _Job(key, user, messages, kwargs, cost)
+            self._reserved += cost
+            self._pending[key] = job
+            self._queues.setdefault(user, deque()).append(job)
+            self._start()
+            self._cond.notify_all()
+        return Ticket(self, job, coalesced=False)
+
+    def budget(self) -> Dict[str, Any]:
+        """Today's {day, used, reserved, limit, remaining} in tokens."""
+        with self._cond:
+            self._roll_day()
+            spent = self._used + self._reserved
+            return {
+                "day": self._day.isoformat(), "used": self._used, "reserved": self._reserved,
+                "limit": self.daily_budget, "remaining": max(0, self.daily_budget - spent),
+            }
+
+    def queued(self) -> int:
+        with self._cond:
+            return sum(len(q) for q in self._queues.values())
+
+    def _start(self) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix="ai")
+            threading.Thread(target=self._dispatch, name="ai-dispatch", daemon=True).start()
+
+    def _position(self, job: _Job) -> int:
+        with self._cond:
+            if job.state != "queued":
+                return 0
+            users = list(self._queues)
+            mine = users.index(job.user)
+            index = self._queues[job.user].index(job)
+            # Round-robin: every user ahead of this one in the rotation gets
+            # index + 1 turns first, every user after it gets index turns.
+            ahead = index
+            for order, user in enumerate(users):
+                if user != job.user:
+                    ahead += min(len(self._queues[user]), index + (order < mine))
+            return ahead + 1
+
+    def _cancel(self, job: _Job) -> bool:
+        with self._cond:
+            if job.state != "queued":
+                return False
+            job.waiters -= 1
+            if job.waiters > 0:
+                return True
+            queue = self._queues[job.user]
+            queue.remove(job)
+            if not queue:
+                del self._queues[job.user]
+            del self._pending[job.key]
+            self._reserved -= job.cost
+            job.state = "done"
+        job.future.cancel()
+        return True
+
+    def _next_job(self) -> _Job:
+        user, queue = self._queues.popitem(last=False)
+        job = queue.popleft()
+        if queue:
+            # The user goes to the back of the rotation
+            self._queues[user] = queue
+        return job
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if not self._queues or self._running >= self.max_concurrent:
+                        self._cond.wait()
+                        continue
+                    wait = self._bucket.take()
+                    if wait:
+                        self._cond.wait(wait)
+                        continue
+                    break
+                job = self._next_job()
+                job.state = "running"
+                self._running += 1
+            self._executor.submit(self._run, job)
+
+    def _run(self, job: _Job) -> None:
+        reply, error = None, None
+        try:
+            reply = (self.call or ai_service.chat_completion)(job.messages, **job.kwargs)
+        except BaseException as e:
+            error = e
+        with self._cond:
+            self._running -= 1
+            self._pending.pop(job.key, None)
+            self._reserved -= job.cost
+            self._roll_day()
+            if job.day == self._day:
+                prompt = job.cost - job.kwargs.get("max_tokens", 500)
+                # A failed call is charged its prompt; the API may have counted it
+                self._used += prompt + (estimate_tokens(reply) if reply else 0)
+            job.state = "done"
+            self._cond.notify_all()
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(reply)
+
+
+def wait_for(
+    ticket: Ticket,
+    on_queued: Optional[Callable[[int], None]] = None,
+    queue_timeout: float = 120.0,
+    poll: float = 0.25,
+) -> str:
+    """Block until `ticket` has a reply and return it.
+
+    While the request is queued, `on_queued(position)` is called whenever
+    the position changes. A request still queued after `queue_timeout`
+    seconds is withdrawn and AIServiceError raised.
+    """
+    deadline = time.monotonic() + queue_timeout
+    shown = None
+    while not ticket.done():
+        position = ticket.position()
+        if position and time.monotonic() > deadline and ticket.cancel():
+            raise AIServiceError("The AI assistant is busy; please try again in a minute.")
+        if position != shown and position and on_queued is not None:
+            on_queued(position)
+        shown = position
+        time.sleep(poll)
+    return ticket.result()
+
+
+# Shared by all sessions in the Streamlit process.
+scheduler = AIScheduler()
@@ -0,0 +1,45 @@
+"""
+Anomalies flagged by the streaming detectors, shaped for the dashboards.
+
+Detection happens at ingest (`database/anomaly.py`, fed by the CSV sync),
+so reading the flagged days is one indexed query over a handful of rows.
+"""
+
+from typing import Optional
+
+import pandas as pd
+
+from database.anomaly import DETECTORS, recent_anomalies
+from database.db_manager import DatabaseManager
+
+ANOMALY_WINDOW_DAYS = 30
+
+
+def _label(table: str, series: str) -> str:
+    # "it_tickets.category=Email" -> "category: Email"; the table total -> "all"
+    if series == table:
+        return "all"
+    column, _, value = series[len(table) + 1:].partition("=")
+    return f"{column}: {value}"
+
+
+def get_anomalies(
+    table: str, days: int = ANOMALY_WINDOW_DAYS, db: Optional[DatabaseManager] = None
+) -> pd.DataFrame:
+    """Flagged days of `table` within the last `days` days of its data, newest first."""
+    if table not in DETECTORS:
+        raise ValueError(f"No anomaly detectors for table: {table}")
+    rows = recent_anomalies(table, days, db)
+    return pd.DataFrame(
+        [
+            {
+                "Day": r["day"],
+                "Series": _label(table, r["series"]),
+                "Count": r["count"],
+                "Expected": round(r["expected"], 1),
+                "z-score": round(r["z"], 1),
+            }
+            for r in rows
+        ],
+        columns=["Day", "Series", "Count", "Expected", "z-score"],
+    )
@@ -0,0 +1,377 @@
+"""
+Read-only JSON API over the dashboard data, on the standard library.
+
+    GET /api                                  resources the caller may read
+    GET /api/incidents?page=1&page_size=50&start=&end=   model lists, paged by id
+    GET /api/tickets, /api/datasets
+    GET /api/incidents/aggregates?start=&end=   the Cybersecurity dashboard's aggregates
+    GET /api/incidents/anomalies?days=30      flagged days (database/anomaly.py)
+    GET /api/incidents/top-types?k=5&start=&end=
+    GET /api/tickets/kpis, /api/tickets/open-by-staff, /api/tickets/anomalies
+    GET /api/tickets/top-staff?k=20&start=&end=
+    GET /api/datasets/governance
+    GET /api/<resource>/export?format=csv&start=&end=&archive=1   streamed (services/export_service.py)
+
+Clients authenticate with HTTP Basic against the `users` table, and a
+role reads the tables of the dashboards it can open (`ROLE_DASHBOARDS`).
+A verified password is remembered for AUTH_CACHE_SECONDS, so polling does
+not pay for bcrypt on every request.
+
+Every data response carries an ETag built from the table's data version
+(`database/versioning.py`), plus the governance version for the view that
+reads the thresholds, and the request. A client that sends it back in
+`If-None-Match` gets `304 Not Modified` after one indexed lookup, without
+the query running. Bodies come from a `VersionedCache`, the same LRU the
+dashboards' figure cache is built on, and the aggregates from the same
+`FrameCache`/`refresh_incident_aggregates` path as the dashboard. Running
+the API inside the Streamlit process (`APP_API_PORT`, see app.py) shares
+those frames with the sessions, and the dashboards' download buttons
+link to the streamed exports (`export_url()`) instead of building them in
+memory.
+
+Start it with `python api.py [--host HOST] [--port PORT]`.
+"""
+
+import base64
+import hashlib
+import itertools
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import bcrypt
+
+from database.anomaly import recent_anomalies
+from database.governance import GOVERNANCE_VERSION
+from database.versioning import get_versions
+from models.cyber_incident import CyberIncident
+from models.dataset import Dataset
+from models.it_ticket import ITTicket
+from services.cyber_service import incident_aggregates_of, refresh_incident_aggregates, top_incident_types
+from services.export_service import EXPORT_FORMATS, export_filename, export_stream
+from services.frame_service import FrameCache, WindowCache
+from services.governance_service import count_archive_candidates, get_category_totals
+from services.it_service import busiest_staff
+from services.kpi_service import get_open_tickets_by_staff, get_ticket_kpis
+from services.user_service import ROLE_DASHBOARDS, get_user_by_username
+from services.versioned_cache import VersionedCache
+
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8502"))
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+AUTH_CACHE_SECONDS = 300
+REALM = "dashboard-api"
+# Where browsers reach the API run inside the Streamlit process (app.py)
+APP_API_URL = os.getenv("APP_API_URL") or (
+    f"http://localhost:{os.getenv('APP_API_PORT')}" if os.getenv("APP_API_PORT") else None
+)
+
+# Table behind each dashboard, for the role checks
+DASHBOARD_TABLES = {
+    "Cybersecurity": "cyber_incidents",
+    "Data Science": "datasets",
+    "IT Operations": "it_tickets",
+}
+
+# resource -> (table, model)
+RESOURCES = {
+    "incidents": ("cyber_incidents", CyberIncident),
+    "tickets": ("it_tickets", ITTicket),
+    "datasets": ("datasets", Dataset),
+}
+
+# Serialized response bodies by (path, data version, query)
+response_cache = VersionedCache(max_entries=512, max_bytes=32 * 1024 * 1024)
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _int(query: Dict[str, str], name: str, default: int, low: int = 1, high: Optional[int] = None) -> int:
+    try:
+        value = int(query.get(name, default))
+    except ValueError:
+        raise ApiError(400, f"{name} must be an integer")
+    if value < low or (high is not None and value > high):
+        raise ApiError(400, f"{name} must be between {low} and {high}" if high else f"{name} must be >= {low}")
+    return value
+
+
+# --- Authentication ---
+
+class Authenticator:
+    """
+    HTTP Basic credentials checked against the `users` table.
+
+    The user row is read on every request, so a deleted user or a changed
+    password takes effect at once; only the bcrypt check is remembered.
+    """
+
+    def __init__(self, ttl: float = AUTH_CACHE_SECONDS):
+        self.ttl = ttl
+        self._verified: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def authenticate(self, header: Optional[str]) -> Tuple[str, str]:
+        """Return (username, role) for an `Authorization` header, or raise ApiError(401)."""
+        if not header or not header.startswith("Basic "):
+            raise ApiError(401, "authentication required")
+        try:
+            username, _, password = base64.b64decode(header[6:]).decode("utf-8").partition(":")
+        except (ValueError, UnicodeDecodeError):
+            raise ApiError(401, "malformed credentials")
+        user = get_user_by_username(username)
+        if user is None or not user.password_hash:
+            raise ApiError(401, "invalid credentials")
+        key = (username, hashlib.sha256(f"{password}\0{user.password_hash}".encode()).hexdigest())
+        now = time.monotonic()
+        with self._lock:
+            fresh = self._verified.get(key, 0) > now
+        if not fresh:
+            if not bcrypt.checkpw(password.encode(), user.password_hash.encode()):
+                raise ApiError(401, "invalid credentials")
+            with self._lock:
+                # Drop expired entries while we are here
+                self._verified = {k: t for k, t in self._verified.items() if t > now}
+                self._verified[key] = now + self.ttl
+        return username, user.role
+
+
+def readable_tables(role: str) -> set:
+    return {DASHBOARD_TABLES[d] for d in ROLE_DASHBOARDS.get((role or "").lower(), [])}
+
+
+# --- Views shared with the dashboards ---
+
+_frames: Dict[str, FrameCache] = {}
+_incident_aggs: Dict[str, Any] = {}
+_frames_lock = threading.Lock()
+
+
+def incident_aggregates(query: Dict[str, str]) -> Dict[str, Any]:
+    """The Cybersecurity dashboard's aggregates, computed the way it does for the query's period.
+
+    With `start`/`end` they count the window's rows, archived ones included,
+    read by a `WindowCache`; without, they are patched incrementally like a
+    session's.
+    """
+    window = _window(query)
+    if window["start"] or window["end"]:
+        # The response cache keeps the body per window and data version
+        return incident_aggregates_of(WindowCache("cyber_incidents").refresh(**window))
+    with _frames_lock:
+        cache = _frames.setdefault("cyber_incidents", FrameCache("cyber_incidents"))
+        cache.refresh()
+        return refresh_incident_aggregates(cache, _incident_aggs)
+
+
+def _window(query: Dict[str, str]) -> Dict[str, Optional[str]]:
+    return {"start": query.get("start") or None, "end": query.get("end") or None}
+
+
+def export_url(
+    table: str, fmt: str, start: Optional[str] = None, end: Optional[str] = None, include_archive: bool = False
+) -> Optional[str]:
+    """Link to the streamed export of `table`, or None when the app serves no API."""
+    if not APP_API_URL:
+        return None
+    resource = next(r for r, (t, _) in RESOURCES.items() if t == table)
+    params = {k: v for k, v in {"format": fmt, "start": start, "end": end}.items() if v}
+    if include_archive:
+        params["archive"] = 1
+    return f"{APP_API_URL.rstrip('/')}/api/{resource}/export?{urlencode(params)}"
+
+
+# (resource, view) -> build(query)
+VIEWS: Dict[Tuple[str, str], Callable[[Dict[str, str]], Any]] = {
+    ("incidents", "aggregates"): incident_aggregates,
+    ("incidents", "anomalies"): lambda q: recent_anomalies("cyber_incidents", _int(q, "days", 30)),
+    ("incidents", "top-types"): lambda q: top_incident_types(_int(q, "k", 5, high=100), **_window(q)),
+    ("tickets", "kpis"): lambda q: get_ticket_kpis(),
+    ("tickets", "open-by-staff"): lambda q: get_open_tickets_by_staff(),
+    ("tickets", "anomalies"): lambda q: recent_anomalies("it_tickets", _int(q, "days", 30)),
+    ("tickets", "top-staff"): lambda q: busiest_staff(_int(q, "k", 20, high=100), **_window(q)),
+    ("datasets", "governance"): lambda q: {
+        "categories": get_category_totals(), "archive_candidates": count_archive_candidates(),
+    },
+}
+
+# Views that also read state outside their table, by the versions tracking it
+VIEW_VERSIONS = {
+    ("datasets", "governance"): (GOVERNANCE_VERSION,),
+}
+
+
+def version_of(table: str, resource: str, view: Optional[str]) -> str:
+    """Data version a response depends on: the table's, plus any extra state the view reads."""
+    versions = get_versions()
+    return ".".join(str(versions.get(name, 0)) for name in (table,) + VIEW_VERSIONS.get((resource, view), ()))
+
+
+def page_of(resource: str, query: Dict[str, str]) -> Dict[str, Any]:
+    """One page of a model list, with links to the neighbouring pages."""
+    _, model = RESOURCES[resource]
+    page = _int(query, "page", 1)
+    page_size = _int(query, "page_size", DEFAULT_PAGE_SIZE, high=MAX_PAGE_SIZE)
+    window = _window(query)
+    total = model.count(**window)
+    pages = max((total + page_size - 1) // page_size, 1)
+    # Neighbouring pages keep the date window
+    bounds = {k: v for k, v in window.items() if v}
+
+    def link(n):
+        params = dict(bounds, page=n, page_size=page_size)
+        return f"/api/{resource}?{urlencode(params)}" if 1 <= n <= pages else None
+
+    return {
+        "page": page,
+        "page_size": page_size,
+        "total": total,
+        "pages": pages,
+        "next": link(page + 1),
+        "previous": link(page - 1),
+        "items": [vars(item) for item in model.get_page(page, page_size, **window)],
+    }
+
+
+def etag_for(table: str, version: str, path: str, query: Dict[str, str]) -> str:
+    request = hashlib.sha1(f"{path}?{sorted(query.items())}".encode()).hexdigest()[:16]
+    return f'"{table}-{version}-{request}"'
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    tags = [t.strip() for t in header.split(",")]
+    # Weak comparison, as If-None-Match requires
+    return "*" in tags or etag in (t[2:] if t.startswith("W/") else t for t in tags)
+
+
+# --- HTTP ---
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "DashboardAPI/1.0"
+    authenticator = Authenticator()
+
+    def do_GET(self):
+        try:
+            self._get()
+        except ApiError as e:
+            self._json(e.status, json.dumps({"error": str(e)}))
+        except Exception as e:  # pragma: no cover - reported to the client
+            self.log_error("internal error on %s: %r", self.path, e)
+            self._json(500, json.dumps({"error": "internal error"}))
+
+    def _refuse(self):
+        self._json(405, json.dumps({"error": "read-only API"}), {"Allow": "GET"})
+
+    do_POST = do_PUT = do_PATCH = do_DELETE = _refuse
+
+    def _get(self):
+        url = urlsplit(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        query = dict(parse_qsl(url.query))
+        if not parts or parts[0] != "api":
+            raise ApiError(404, "not found")
+        _, role = self.authenticator.authenticate(self.headers.get("Authorization"))
+        tables = readable_tables(role)
+        if len(parts) == 1:
+            self._json(200, json.dumps({
+                "resources": sorted(r for r, (t, _) in RESOURCES.items() if t in tables),
+                "views": sorted(f"{r}/{v}" for r, v in VIEWS if RESOURCES[r][0] in tables),
+            }))
+            return
+        resource = parts[1]
+        view = parts[2] if len(parts) > 2 else None
+        if resource not in RESOURCES or len(parts) > 3 or (
+            view is not None and view != "export" and (resource, view) not in VIEWS
+        ):
+            raise ApiError(404, "not found")
+        table = RESOURCES[resource][0]
+        if table not in tables:
+            raise ApiError(403, f"role {role!r} cannot read {resource}")
+
+        # Conditional request: one version lookup decides a 304
+        version = version_of(table, resource, view)
+        etag = etag_for(table, version, url.path, query)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(self.headers.get("If-None-Match"), etag):
+            self._send_head(304, headers)
+            return
+        if view == "export":
+            self._export(resource, table, query, headers)
+            return
+        build = (lambda: page_of(resource, query)) if view is None else (lambda: VIEWS[(resource, view)](query))
+        self._json(200, response_cache.get_or_build_json(url.path, version, query, build), headers)
+
+    def _export(self, resource: str, table: str, query: Dict[str, str], headers: Dict[str, str]):
+        fmt = query.get("format", "csv")
+        if fmt not in EXPORT_FORMATS:
+            raise ApiError(400, f"format must be one of {', '.join(EXPORT_FORMATS)}")
+        window = _window(query)
+        chunks = export_stream(table, fmt, include_archive=query.get("archive") == "1", **window)
+        # Open the cursor and encode the first batch before any header goes
+        # out, so a failure there still gets a proper error response.
+        first = next(chunks, b"")
+        headers.update({
+            "Content-Type": EXPORT_FORMATS[fmt].mime,
+            "Content-Disposition": f'attachment; filename="{export_filename(table, fmt, **window)}"',
+            "Transfer-Encoding": "chunked",
+        })
+        self._send_head(200, headers)
+        try:
+            for chunk in itertools.chain((first,), chunks):
+                if chunk:
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.write(b"0\r\n\r\n")
+        except Exception as e:
+            # The status line is already sent: drop the connection without
+            # the final chunk, so the client sees a truncated transfer.
+            self.log_error("export of %s failed after the headers were sent: %r", self.path, e)
+            self.close_connection = True
+        finally:
+            chunks.close()
+
+    def _send_head(self, status: int, headers: Dict[str, str]):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if status == 401:
+            self.send_header("WWW-Authenticate", f'Basic realm="{REALM}"')
+        self.end_headers()
+
+    def _json(self, status: int, body: str, headers: Optional[Dict[str, str]] = None):
+        data = body.encode("utf-8")
+        self._send_head(status, dict(headers or {}, **{
+            "Content-Type": "application/json", "Content-Length": str(len(data)),
+        }))
+        self.wfile.write(data)
+
+
+def make_server(host: str = API_HOST, port: int = API_PORT) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.daemon_threads = True
+    return server
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_guard = threading.Lock()
+
+
+def start_api_server(host: str = API_HOST, port: int = API_PORT) -> ThreadingHTTPServer:
+    """Serve the API from a daemon thread of this process (once); returns the server."""
+    global _server
+    with _server_guard:
+        if _server is None:
+            _server = make_server(host, port)
+            threading.Thread(target=_server.serve_forever, name="api-server", daemon=True).start()
+        return _server
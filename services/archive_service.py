@@ -0,0 +1,77 @@
+"""
+Archival maintenance and archived-history frames for the dashboards.
+
+`run_maintenance()` moves old resolved/closed records to the archive
+(`database/archive.py`), refreshes the snapshots of the tables it touched
+and compacts both DB files. It only runs inside the off-peak window unless
+forced; schedule `python scripts/archive.py` nightly (cron, Task
+Scheduler) and it skips itself during working hours.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+from database.archive import (
+    ARCHIVE_AFTER_DAYS, ARCHIVE_POLICIES, archive_generation, archive_records, compact, load_archive,
+)
+from database.db_manager import DatabaseManager
+from database.snapshot import write_snapshot
+
+# Local hours [start, end) in which maintenance may run; may wrap midnight.
+OFF_PEAK_HOURS = (1, 5)
+
+
+def in_off_peak(now: Optional[datetime] = None, window: Tuple[int, int] = OFF_PEAK_HOURS) -> bool:
+    hour = (now or datetime.now()).hour
+    start, end = window
+    return start <= hour < end if start <= end else (hour >= start or hour < end)
+
+
+def run_maintenance(
+    older_than_days: int = ARCHIVE_AFTER_DAYS,
+    tables: Optional[Iterable[str]] = None,
+    compact_files: bool = True,
+    force: bool = False,
+    now: Optional[datetime] = None,
+    db: Optional[DatabaseManager] = None,
+) -> Dict[str, Any]:
+    """Archive, re-snapshot and compact; returns what was done.
+
+    Outside OFF_PEAK_HOURS nothing happens (`{"skipped": reason}`) unless
+    `force` is set.
+    """
+    if not force and not in_off_peak(now):
+        return {"skipped": f"outside off-peak hours {OFF_PEAK_HOURS[0]:02d}:00-{OFF_PEAK_HOURS[1]:02d}:00"}
+    db = db or DatabaseManager()
+    moved = {}
+    for table in tables or ARCHIVE_POLICIES:
+        moved[table] = archive_records(table, older_than_days, db)
+        if moved[table]:
+            write_snapshot(table, db)
+    result: Dict[str, Any] = {"moved": moved}
+    if compact_files:
+        result["sizes"] = compact(db)
+    return result
+
+
+class ArchiveCache:
+    """
+    A table's archived rows, reloaded only when an archive run moved rows
+    or the date range changed.
+    """
+
+    def __init__(self, table: str, db: Optional[DatabaseManager] = None):
+        self.table = table
+        self.db = db or DatabaseManager()
+        self.frame: Optional[pd.DataFrame] = None
+        self.generation: Optional[int] = None
+        self.window: Tuple[Optional[str], Optional[str]] = (None, None)
+
+    def refresh(self, start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        """Archived rows with dates in [start, end]; only the partitions the range reaches are read."""
+        if self.frame is None or (start, end) != self.window or archive_generation(self.db) != self.generation:
+            self.generation, self.frame = load_archive(self.table, start, end, db=self.db)
+            self.window = (start, end)
+        return self.frame
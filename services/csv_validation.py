@@ -0,0 +1,198 @@
+"""
+Schema-driven validation and normalization of the domain CSVs.
+
+Each domain has a `Schema`: its fields in table column order, the CSV
+headers each field may arrive under (`incident_id` for `id`, `category`
+for the incident `type`, `name` for `dataset_name`) and the kind of value
+it holds. `validate()` reads the CSV as text and applies every rule to
+whole columns: strip, NA spellings, canonical case of the enumerated
+columns, integer, number and date checks. A value that fails a rule only
+sets its row in a boolean mask; no per-row Python exception is raised,
+and the clean rows come out as one frame.
+
+Alongside the frame, `errors` is a compact report: for each reason (e.g.
+"rows is not an integer"), the indexes of the rows it rejected, counted
+from 0 for the first row after the header.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from database.storage import CANONICAL_VALUES
+
+# Cell spellings read as missing, in every column
+NA_VALUES = ["", "NA", "Na", "N/A", "n/a", "nan", "NaN", "NULL", "null", "None", "#N/A", "<NA>"]
+
+# Canonical spelling of the enumerated columns (`database/storage.py`),
+# normalized here for whole columns at once; the writers apply it too.
+_CANONICAL = {col: {v.lower(): v for v in values} for col, values in CANONICAL_VALUES.items()}
+
+# Field kinds: how a column is converted and what a missing value becomes
+ID = "id"                # integer or None
+TEXT = "text"            # stripped text, "" when missing
+CANONICAL = "canonical"  # TEXT in its canonical spelling (unknown spellings are kept)
+INTEGER = "integer"      # integer, `default` when missing
+NUMBER = "number"        # float, `default` when missing
+DATE = "date"            # ISO 8601 text or None
+
+# Row indexes spelled out per reason by `messages()`
+MESSAGE_ROWS = 10
+
+
+@dataclass(frozen=True)
+class Field:
+    name: str
+    kind: str = TEXT
+    # CSV headers to read, in order of preference (default: the name)
+    sources: Tuple[str, ...] = ()
+    default: Any = None
+
+
+@dataclass(frozen=True)
+class Schema:
+    fields: Tuple[Field, ...]
+    # Drop repeated ids (first wins) and repeated id-less rows
+    dedupe: bool = False
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        return tuple(f.name for f in self.fields)
+
+
+SCHEMAS = {
+    "cyber": Schema(
+        (
+            Field("id", ID, ("id", "incident_id")),
+            Field("type", TEXT, ("category", "type")),
+            Field("severity", CANONICAL),
+            Field("status", CANONICAL),
+            Field("reported_date", DATE),
+            Field("resolved_date", DATE),
+        ),
+        dedupe=True,
+    ),
+    "datasets": Schema(
+        (
+            Field("id", ID),
+            Field("dataset_name", TEXT, ("dataset_name", "name")),
+            Field("source", TEXT),
+            Field("size_mb", NUMBER, default=0.0),
+            Field("rows", INTEGER, default=0),
+            Field("upload_date", DATE),
+        )
+    ),
+    "it": Schema(
+        (
+            Field("id", ID),
+            Field("staff", TEXT),
+            Field("status", CANONICAL),
+            Field("category", TEXT),
+            Field("opened_date", DATE),
+            Field("closed_date", DATE),
+        )
+    ),
+}
+
+
+@dataclass
+class ValidationResult:
+    """
+    Clean rows of a CSV plus the rows rejected and why.
+
+    `frame` has the schema's columns in order, with None (NA) for missing
+    optional values. `errors` maps each reason to the rejected row indexes.
+    """
+    frame: pd.DataFrame
+    errors: Dict[str, List[int]] = field(default_factory=dict)
+
+    @property
+    def invalid_rows(self) -> int:
+        return len({i for rows in self.errors.values() for i in rows})
+
+    def rows(self) -> List[tuple]:
+        """The clean rows as tuples of plain Python values (None for missing), ready for SQLite."""
+        columns = [
+            self.frame[c].astype(object).where(self.frame[c].notna(), None).tolist() for c in self.frame.columns
+        ]
+        return list(zip(*columns))
+
+    def messages(self) -> List[str]:
+        """One line per reason: `rows 3, 8: rows is not an integer`."""
+        out = []
+        for reason, rows in self.errors.items():
+            listed = ", ".join(str(i) for i in rows[:MESSAGE_ROWS])
+            more = f" and {len(rows) - MESSAGE_ROWS} more" if len(rows) > MESSAGE_ROWS else ""
+            out.append(f"row{'s' if len(rows) > 1 else ''} {listed}{more}: {reason}")
+        return out
+
+
+def _text(df: pd.DataFrame, f: Field) -> pd.Series:
+    """The field's stripped text, first non-missing source per row; NA when missing."""
+    out = pd.Series(pd.NA, index=df.index, dtype="string")
+    for source in f.sources or (f.name,):
+        if source in df.columns:
+            values = df[source].astype("string").str.strip()
+            out = out.fillna(values.mask(values.isin(NA_VALUES)))
+    return out
+
+
+def _canonical(column: str, text: pd.Series) -> pd.Series:
+    # "critical", "CRITICAL " -> "Critical": looked up once per distinct value
+    codes, uniques = pd.factorize(text)
+    spelled = np.array([_CANONICAL[column].get(u.lower(), u) for u in uniques] + [""], dtype=object)
+    # Code -1 (missing) takes the trailing ""
+    return pd.Series(spelled[codes], index=text.index, dtype="string")
+
+
+def _convert(f: Field, text: pd.Series) -> Tuple[pd.Series, Optional[Tuple[str, pd.Series]]]:
+    """(values, (reason, mask of invalid rows) or None) for one field."""
+    present = text.notna()
+    if f.kind == TEXT:
+        return text.fillna(""), None
+    if f.kind == CANONICAL:
+        return _canonical(f.name, text), None
+    if f.kind == DATE:
+        parsed = pd.to_datetime(text, errors="coerce", format="ISO8601")
+        return text, (f"{f.name} is not an ISO date", present & parsed.isna())
+    numbers = pd.to_numeric(text, errors="coerce")
+    if f.kind == NUMBER:
+        bad = present & numbers.isna()
+        return numbers.fillna(f.default).astype("float64"), (f"{f.name} is not a number", bad)
+    # ID / INTEGER: whole numbers only
+    bad = present & (numbers.isna() | (numbers % 1 != 0))
+    values = numbers.mask(bad)
+    if f.default is not None:
+        values = values.fillna(f.default)
+    return values.astype("Int64"), (f"{f.name} is not an integer", bad)
+
+
+def _dedupe(frame: pd.DataFrame) -> pd.DataFrame:
+    with_id = frame["id"].notna()
+    repeated = (with_id & frame.duplicated(subset=["id"])) | (~with_id & frame.duplicated())
+    return frame[~repeated]
+
+
+def validate_frame(df: pd.DataFrame, schema: Schema) -> ValidationResult:
+    """Validate and normalize `df` (all columns as text) against `schema`."""
+    columns, errors = {}, {}
+    invalid = pd.Series(False, index=df.index)
+    for f in schema.fields:
+        columns[f.name], check = _convert(f, _text(df, f))
+        if check is not None:
+            reason, bad = check
+            if bad.any():
+                errors[reason] = df.index[bad].tolist()
+                invalid |= bad
+    frame = pd.DataFrame(columns, index=df.index)[~invalid]
+    if schema.dedupe:
+        frame = _dedupe(frame)
+    return ValidationResult(frame.reset_index(drop=True), errors)
+
+
+def validate(domain: str, csv_path: str) -> ValidationResult:
+    """Read `csv_path` and validate it against the domain's schema."""
+    df = pd.read_csv(csv_path, dtype=str, keep_default_na=False, na_filter=False)
+    return validate_frame(df, SCHEMAS[domain])
@@ -5,7 +5,94 @@ These thin wrappers keep dashboard code concise and encapsulate
 common CRUD operations on the `CyberIncident` model.
 """
 
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
 from models.cyber_incident import CyberIncident
+from database.async_db import AsyncDatabaseManager, run_sync
+from database.batch import delete_by_ids, update_by_ids
+from database.db_manager import DatabaseManager
+from database.ranges import top_values
+from database.storage import (
+    LOOKUP_TABLE, Encoder, encode_rows, lookup_id_sql, upsert_sql, uses_normalized_storage,
+)
+from database.versioning import get_version
+from services.kpi_service import INCIDENT_KPIS, NORMALIZED_INCIDENT_KPIS
+
+# Independent aggregate queries behind the Cybersecurity dashboard.
+INCIDENT_AGGREGATES = {
+    "kpis": INCIDENT_KPIS,
+    "monthly": """
+        SELECT date(reported_date, 'start of month') AS month, COUNT(*) AS count
+        FROM cyber_incidents WHERE reported_date IS NOT NULL
+        GROUP BY month ORDER BY month
+    """,
+    "daily": """
+        SELECT date(reported_date) AS date, COUNT(*) AS count
+        FROM cyber_incidents WHERE reported_date IS NOT NULL
+        GROUP BY date ORDER BY date
+    """,
+    "by_severity": """
+        SELECT severity AS Severity, COUNT(*) AS Count
+        FROM cyber_incidents GROUP BY severity ORDER BY Count DESC, Severity
+    """,
+    "by_status": """
+        SELECT status AS Status, COUNT(*) AS Count
+        FROM cyber_incidents GROUP BY status ORDER BY Count DESC, Status
+    """,
+    "by_type": """
+        SELECT type AS Type, COUNT(*) AS Count
+        FROM cyber_incidents GROUP BY type ORDER BY Count DESC, Type
+    """,
+    "open_by_severity": """
+        SELECT severity AS Severity, COUNT(*) AS Count
+        FROM cyber_incidents WHERE status = 'Open' GROUP BY severity ORDER BY Count DESC, Severity
+    """,
+}
+
+
+def _count_by_id(column: str, label: str, where: str = "") -> str:
+    # Group on the integer id, then decode only the grouped keys
+    return f"""
+        SELECT l.value AS {label}, g.Count FROM (
+            SELECT {column}_id, COUNT(*) AS Count FROM cyber_incidents_data{where} GROUP BY {column}_id
+        ) g LEFT JOIN {LOOKUP_TABLE} l ON l.id = g.{column}_id ORDER BY g.Count DESC, l.value
+    """
+
+
+# INCIDENT_AGGREGATES for normalized storage (`database/storage.py`), same
+# results: read `cyber_incidents_data` directly instead of the view.
+NORMALIZED_INCIDENT_AGGREGATES = {
+    "kpis": NORMALIZED_INCIDENT_KPIS,
+    "monthly": """
+        SELECT date(reported_date, 'start of month') AS month, COUNT(*) AS count
+        FROM cyber_incidents_data WHERE reported_date IS NOT NULL
+        GROUP BY month ORDER BY month
+    """,
+    "daily": """
+        SELECT date(reported_date) AS date, COUNT(*) AS count
+        FROM cyber_incidents_data WHERE reported_date IS NOT NULL
+        GROUP BY date ORDER BY date
+    """,
+    "by_severity": _count_by_id("severity", "Severity"),
+    "by_status": _count_by_id("status", "Status"),
+    "by_type": _count_by_id("type", "Type"),
+    "open_by_severity": _count_by_id(
+        "severity", "Severity", f" WHERE status_id = {lookup_id_sql('cyber_incidents', 'status', 'Open')}"
+    ),
+}
+
+# (key column, count column) of each grouped aggregate above.
+_GROUP_COLUMNS = {
+    "monthly": ("month", "count"),
+    "daily": ("date", "count"),
+    "by_severity": ("Severity", "Count"),
+    "by_status": ("Status", "Count"),
+    "by_type": ("Type", "Count"),
+    "open_by_severity": ("Severity", "Count"),
+}
 
 
 def create_incident(incident: CyberIncident) -> None:
@@ -23,18 +110,161 @@ def get_incidents_by_type(incident_type: str):
     return [i for i in CyberIncident.get_all() if i.type == incident_type]
 
 
+def top_incident_types(
+    k: int = 5, start: Optional[str] = None, end: Optional[str] = None, db: Optional[DatabaseManager] = None
+) -> List[str]:
+    """The `k` most reported incident types within [start, end], counted exactly."""
+    return [r["item"] for r in top_values("cyber_incidents", "type", k, start, end, db)]
+
+
+def create_incidents(incidents: Iterable[CyberIncident]) -> int:
+    """Persist many incidents in one transaction; returns the number written.
+
+    Incidents with an id are upserted; new ones are inserted and get their
+    auto-assigned id set on the object, as with `CyberIncident.save()`.
+    """
+    incidents = list(incidents)
+    if not incidents:
+        return 0
+    db = DatabaseManager()
+    with db.writer() as conn:
+        encoder = Encoder(conn)
+        table, columns, rows = encode_rows(
+            conn, "cyber_incidents", CyberIncident.COLUMNS,
+            [(i.id, i.type, i.severity, i.status, i.reported_date, i.resolved_date)
+             for i in incidents if i.id is not None],
+            encoder,
+        )
+        conn.executemany(upsert_sql(table, columns), rows)
+        for inc in incidents:
+            if inc.id is None:
+                table, columns, rows = encode_rows(
+                    conn, "cyber_incidents", CyberIncident.COLUMNS[1:],
+                    [(inc.type, inc.severity, inc.status, inc.reported_date, inc.resolved_date)],
+                    encoder,
+                )
+                cur = conn.execute(
+                    f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                    rows[0],
+                )
+                inc.id = cur.lastrowid
+    return len(incidents)
+
+
 def update_incident_status(incident_id: int, status: str):
     """Update the status of a specific incident if it exists."""
-    incidents = CyberIncident.get_all()
-    inc = next((i for i in incidents if i.id == incident_id), None)
-    if inc:
-        inc.status = status
-        inc.save()
+    update_incident_status_bulk([incident_id], status)
+
+
+def update_incident_status_bulk(incident_ids: Iterable[int], status: str) -> int:
+    """Set `status` on every incident in `incident_ids`; returns rows updated."""
+    return update_by_ids("cyber_incidents", {"status": status}, incident_ids)
 
 
 def delete_incident(incident_id: int):
     """Delete an incident by id (no-op if not found)."""
-    incidents = CyberIncident.get_all()
-    inc = next((i for i in incidents if i.id == incident_id), None)
-    if inc:
-        inc.delete()
+    delete_incidents([incident_id])
+
+
+def delete_incidents(incident_ids: Iterable[int]) -> int:
+    """Delete every incident in `incident_ids`; returns rows deleted."""
+    return delete_by_ids("cyber_incidents", incident_ids)
+
+
+async def get_incident_aggregates(adb: AsyncDatabaseManager = None):
+    """Run the dashboard's aggregate queries concurrently.
+
+    Returns {name: rows} for every entry in INCIDENT_AGGREGATES (their
+    NORMALIZED_INCIDENT_AGGREGATES form with normalized storage).
+    """
+    adb = adb or AsyncDatabaseManager()
+    normalized = uses_normalized_storage("cyber_incidents", adb.db)
+    return await adb.gather(**(NORMALIZED_INCIDENT_AGGREGATES if normalized else INCIDENT_AGGREGATES))
+
+
+def _incident_buckets(df: pd.DataFrame) -> Dict[str, pd.Series]:
+    """Bucket key of each row for every grouped aggregate (mirrors the SQL)."""
+    reported = df.loc[df["reported_date"].notna(), "reported_date"].astype(str)
+    return {
+        "monthly": reported.str.slice(0, 7) + "-01",
+        "daily": reported.str.slice(0, 10),
+        "by_severity": df["severity"],
+        "by_status": df["status"],
+        "by_type": df["type"],
+        "open_by_severity": df.loc[df["status"] == "Open", "severity"],
+    }
+
+
+def _incident_kpis(df: pd.DataFrame) -> Counter:
+    dated = df[df["reported_date"].notna()]
+    return Counter(
+        total=len(dated),
+        critical=int((dated["severity"] == "Critical").sum()),
+        open=int((dated["status"] == "Open").sum()),
+    )
+
+
+def apply_incident_delta(
+    aggs: Dict[str, List[Dict[str, Any]]], removed: pd.DataFrame, added: pd.DataFrame
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Update `get_incident_aggregates()` output for rows removed/added.
+
+    All aggregates are counts, so the old contribution of changed rows is
+    subtracted and the new one added; cost is proportional to the delta.
+    """
+    out = {}
+    for name, (key_col, count_col) in _GROUP_COLUMNS.items():
+        counts = Counter({r[key_col]: r[count_col] for r in aggs[name]})
+        for frame, sign in ((removed, -1), (added, 1)):
+            if frame.empty:
+                continue
+            for key, n in _incident_buckets(frame)[name].value_counts(dropna=False).items():
+                counts[None if pd.isna(key) else key] += sign * int(n)
+        rows = [{key_col: k, count_col: n} for k, n in counts.items() if n > 0]
+        if name in ("monthly", "daily"):
+            rows.sort(key=lambda r: r[key_col])
+        else:
+            # As the SQL orders them: count descending, then key (NULL first)
+            rows.sort(key=lambda r: (-r[count_col], r[key_col] is not None, r[key_col] or ""))
+        out[name] = rows
+
+    kpis = Counter(aggs["kpis"][0])
+    if not removed.empty:
+        kpis.subtract(_incident_kpis(removed))
+    if not added.empty:
+        kpis.update(_incident_kpis(added))
+    out["kpis"] = [{k: kpis[k] for k in ("total", "critical", "open")}]
+    return out
+
+
+def incident_aggregates_of(df: pd.DataFrame) -> Dict[str, List[Dict[str, Any]]]:
+    """`get_incident_aggregates()` computed over the rows of `df` only.
+
+    Used for a date window already loaded by a `WindowCache`: the
+    aggregates are counts, so they are the delta of `df` on empty ones.
+    """
+    empty = {name: [] for name in _GROUP_COLUMNS}
+    empty["kpis"] = [{"total": 0, "critical": 0, "open": 0}]
+    return apply_incident_delta(empty, df.iloc[0:0], df)
+
+
+def refresh_incident_aggregates(cache, state: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Return dashboard aggregates matching `cache.version`.
+
+    `cache` is the dashboard's `FrameCache` for cyber_incidents and `state`
+    a dict kept across reruns. When the cache advanced incrementally from
+    the version `state` holds, the stored aggregates are patched with the
+    delta; otherwise the SQL aggregates are re-run.
+    """
+    if state.get("version") == cache.version:
+        return state["aggs"]
+    if cache.delta is not None and state.get("version") == cache.delta[0]:
+        aggs = apply_incident_delta(state["aggs"], cache.delta[1], cache.delta[2])
+        state.update(version=cache.version, aggs=aggs)
+        return aggs
+    aggs = run_sync(get_incident_aggregates())
+    # The queries run on separate connections; only keep the result as a
+    # base for deltas if no write landed while they ran.
+    consistent = get_version("cyber_incidents") == cache.version
+    state.update(version=cache.version if consistent else None, aggs=aggs)
+    return aggs
@@ -2,7 +2,12 @@
 Service layer for dataset-related operations used by the Data Science dashboard.
 """
 
+from typing import Dict, Iterable
+
 from models.dataset import Dataset
+from database.batch import delete_by_ids
+from database.db_manager import DatabaseManager
+from database.storage import storage_table, upsert_rows
 
 
 def create_dataset(dataset: Dataset) -> None:
@@ -10,6 +15,16 @@ def create_dataset(dataset: Dataset) -> None:
     dataset.save()
 
 
+def create_datasets(datasets: Iterable[Dataset]) -> int:
+    """Upsert many dataset records in one transaction (same semantics as `save()`); returns the number written."""
+    rows = [(d.id, d.dataset_name, d.source, d.size_mb, d.rows, d.upload_date) for d in datasets]
+    if not rows:
+        return 0
+    with DatabaseManager().writer() as conn:
+        upsert_rows(conn, "datasets", Dataset.COLUMNS, rows)
+    return len(rows)
+
+
 def get_all_datasets():
     """Return all dataset model instances from the DB."""
     return Dataset.get_all()
@@ -21,13 +36,22 @@ def get_datasets_by_source(source: str):
 
 
 def update_dataset_size(dataset_id: int, size_mb: float):
-    ds = next((d for d in Dataset.get_all() if d.id == dataset_id), None)
-    if ds:
-        ds.size_mb = size_mb
-        ds.save()
+    update_dataset_sizes({dataset_id: size_mb})
+
+
+def update_dataset_sizes(sizes: Dict[int, float]) -> int:
+    """Set `size_mb` per dataset id in one transaction; returns rows updated."""
+    items = [(float(size), int(ds_id)) for ds_id, size in sizes.items()]
+    with DatabaseManager().writer() as conn:
+        table = storage_table(conn, "datasets")
+        # Two parameters per statement: executemany needs no chunking
+        return conn.executemany(f"UPDATE {table} SET size_mb = ? WHERE id = ?", items).rowcount
 
 
 def delete_dataset(dataset_id: int):
-    ds = next((d for d in Dataset.get_all() if d.id == dataset_id), None)
-    if ds:
-        ds.delete()
+    delete_datasets([dataset_id])
+
+
+def delete_datasets(dataset_ids: Iterable[int]) -> int:
+    """Delete every dataset in `dataset_ids`; returns rows deleted."""
+    return delete_by_ids("datasets", dataset_ids)
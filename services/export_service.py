@@ -0,0 +1,236 @@
+"""
+Streaming exports of the domain tables as CSV, JSON Lines or Parquet.
+
+`export_stream()` runs one SELECT for the requested filters and walks its
+cursor EXPORT_BATCH_ROWS rows at a time, encoding each batch and yielding
+the bytes before the next batch is fetched. Memory stays at one batch
+(one Parquet row group) however many rows match, and the first bytes are
+ready as soon as the first batch is. Being a single statement, the
+export reads one consistent snapshot even while a sync commits.
+
+Filters are a date range on the table's date column, answered from its
+index, plus optional `{column: value or [values]}` equality filters.
+`include_archive` adds the archive partitions the range reaches (incidents
+and tickets only).
+
+Write to a file with `write_export()` or `python scripts/export.py`, or
+stream over HTTP from `/api/<resource>/export` (services/api_service.py).
+`export_bytes()` builds the export in memory for download widgets and so
+stops after EXPORT_MEMORY_ROWS rows.
+Parquet needs `pyarrow`; without it only CSV and JSON Lines are offered.
+"""
+
+import csv
+import io
+import json
+from collections import namedtuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from database.archive import (
+    ARCHIVE_POLICIES, SCHEMA as ARCHIVE_SCHEMA, archive_path, has_archive, overlapping_partitions,
+)
+from database.db_manager import DatabaseManager
+from database.ranges import DATE_COLUMNS, date_range
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+EXPORT_BATCH_ROWS = 10000
+# Most rows `export_bytes()` holds in memory; larger exports need a stream
+EXPORT_MEMORY_ROWS = 100000
+
+# table -> date column the range filter applies to
+EXPORT_TABLES = DATE_COLUMNS
+
+ExportFormat = namedtuple("ExportFormat", "mime extension")
+
+EXPORT_FORMATS = {
+    "csv": ExportFormat("text/csv", "csv"),
+    "jsonl": ExportFormat("application/x-ndjson", "jsonl"),
+}
+if pq is not None:
+    EXPORT_FORMATS["parquet"] = ExportFormat("application/vnd.apache.parquet", "parquet")
+
+
+def export_filename(table: str, fmt: str, start: Optional[str] = None, end: Optional[str] = None) -> str:
+    """`export_filename("it_tickets", "csv", "2025-01-01")` -> "it_tickets_2025-01-01_to_latest.csv"."""
+    span = f"_{start or 'earliest'}_to_{end or 'latest'}" if start or end else ""
+    return f"{table}{span}.{EXPORT_FORMATS[fmt].extension}"
+
+
+def _columns(conn, table: str) -> List[Tuple[str, str]]:
+    # (name, declared type); also works on the normalized views
+    return [(r[1], (r[2] or "").upper()) for r in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _where(table, date_col, start, end, filters, known) -> Tuple[str, list]:
+    terms, params = date_range(date_col, start, end)
+    for column, value in (filters or {}).items():
+        if column not in known:
+            raise ValueError(f"Unknown column for {table}: {column}")
+        values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+        terms.append(f"{column} IN ({', '.join('?' * len(values))})")
+        params += values
+    return (f" WHERE {' AND '.join(terms)}" if terms else ""), params
+
+
+def iter_batches(
+    table: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    include_archive: bool = False,
+    batch_size: int = EXPORT_BATCH_ROWS,
+    db: Optional[DatabaseManager] = None,
+    limit: Optional[int] = None,
+) -> Iterator[Tuple[List[Tuple[str, str]], List[tuple]]]:
+    """Yield (columns, rows) batches of `table`'s matching rows from one cursor.
+
+    `columns` is [(name, declared SQLite type)]; dates are ISO strings and
+    either bound may be None. Hot rows come in date order, followed by any
+    archived rows, at most `limit` rows in all. The first batch may be empty.
+    """
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Unknown export table: {table}")
+    db = db or DatabaseManager()
+    date_col = EXPORT_TABLES[table]
+    archived = include_archive and table in ARCHIVE_POLICIES and has_archive(db)
+    conn = db.connect_readonly()
+    try:
+        if archived:
+            conn.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (f"file:{archive_path(db)}?mode=ro",))
+        columns = _columns(conn, table)
+        names = [name for name, _ in columns]
+        where, params = _where(table, date_col, start, end, filters, set(names))
+        select = ", ".join(names)
+        sql = f"SELECT * FROM (SELECT {select} FROM main.{table}{where} ORDER BY {date_col})"
+        all_params = list(params)
+        if archived:
+            for partition in overlapping_partitions(conn, table, start, end):
+                sql += f" UNION ALL SELECT {select} FROM {ARCHIVE_SCHEMA}.{partition}{where}"
+                all_params += params
+        if limit is not None:
+            sql += " LIMIT ?"
+            all_params.append(limit)
+        cur = conn.execute(sql, all_params)
+        rows = cur.fetchmany(batch_size)
+        # An empty result still yields once, so exports carry their header/schema
+        yield columns, [tuple(r) for r in rows]
+        while rows:
+            rows = cur.fetchmany(batch_size)
+            if rows:
+                yield columns, [tuple(r) for r in rows]
+    finally:
+        conn.close()
+
+
+def _csv(batches) -> Iterator[bytes]:
+    header = False
+    for columns, rows in batches:
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        if not header:
+            writer.writerow([name for name, _ in columns])
+            header = True
+        writer.writerows(rows)
+        yield buf.getvalue().encode("utf-8")
+
+
+def _jsonl(batches) -> Iterator[bytes]:
+    for columns, rows in batches:
+        names = [name for name, _ in columns]
+        yield "".join(json.dumps(dict(zip(names, row)), default=str) + "\n" for row in rows).encode("utf-8")
+
+
+class _Drain(io.RawIOBase):
+    """Write-only sink that hands out what was written since the last drain."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def _arrow_type(declared: str):
+    if "INT" in declared:
+        return pa.int64()
+    if any(t in declared for t in ("REAL", "FLOA", "DOUB")):
+        return pa.float64()
+    return pa.string()
+
+
+def _parquet(batches) -> Iterator[bytes]:
+    sink, writer, schema = _Drain(), None, None
+    try:
+        for columns, rows in batches:
+            if writer is None:
+                schema = pa.schema([(name, _arrow_type(declared)) for name, declared in columns])
+                writer = pq.ParquetWriter(sink, schema)
+            values = list(zip(*rows)) or [()] * len(schema)
+            arrays = [pa.array(col, type=field.type) for col, field in zip(values, schema)]
+            # One row group per batch, flushed to the caller right away
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+        writer.close()
+        writer = None
+        yield sink.drain()
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+_ENCODERS = {"csv": _csv, "jsonl": _jsonl, "parquet": _parquet}
+
+
+def export_stream(
+    table: str,
+    fmt: str = "csv",
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    include_archive: bool = False,
+    batch_size: int = EXPORT_BATCH_ROWS,
+    db: Optional[DatabaseManager] = None,
+    limit: Optional[int] = None,
+) -> Iterator[bytes]:
+    """Yield the encoded export of `table`'s matching rows, one batch at a time.
+
+    See `iter_batches()` for the filters. With no matching rows the export
+    is just the CSV header, or a Parquet file with the schema and no rows.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt} (available: {', '.join(EXPORT_FORMATS)})")
+    batches = iter_batches(table, start, end, filters, include_archive, batch_size, db, limit)
+    return _ENCODERS[fmt](batches)
+
+
+def export_bytes(table: str, fmt: str = "csv", max_rows: int = EXPORT_MEMORY_ROWS, **options) -> bytes:
+    """The first `max_rows` rows of the export in memory, for download widgets that need bytes.
+
+    The whole file is held in memory, so the rows are capped: larger
+    exports should be streamed with `export_stream()` or the API.
+    """
+    return b"".join(export_stream(table, fmt, limit=max_rows, **options))
+
+
+def write_export(fh, table: str, fmt: str = "csv", **options) -> int:
+    """Stream the export into the binary file object `fh`; returns bytes written."""
+    written = 0
+    for chunk in export_stream(table, fmt, **options):
+        fh.write(chunk)
+        written += len(chunk)
+    return written
@@ -0,0 +1,80 @@
+"""
+Process-wide cache of rendered Plotly figures.
+
+Building a figure with Plotly Express (plus the grouping that feeds it) is
+one of the most expensive parts of a dashboard rerun, and its inputs rarely
+change between reruns. Figures are cached as serialized JSON keyed on
+(chart id, data version, chart parameters), so every session looking at
+the same data version shares one entry.
+
+Each entry also keeps the materialized figure object. `st.plotly_chart`
+re-validates plain dicts by constructing a new Figure, which costs about
+as much as building one, but only calls `to_dict()` on a Figure, so a hit
+hands back the shared object. Treat returned figures as read-only.
+"""
+
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import plotly.io as pio
+
+from services.versioned_cache import VersionedCache
+
+# Stored for builders that decided there is nothing to plot.
+_EMPTY = "null"
+
+
+class FigureCache(VersionedCache):
+    """
+    LRU cache of figures, bounded by entry count and total JSON size.
+    """
+
+    def get_or_build(
+        self,
+        chart_id: str,
+        data_version: Any,
+        params: Optional[Dict[str, Any]],
+        build: Callable[[], Any],
+    ):
+        """Return the cached figure, building and caching it on a miss.
+
+        `build` returns a Plotly figure, or None when there is nothing to
+        plot (that outcome is cached too).
+        """
+        key = self.key(chart_id, data_version, params)
+        entry = self._get(key)
+        if entry is not None:
+            self.hits += 1
+            spec, figure = entry
+            if figure is None and spec != _EMPTY:
+                # Entry inserted as JSON only
+                figure = entry[1] = pio.from_json(spec)
+            return figure
+        self.misses += 1
+        figure = build()
+        self.put(key, _EMPTY if figure is None else figure.to_json(), figure)
+        return figure
+
+
+# Shared by all sessions in the Streamlit process.
+figure_cache = FigureCache()
+
+
+def cached_figure(chart_id: str, data_version: Any, params: Optional[Dict[str, Any]], build: Callable[[], Any]):
+    """`get_or_build` on the process-wide cache."""
+    return figure_cache.get_or_build(chart_id, data_version, params, build)
+
+
+def warm_figures(builders: Dict[str, Tuple[Optional[Dict[str, Any]], Callable[[], Any]]], data_version: Any) -> int:
+    """Build and cache `{chart_id: (params, build)}` ahead of a render; returns how many built.
+
+    A builder that fails is skipped; the dashboard reports the error when
+    it builds that chart itself.
+    """
+    built = 0
+    for chart_id, (params, build) in builders.items():
+        try:
+            cached_figure(chart_id, data_version, params, build)
+            built += 1
+        except Exception:
+            pass
+    return built
@@ -0,0 +1,214 @@
+"""
+Incrementally refreshed DataFrames for the dashboards.
+
+A `FrameCache` keeps one table's frame together with the journal version
+(high-water mark) it reflects. On each rerun `refresh()` asks the change
+journal what happened since that mark, fetches only the rows that were
+inserted or updated, drops deleted ones and merges the result into the
+cached frame. A refresh after a 10-row sync therefore reads 10 rows, not
+the whole table. Large deltas, or a cold cache, fall back to the snapshot
+loader.
+
+The frames themselves are process-wide and read-only
+(`database/shared_frames.py`): sessions at the same version hold views
+of one Arrow-backed frame instead of a copy each.
+
+A `WindowCache` holds only the rows inside a date range instead, read
+through the model's indexed range query, plus the archived rows of any
+month the range reaches (`database/archive.py`); it is reloaded when the
+range, the table's version or the archive changes.
+"""
+
+from collections import namedtuple
+from typing import Iterable, Optional, Tuple
+
+import pandas as pd
+
+from database.archive import ARCHIVE_POLICIES, archive_generation, has_archive, load_range
+from database.batch import chunks
+from database.db_manager import DatabaseManager
+from database.indexes import ensure_indexes
+from database.shared_frames import SharedFrame, shared_frames
+from database.snapshot import ORDER_BY
+from database.versioning import changed_row_ids, ensure_versioning, get_version
+from models.cyber_incident import CyberIncident
+from models.dataset import Dataset
+from models.it_ticket import ITTicket
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pc = None
+
+# table -> model whose `range_query()` selects a date window
+WINDOW_MODELS = {
+    "cyber_incidents": CyberIncident,
+    "it_tickets": ITTicket,
+    "datasets": Dataset,
+}
+
+# Above this share of the cached rows, a full reload is cheaper than a merge.
+FULL_RELOAD_RATIO = 0.5
+
+# What a WindowCache's rows reflect: the table's data version, the date
+# range, and the archive generation (0 when no archive was read).
+WindowVersion = namedtuple("WindowVersion", "table start end archive_gen")
+
+
+class FrameCache:
+    """
+    One table's frame plus the version it reflects.
+
+    The data lives in the process-wide `shared_frames` store; `frame` is
+    this cache's own read-only view of it, so sessions on the same
+    version share one copy. The first session to see a new version merges
+    the delta and publishes the result for the others.
+
+    `delta` describes the last incremental refresh as
+    (base_version, removed_rows, added_rows), so callers holding derived
+    aggregates at `base_version` can update them instead of recomputing.
+    It is None after a full load.
+    """
+
+    def __init__(self, table: str, db: Optional[DatabaseManager] = None):
+        self.table = table
+        self.db = db or DatabaseManager()
+        self.shared: Optional[SharedFrame] = None
+        self.frame: Optional[pd.DataFrame] = None
+        self.version: Optional[int] = None
+        self.delta: Optional[Tuple[int, pd.DataFrame, pd.DataFrame]] = None
+
+    def refresh(self) -> pd.DataFrame:
+        """Bring the cached frame up to the current data version and return it.
+
+        The returned frame is shared with later reruns; take a shallow copy
+        (`copy(deep=False)`) before adding or replacing columns.
+        """
+        if self.frame is None:
+            self._full_load()
+            return self.frame
+
+        ensure_versioning(self.db)
+        conn = self.db.connect_readonly()
+        try:
+            # One read transaction: version, journal and rows all agree.
+            conn.execute("BEGIN")
+            version = conn.execute(
+                "SELECT version FROM table_versions WHERE table_name = ?", (self.table,)
+            ).fetchone()[0]
+            if version == self.version:
+                return self.frame
+            ids = changed_row_ids(conn, self.table, self.version)
+            reload = not ids or len(ids) > max(1, len(self.frame)) * FULL_RELOAD_RATIO
+            # Another session may already have built this version
+            shared = shared_frames.get(self.db, self.table, version)
+            fetched = [] if reload or shared is not None else [
+                pd.read_sql_query(
+                    f"SELECT * FROM {self.table} WHERE id IN ({', '.join('?' * len(chunk))})",
+                    conn,
+                    params=tuple(chunk),
+                )
+                for chunk in chunks(ids)
+            ]
+            conn.commit()
+        finally:
+            conn.close()
+
+        if shared is not None:
+            self.delta = None if reload else (self.version, self.shared.rows(ids), shared.rows(ids))
+            self._adopt(shared)
+            return self.frame
+        if reload:
+            self._full_load()
+            return self.frame
+
+        added = pd.concat(fetched, ignore_index=True)
+        merged = self._merge(ids, added)
+        if merged is None:
+            self._full_load()
+            return self.frame
+        self.delta = (self.version, self.shared.rows(ids), added)
+        self._adopt(shared_frames.put(self.db, self.table, version, merged))
+        return self.frame
+
+    def _merge(self, ids: Iterable[int], added: pd.DataFrame):
+        """The shared rows with `ids` replaced by `added`, in table order; None if it cannot be merged."""
+        base = self.shared
+        if base.arrow is None:
+            kept = base.view()
+            kept = kept[~kept["id"].isin(ids)]
+            merged = pd.concat([kept, added], ignore_index=True)
+            if self.table in ORDER_BY:
+                merged = merged.sort_values(ORDER_BY[self.table], kind="stable", na_position="first")
+            return merged.reset_index(drop=True)
+        old = base.arrow
+        try:
+            # A column that was all NULL in the snapshot has Arrow type
+            # null and cannot take values; a full reload re-infers it.
+            new = pa.Table.from_pandas(added, schema=old.schema, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, KeyError):
+            return None
+        touched = pc.is_in(old["id"], value_set=pa.array(ids, type=old.schema.field("id").type))
+        merged = pa.concat_tables([old.filter(pc.invert(touched)), new])
+        if self.table in ORDER_BY:
+            merged = merged.take(pc.sort_indices(merged, sort_keys=[(ORDER_BY[self.table], "ascending", "at_start")]))
+        return merged
+
+    def _adopt(self, shared: SharedFrame) -> None:
+        self.shared = shared
+        self.frame = shared.view()
+        self.version = shared.version
+
+    def _full_load(self) -> None:
+        self._adopt(shared_frames.load(self.table, self.db))
+        self.delta = None
+
+
+class WindowCache:
+    """
+    One table's rows within a date range plus the version they reflect.
+
+    Only the rows inside the range are read (`range_query()` of the
+    table's model, answered from its date index), so the cost follows the
+    size of the window rather than of the table. Once records have been
+    archived, the range goes through `load_range()` instead, which adds the
+    partitions of the archived months it reaches. `version` is a
+    `WindowVersion`, usable as a figure cache version.
+    """
+
+    def __init__(self, table: str, db: Optional[DatabaseManager] = None):
+        self.table = table
+        self.db = db or DatabaseManager()
+        self.frame: Optional[pd.DataFrame] = None
+        self.version: Optional[WindowVersion] = None
+
+    def refresh(self, start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        """Return the rows with dates in [start, end] (ISO dates, either may be None), hot and archived."""
+        ensure_versioning(self.db)
+        ensure_indexes(self.db)
+        if self.table in ARCHIVE_POLICIES and has_archive(self.db):
+            # Versions are read before the rows: a write in between only
+            # makes the next refresh reload again.
+            version = WindowVersion(get_version(self.table, self.db), start, end, archive_generation(self.db))
+            if version != self.version:
+                self.frame = load_range(self.table, start, end, db=self.db)
+                self.version = version
+            return self.frame
+        sql, params = WINDOW_MODELS[self.table].range_query(start, end)
+        conn = self.db.connect_readonly()
+        try:
+            # One read transaction: the version matches the rows read
+            conn.execute("BEGIN")
+            version = conn.execute(
+                "SELECT version FROM table_versions WHERE table_name = ?", (self.table,)
+            ).fetchone()[0]
+            version = WindowVersion(version, start, end, 0)
+            if version != self.version:
+                self.frame = pd.read_sql_query(sql, conn, params=params)
+                self.version = version
+            conn.commit()
+        finally:
+            conn.close()
+        return self.frame
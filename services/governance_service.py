@@ -0,0 +1,77 @@
+"""
+Dataset governance queries answered directly from SQLite.
+
+Size categories and archive flags are stored per dataset and kept current
+by triggers (`database/governance.py`), so the functions here count, total
+and page through them with indexed queries instead of loading every
+`Dataset` and calling its methods.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from models.dataset import Dataset
+from database.db_manager import DatabaseManager
+# Threshold management is re-exported as part of this service's API
+from database.governance import ensure_governance, get_thresholds, reclassify_all, set_thresholds  # noqa: F401
+
+SIZE_CATEGORIES = ("Small", "Medium", "Large")
+
+
+def _db(db: Optional[DatabaseManager]) -> DatabaseManager:
+    db = db or DatabaseManager()
+    ensure_governance(db)
+    return db
+
+
+def get_category_totals(db: Optional[DatabaseManager] = None) -> List[Dict[str, Any]]:
+    """Return one row per size category: datasets, total size_mb and rows.
+
+    Every category is listed, with zero totals when it is empty.
+    """
+    rows = _db(db).fetch_all(
+        """
+        SELECT c.size_category, COUNT(*) AS datasets,
+               COALESCE(SUM(d.size_mb), 0) AS size_mb, COALESCE(SUM(d.rows), 0) AS rows
+        FROM dataset_classes c JOIN datasets d ON d.id = c.dataset_id
+        GROUP BY c.size_category
+        """
+    )
+    found = {r["size_category"]: r for r in rows}
+    return [
+        found.get(cat, {"size_category": cat, "datasets": 0, "size_mb": 0, "rows": 0})
+        for cat in SIZE_CATEGORIES
+    ]
+
+
+def count_archive_candidates(db: Optional[DatabaseManager] = None) -> int:
+    rows = _db(db).fetch_all("SELECT COUNT(*) AS n FROM dataset_classes WHERE archive_candidate")
+    return rows[0]["n"]
+
+
+def _page(db: Optional[DatabaseManager], where: str, params: tuple, page: int, page_size: int) -> List[Dataset]:
+    if page < 1 or page_size < 1:
+        raise ValueError("page and page_size must be positive")
+    rows = _db(db).fetch_all(
+        f"""
+        SELECT d.* FROM dataset_classes c JOIN datasets d ON d.id = c.dataset_id
+        WHERE {where} ORDER BY c.dataset_id LIMIT ? OFFSET ?
+        """,
+        params + (page_size, (page - 1) * page_size),
+    )
+    return [Dataset.from_row(r) for r in rows]
+
+
+def get_archive_candidates(
+    page: int = 1, page_size: int = 50, db: Optional[DatabaseManager] = None
+) -> List[Dataset]:
+    """Return one page (1-based, ordered by id) of archive candidates."""
+    return _page(db, "c.archive_candidate", (), page, page_size)
+
+
+def get_datasets_in_category(
+    category: str, page: int = 1, page_size: int = 50, db: Optional[DatabaseManager] = None
+) -> List[Dataset]:
+    """Return one page (1-based, ordered by id) of datasets in a size category."""
+    if category not in SIZE_CATEGORIES:
+        raise ValueError(f"Unknown size category: {category}")
+    return _page(db, "c.size_category = ?", (category,), page, page_size)
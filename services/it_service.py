@@ -2,27 +2,64 @@
 Service helpers for IT ticket operations. Ensures dashboard code remains concise.
 """
 
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
 from models.it_ticket import ITTicket
+from database.batch import delete_by_ids, update_by_ids
+from database.db_manager import DatabaseManager
+from database.ranges import top_values
+from database.storage import upsert_rows
 
 
 def create_ticket(ticket: ITTicket) -> None:
     ticket.save()
 
 
+def create_tickets(tickets: Iterable[ITTicket]) -> int:
+    """Upsert many tickets in one transaction (same semantics as `save()`); returns the number written."""
+    rows = [(t.id, t.staff, t.status, t.category, t.opened_date, t.closed_date) for t in tickets]
+    if not rows:
+        return 0
+    with DatabaseManager().writer() as conn:
+        upsert_rows(conn, "it_tickets", ITTicket.COLUMNS, rows)
+    return len(rows)
+
+
 def get_all_tickets():
     return ITTicket.get_all()
 
 
+def busiest_staff(
+    k: int = 20, start: Optional[str] = None, end: Optional[str] = None, db: Optional[DatabaseManager] = None
+) -> List[str]:
+    """The `k` staff with the most tickets opened within [start, end], counted exactly."""
+    return [r["item"] for r in top_values("it_tickets", "staff", k, start, end, db)]
+
+
+def ticket_kpis_of(df: pd.DataFrame) -> Dict[str, int]:
+    """`get_ticket_kpis()` ({total, open, in_progress}) over the rows of `df` only."""
+    return {
+        "total": len(df),
+        "open": int((df["status"] == "Open").sum()),
+        "in_progress": int((df["status"] == "In Progress").sum()),
+    }
+
+
 def update_ticket_status(ticket_id: int, status: str):
-    tickets = ITTicket.get_all()
-    t = next((x for x in tickets if x.id == ticket_id), None)
-    if t:
-        t.status = status
-        t.save()
+    update_ticket_status_bulk([ticket_id], status)
+
+
+def update_ticket_status_bulk(ticket_ids: Iterable[int], status: str) -> int:
+    """Set `status` on every ticket in `ticket_ids`; returns rows updated."""
+    return update_by_ids("it_tickets", {"status": status}, ticket_ids)
 
 
 def delete_ticket(ticket_id: int):
-    tickets = ITTicket.get_all()
-    t = next((x for x in tickets if x.id == ticket_id), None)
-    if t:
-        t.delete()
+    delete_tickets([ticket_id])
+
+
+def delete_tickets(ticket_ids: Iterable[int]) -> int:
+    """Delete every ticket in `ticket_ids`; returns rows deleted."""
+    return delete_by_ids("it_tickets", ticket_ids)
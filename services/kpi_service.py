@@ -0,0 +1,102 @@
+"""
+KPI counts for the dashboards' metric rows.
+
+Each count is a separate scalar subquery so SQLite can answer it from the
+matching partial or covering index in `database/indexes.py` rather than
+scanning the table. Values are compared exactly: severity and status are
+stored in their canonical spelling by every writer (`database/storage.py`).
+
+With normalized storage (`database/storage.py`) the same counts are taken
+from the `{table}_data` tables, filtering and grouping on the integer ids
+and decoding only the grouped keys, rather than through the views, which
+would join every row to the lookup table first.
+"""
+
+from typing import Dict, List, Optional
+
+from database.db_manager import DatabaseManager
+from database.indexes import ensure_indexes
+from database.storage import LOOKUP_TABLE, lookup_id_sql, uses_normalized_storage
+
+INCIDENT_KPIS = """
+    SELECT (SELECT COUNT(*) FROM cyber_incidents WHERE reported_date IS NOT NULL) AS total,
+           (SELECT COUNT(*) FROM cyber_incidents
+            WHERE severity = 'Critical' AND reported_date IS NOT NULL) AS critical,
+           (SELECT COUNT(*) FROM cyber_incidents
+            WHERE status = 'Open' AND reported_date IS NOT NULL) AS open
+"""
+
+TICKET_KPIS = """
+    SELECT (SELECT COUNT(*) FROM it_tickets) AS total,
+           (SELECT COUNT(*) FROM it_tickets WHERE status = 'Open') AS open,
+           (SELECT COUNT(*) FROM it_tickets WHERE status = 'In Progress') AS in_progress
+"""
+
+OPEN_TICKETS_BY_STAFF = """
+    SELECT staff, COUNT(*) AS open FROM it_tickets
+    WHERE status = 'Open' GROUP BY staff ORDER BY open DESC, staff
+"""
+
+NORMALIZED_INCIDENT_KPIS = f"""
+    SELECT (SELECT COUNT(*) FROM cyber_incidents_data WHERE reported_date IS NOT NULL) AS total,
+           (SELECT COUNT(*) FROM cyber_incidents_data
+            WHERE severity_id = {lookup_id_sql("cyber_incidents", "severity", "Critical")}
+              AND reported_date IS NOT NULL) AS critical,
+           (SELECT COUNT(*) FROM cyber_incidents_data
+            WHERE status_id = {lookup_id_sql("cyber_incidents", "status", "Open")}
+              AND reported_date IS NOT NULL) AS open
+"""
+
+NORMALIZED_TICKET_KPIS = f"""
+    SELECT (SELECT COUNT(*) FROM it_tickets_data) AS total,
+           (SELECT COUNT(*) FROM it_tickets_data
+            WHERE status_id = {lookup_id_sql("it_tickets", "status", "Open")}) AS open,
+           (SELECT COUNT(*) FROM it_tickets_data
+            WHERE status_id = {lookup_id_sql("it_tickets", "status", "In Progress")}) AS in_progress
+"""
+
+NORMALIZED_OPEN_TICKETS_BY_STAFF = f"""
+    SELECT l.value AS staff, g.open FROM (
+        SELECT staff_id, COUNT(*) AS open FROM it_tickets_data
+        WHERE status_id = {lookup_id_sql("it_tickets", "status", "Open")} GROUP BY staff_id
+    ) g LEFT JOIN {LOOKUP_TABLE} l ON l.id = g.staff_id ORDER BY g.open DESC, l.value
+"""
+
+# Every query this module runs (checked by scripts/check_query_plans.py)
+KPI_QUERIES = {
+    "incidents": INCIDENT_KPIS,
+    "tickets": TICKET_KPIS,
+    "open_by_staff": OPEN_TICKETS_BY_STAFF,
+}
+
+# KPI_QUERIES for normalized storage, same results
+NORMALIZED_KPI_QUERIES = {
+    "incidents": NORMALIZED_INCIDENT_KPIS,
+    "tickets": NORMALIZED_TICKET_KPIS,
+    "open_by_staff": NORMALIZED_OPEN_TICKETS_BY_STAFF,
+}
+
+
+def _query(name: str, table: str, db: DatabaseManager) -> str:
+    return (NORMALIZED_KPI_QUERIES if uses_normalized_storage(table, db) else KPI_QUERIES)[name]
+
+
+def get_incident_kpis(db: Optional[DatabaseManager] = None) -> Dict[str, int]:
+    """Return {total, critical, open} over incidents with a reported date."""
+    db = db or DatabaseManager()
+    ensure_indexes(db)
+    return db.fetch_all(_query("incidents", "cyber_incidents", db))[0]
+
+
+def get_ticket_kpis(db: Optional[DatabaseManager] = None) -> Dict[str, int]:
+    """Return {total, open, in_progress} ticket counts."""
+    db = db or DatabaseManager()
+    ensure_indexes(db)
+    return db.fetch_all(_query("tickets", "it_tickets", db))[0]
+
+
+def get_open_tickets_by_staff(db: Optional[DatabaseManager] = None) -> List[Dict]:
+    """Return [{staff, open}] for staff with open tickets, busiest first."""
+    db = db or DatabaseManager()
+    ensure_indexes(db)
+    return db.fetch_all(_query("open_by_staff", "it_tickets", db))
@@ -0,0 +1,115 @@
+"""
+CSV -> SQLite sync for the three domain tables.
+
+Parsing is split from writing so the CSVs can be parsed in parallel
+(`parse_domain()` is a plain top-level function that returns picklable
+row tuples) while every write goes through `write_domain()`
+on a single connection, matching SQLite's single-writer model. Parsing
+is the domain's schema in `services/csv_validation.py`: rows that fail
+it are left out and reported, one message per reason.
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+
+from database.archive import (
+    ARCHIVE_POLICIES, SCHEMA as ARCHIVE_SCHEMA, archive_path, archived_ids_among, has_archive,
+)
+from database.anomaly import update_detectors
+from database.db_manager import DatabaseManager
+from database.governance import ensure_governance
+from database.heavy_hitters import update_heavy_hitters
+from database.indexes import ensure_indexes
+from database.snapshot import write_snapshot
+from database.storage import Encoder, encode_rows, upsert_sql
+from database.versioning import ensure_versioning
+from services.csv_validation import SCHEMAS, validate
+
+# domain name -> (CSV path, table, column order of the parsed tuples)
+DOMAINS = {
+    "cyber": ("data/cyber_incidents.csv", "cyber_incidents", SCHEMAS["cyber"].columns),
+    "datasets": ("data/datasets.csv", "datasets", SCHEMAS["datasets"].columns),
+    "it": ("data/it_tickets.csv", "it_tickets", SCHEMAS["it"].columns),
+}
+
+
+def parse_domain(domain: str, csv_path: Optional[str] = None) -> Dict[str, Any]:
+    """Parse one domain's CSV and time it. Safe to run in a worker process.
+
+    `errors` has one message per validation failure reason and
+    `invalid_rows` the number of rows left out for them.
+    """
+    start = time.perf_counter()
+    result = validate(domain, csv_path or DOMAINS[domain][0])
+    return {
+        "domain": domain,
+        "rows": result.rows(),
+        "errors": result.messages(),
+        "invalid_rows": result.invalid_rows,
+        "parse_s": time.perf_counter() - start,
+    }
+
+
+def write_domain(domain: str, rows: List[tuple], db: Optional[DatabaseManager] = None) -> int:
+    """Write parsed rows for `domain` in a single transaction.
+
+    The CSV is authoritative. Rows with an id are upserted, and only rows
+    whose values actually differ are touched, so the change journal
+    (`change_log`) records real changes rather than a full rewrite. DB rows
+    missing from the CSV are deleted: always for incidents (duplicates must
+    not accumulate), and for datasets and tickets when the CSV carries ids.
+    Rows without an id are inserted as new records. Records already moved
+    to the archive (`database/archive.py`) are left there. The anomaly
+    detectors (`database/anomaly.py`) and the top-k summaries
+    (`database/heavy_hitters.py`) are brought up to date with the changes.
+    Returns the number of journal entries the write produced.
+    """
+    db = db or DatabaseManager()
+    _, logical, columns = DOMAINS[domain]
+    data_cols = columns[1:]
+    with_id = [r for r in rows if r[0] is not None]
+    without_id = [r[1:] for r in rows if r[0] is None]
+    ensure_versioning(db)
+    ensure_indexes(db)
+    ensure_governance(db)
+    archived = logical in ARCHIVE_POLICIES and has_archive(db)
+    with db.writer(attach={ARCHIVE_SCHEMA: archive_path(db)} if archived else None) as conn:
+        encoder = Encoder(conn)
+        table, columns, with_id = encode_rows(conn, logical, columns, with_id, encoder)
+        _, data_cols, without_id = encode_rows(conn, logical, data_cols, without_id, encoder)
+        cur = conn.cursor()
+        before = cur.execute("SELECT COALESCE(MAX(version), 0) FROM change_log").fetchone()[0]
+        if domain == "cyber" or with_id:
+            # Temp table instead of a huge NOT IN (...) parameter list
+            cur.execute("CREATE TEMP TABLE IF NOT EXISTS _sync_ids (id INTEGER PRIMARY KEY)")
+            cur.execute("DELETE FROM _sync_ids")
+            cur.executemany("INSERT OR IGNORE INTO _sync_ids (id) VALUES (?)", [(r[0],) for r in with_id])
+            cur.execute(f"DELETE FROM {table} WHERE id NOT IN (SELECT id FROM _sync_ids)")
+            if archived:
+                skip = archived_ids_among(conn, logical, "_sync_ids")
+                with_id = [r for r in with_id if r[0] not in skip]
+        cur.executemany(upsert_sql(table, columns), with_id)
+        cur.executemany(
+            f"INSERT INTO {table} ({', '.join(data_cols)}) VALUES ({', '.join('?' * len(data_cols))})",
+            without_id,
+        )
+        changes = cur.execute(
+            "SELECT COUNT(*) FROM change_log WHERE version > ? AND table_name = ?", (before, logical)
+        ).fetchone()[0]
+        # Same transaction, so detector and top-k state never run ahead of the data
+        update_detectors(conn, logical)
+        update_heavy_hitters(conn, logical)
+        return changes
+
+
+def sync_domain(domain: str, csv_path: Optional[str] = None, db: Optional[DatabaseManager] = None) -> Dict[str, Any]:
+    """Parse, write and snapshot one domain in-process.
+
+    Returns the `parse_domain()` result plus `changes`, the number of
+    journal entries written.
+    """
+    db = db or DatabaseManager()
+    result = parse_domain(domain, csv_path)
+    result["changes"] = write_domain(domain, result["rows"], db)
+    write_snapshot(DOMAINS[domain][1], db)
+    return result
@@ -1,5 +1,13 @@
 from models.user import User
 
+# Dashboards each role can open, in sidebar order (also the JSON API's access rules)
+ROLE_DASHBOARDS = {
+    "admin": ["Cybersecurity", "Data Science", "IT Operations"],
+    "cybersecurity": ["Cybersecurity"],
+    "data science": ["Data Science"],
+    "it operations": ["IT Operations"],
+}
+
 
 def get_user_by_username(username: str):
     """Return a User instance for the given username or None if not found."""
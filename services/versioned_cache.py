@@ -0,0 +1,86 @@
+"""
+Process-wide LRU of serialized results keyed on data version.
+
+Entries are keyed on (item id, data version, parameters) and hold a JSON
+string, so a result is computed once per version however many sessions
+or clients ask for it, and an entry for an old version simply ages out.
+The dashboards' figure cache (`services/figure_cache.py`) and the JSON
+API's response cache (`services/api_service.py`) are both built on it.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+MAX_ENTRIES = 256
+MAX_BYTES = 64 * 1024 * 1024
+
+
+class VersionedCache:
+    """
+    LRU cache of serialized results, bounded by entry count and total size.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> [serialized result, materialized object or None]
+        self._entries: "OrderedDict[tuple, list]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(item_id: str, data_version: Any, params: Optional[Dict[str, Any]] = None) -> tuple:
+        return (item_id, data_version, json.dumps(params or {}, sort_keys=True, default=str))
+
+    def _get(self, key: tuple) -> Optional[list]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def get_json(self, key: tuple) -> Optional[str]:
+        """Return the serialized result for `key`, or None on a miss."""
+        entry = self._get(key)
+        return entry[0] if entry else None
+
+    def put(self, key: tuple, spec: str, obj: Any = None) -> None:
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[0])
+            self._entries[key] = [spec, obj]
+            self._bytes += len(spec)
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted[0])
+
+    def get_or_build_json(
+        self,
+        item_id: str,
+        data_version: Any,
+        params: Optional[Dict[str, Any]],
+        build: Callable[[], Any],
+    ) -> str:
+        """Return the cached JSON, building (`build()` -> JSON-able value) and caching it on a miss."""
+        key = self.key(item_id, data_version, params)
+        spec = self.get_json(key)
+        if spec is not None:
+            self.hits += 1
+            return spec
+        self.misses += 1
+        spec = json.dumps(build(), default=str)
+        self.put(key, spec)
+        return spec
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = 0
@@ -0,0 +1,62 @@
+"""
+Post-login cache warm-up.
+
+As soon as a user logs in, `start_warmup()` runs the `warm()` function of
+each dashboard their role can open on a background thread. A warmer does
+the data work of a first render (CSV sync, frame load, aggregates, figure
+builds into the process-wide figure cache) and returns the session-state
+entries that render would have created. The futures are kept in the
+user's session; `adopt_warmup()` copies a finished warmer's entries into
+the session just before its dashboard renders. It never blocks the
+script thread: a render that comes first takes the normal lazy path, a
+warmer that has not started yet is cancelled, and one already running
+is adopted by the first rerun after it finishes, its entries replacing
+the ones the lazy render created.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, MutableMapping
+
+SESSION_KEY = "warmup_futures"
+MAX_WORKERS = 2
+
+_executor = None
+_executor_guard = threading.Lock()
+
+
+def _default_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_guard:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="warmup")
+        return _executor
+
+
+def start_warmup(session_state: MutableMapping, warmers: Dict[str, Callable[[], Dict[str, Any]]]) -> None:
+    """Start each `{dashboard name: warm}` in order and keep the futures in the session."""
+    executor = _default_executor()
+    session_state[SESSION_KEY] = {name: executor.submit(warm) for name, warm in warmers.items()}
+
+
+def adopt_warmup(session_state: MutableMapping, name: str) -> bool:
+    """Move dashboard `name`'s warmed entries into the session if its warmer is done.
+
+    Returns True when entries were adopted; they replace the session's,
+    which can only be the same caches built lazily (a frame cache at an
+    older version catches up on its next refresh). Without a finished
+    warmer the dashboard renders lazily: a warmer still queued is
+    cancelled, one still running stays in the session for a later rerun,
+    and a failed one is dropped.
+    """
+    futures = session_state.get(SESSION_KEY) or {}
+    future = futures.get(name)
+    if future is None:
+        return False
+    if not future.done() and not future.cancel():
+        return False
+    del futures[name]
+    if future.cancelled() or future.exception() is not None:
+        return False
+    session_state.update(future.result())
+    return True